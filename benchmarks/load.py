@@ -0,0 +1,91 @@
+"""
+Load benchmark of the rating server against local YouTube/Gemini stand-ins.
+
+    poetry run python benchmarks/load.py --output baseline.json
+    poetry run python benchmarks/load.py --baseline baseline.json
+    poetry run python benchmarks/load.py --batch-size 1 --gemini-token-latency 0.02 \
+        --gemini-verbose --no-structured-output --max-output-tokens 0 [--gemini-stream]
+
+Prints the JSON report; with --baseline, exits with 1 when throughput or
+latency percentiles regressed by more than --tolerance.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from yt_rater.core.constants import Constants
+from yt_rater.testing.load import compare, run_scenario
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--hit-ratio", type=float, default=0.8)
+    parser.add_argument("--hot-videos", type=int, default=20)
+    parser.add_argument("--comments", type=int, default=100, help="comments per video")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--youtube-latency", type=float, default=0.02, help="seconds")
+    parser.add_argument("--gemini-latency", type=float, default=0.1, help="seconds")
+    parser.add_argument(
+        "--gemini-token-latency", type=float, default=0.0, help="seconds per generated token"
+    )
+    parser.add_argument(
+        "--gemini-verbose", action="store_true", help="fake Gemini explains its unconstrained answers"
+    )
+    parser.add_argument("--gemini-stream", action="store_true", help="stream single ratings")
+    parser.add_argument(
+        "--no-structured-output", dest="structured_output", action="store_false",
+        help="plain text single ratings, instead of a JSON number",
+    )
+    parser.add_argument(
+        "--max-output-tokens", type=int, default=Constants.DEFAULT_GEMINI_MAX_OUTPUT_TOKENS,
+        help="cap of single ratings (0: uncapped)",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=Constants.DEFAULT_GEMINI_BATCH_MAX_SIZE,
+        help="videos per Gemini request (1: single ratings only)",
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write the report to this file")
+    parser.add_argument("--baseline", type=Path, help="report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    report = run_scenario(
+        requests=args.requests,
+        concurrency=args.concurrency,
+        hit_ratio=args.hit_ratio,
+        hot_videos=args.hot_videos,
+        comments_per_video=args.comments,
+        page_size=args.page_size,
+        youtube_latency=args.youtube_latency,
+        gemini_latency=args.gemini_latency,
+        error_rate=args.error_rate,
+        seed=args.seed,
+        gemini_token_latency=args.gemini_token_latency,
+        gemini_verbose=args.gemini_verbose,
+        gemini_stream=args.gemini_stream,
+        structured_output=args.structured_output,
+        max_output_tokens=args.max_output_tokens,
+        batch_max_size=args.batch_size,
+    )
+    print(json.dumps(report, indent=4))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=4) + "\n")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("scenario") != report["scenario"]:
+            print("warning: baseline was measured with another scenario", file=sys.stderr)
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"regression: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Agreement of the local pre-scorer with recorded Gemini scores.
+
+    poetry run python benchmarks/prescorer_eval.py
+    poetry run python benchmarks/prescorer_eval.py --threshold 0.8 --threshold 0.9
+    poetry run python benchmarks/prescorer_eval.py --record   # re-rate fixtures with Gemini
+
+Fixtures are JSON lines {"video_id": ..., "source": ..., "comments": [...],
+"ai_score": ...}, source being the Gemini model that gave ai_score. The
+bundled ones are "hand-labelled": record them before trusting the report.
+Prints one JSON report per confidence threshold: the share of videos the
+pre-scorer would answer alone, and its error against the AI on those.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from yt_rater.core.prescorer import PreScorer, evaluate
+
+FIXTURES = Path(__file__).parent / "fixtures" / "prescorer.jsonl"
+
+
+def record(records: list) -> None:
+    """Replace ai_score with the rating of the configured Gemini model."""
+    from yt_rater.core.gemini import GeminiClient
+
+    gemini = GeminiClient()
+    for item in records:
+        rating = gemini.rate_comments(item["comments"])
+        if rating.fallback:
+            print(f"{item['video_id']}: no AI score ({rating.reason})", file=sys.stderr)
+            continue
+        item["ai_score"] = rating.score
+        item["source"] = gemini.model
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES)
+    parser.add_argument(
+        "--threshold", type=float, action="append",
+        help="confidence threshold (repeatable, default: 0.5 0.7 0.85 0.95)",
+    )
+    parser.add_argument("--record", action="store_true", help="re-record ai_score with Gemini")
+    args = parser.parse_args()
+
+    records = [json.loads(line) for line in args.fixtures.read_text().splitlines() if line]
+    if args.record:
+        record(records)
+        args.fixtures.write_text(
+            "".join(json.dumps(item, ensure_ascii=False) + "\n" for item in records)
+        )
+
+    unrecorded = sum(item.get("source") == "hand-labelled" for item in records)
+    if unrecorded:
+        print(
+            f"warning: {unrecorded}/{len(records)} scores are hand-labelled, not Gemini's"
+            " (run with --record)",
+            file=sys.stderr,
+        )
+
+    scorer = PreScorer()
+    for threshold in args.threshold or [0.5, 0.7, 0.85, 0.95]:
+        print(json.dumps(evaluate(scorer, records, threshold)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
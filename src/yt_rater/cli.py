@@ -1,11 +1,13 @@
 # yt_rater/cli.py
+import sys
+from pathlib import Path
+from typing import List
+
 import typer
 from yt_rater.core.config import Config
-from yt_rater.core.server import Server
 from yt_rater.core.constants import Constants
 
 app = typer.Typer(help="YT Rater CLI")
-app_config = Config()
 
 @app.command()
 def config(show: bool = typer.Option(False, "--show", "-s", help="Show current config.")):
@@ -17,13 +19,79 @@ def config(show: bool = typer.Option(False, "--show", "-s", help="Show current c
         typer.echo(cfg.CONFIG_FILE)
 
 @app.command()
-def run(port: int = typer.Option(app_config.get("server", "port"), "--port", "-p", help="Server listening port.")):
+def run(port: int | None = typer.Option(None, "--port", "-p", help="Server listening port (default: [server] port).")):
     """Launch local server."""
+    # FastAPI, uvicorn and the Google clients are slow to import: only the
+    # server needs them, so the other commands start instantly.
+    from yt_rater.core.server import Server
+
     cfg = Config()
-    youtube_api_key = cfg.get("youtube", "api_key")
-    gemini_api_key = cfg.get("gemini", "api_key")
+    port = port or cfg.get("server", "port", Constants.DEFAULT_SERVER_PORT)
+    _check_api_keys(cfg)
 
-    if not youtube_api_key or not gemini_api_key:
+    typer.echo(f"http://localhost:{port}")
+    server = Server(port=port)
+    server.run()
+
+@app.command()
+def warm(
+    videos: List[str] = typer.Argument(None, help="Video URLs or IDs."),
+    file: Path | None = typer.Option(None, "--file", "-f", help="File of video URLs or IDs, one per line ('-' for stdin)."),
+    playlist: List[str] = typer.Option([], "--playlist", help="Playlist URL or ID (repeatable)."),
+    channel: List[str] = typer.Option([], "--channel", help="Channel URL, ID or @handle: rate its uploads (repeatable)."),
+    limit: int | None = typer.Option(None, "--limit", "-n", help="Videos per playlist or channel."),
+    concurrency: int = typer.Option(Constants.DEFAULT_WARM_CONCURRENCY, "--concurrency", "-c", help="Videos rated at once."),
+    checkpoint: Path | None = typer.Option(None, "--checkpoint", help="Progress file: videos it lists are skipped, warmed ones are added."),
+    output: Path | None = typer.Option(None, "--output", "-o", help="NDJSON output file (default: stdout)."),
+):
+    """Rate videos ahead of time so that requests hit the cache (NDJSON output)."""
+    # slow imports, as in run
+    import asyncio
+    from yt_rater.core.warmup import Checkpoint, read_inputs
+
+    cfg = Config()
+    _check_api_keys(cfg)
+    inputs = list(videos or [])
+    if file is not None:
+        lines = sys.stdin if str(file) == "-" else file.read_text(encoding="utf-8").splitlines()
+        inputs += read_inputs(lines)
+    if not inputs and not playlist and not channel:
+        typer.secho("Error: nothing to warm, give videos, --file, --playlist or --channel.", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=2)
+
+    progress = Checkpoint(checkpoint) if checkpoint else None
+    out = open(output, "a", encoding="utf-8") if output else sys.stdout
+    try:
+        summary = asyncio.run(_warm(inputs, playlist, channel, limit, concurrency, progress, out))
+    finally:
+        if progress is not None:
+            progress.close()
+        if output:
+            out.close()
+    if summary.get("quota_exceeded"):
+        raise typer.Exit(code=3)
+
+async def _warm(inputs, playlists, channels, limit, concurrency, checkpoint, out) -> dict:
+    import json
+    from yt_rater.core.server import Server
+    from yt_rater.core.warmup import Warmer, iter_sources
+
+    # same clients, cache and quotas as the server
+    server = Server()
+    warmer = Warmer(server.rater, concurrency, checkpoint)
+    summary: dict = {}
+    try:
+        sources = iter_sources(server.youtube, inputs, playlists, channels, limit)
+        async for record in warmer.run(sources):
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            summary = record.get("summary", summary)
+    finally:
+        await server.rater.aclose()
+    return summary
+
+def _check_api_keys(cfg: Config) -> None:
+    if not cfg.get("youtube", "api_key") or not cfg.get("gemini", "api_key"):
         typer.secho(
             "Error: YouTube API key or Gemini API key not provide.\n"
             "Execute 'yt-rater config' to get config file and edit it.",
@@ -32,10 +100,6 @@ def run(port: int = typer.Option(app_config.get("server", "port"), "--port", "-p
         )
         raise typer.Exit(code=1)
 
-    typer.echo(f"http://localhost:{port}")
-    server = Server(port=port)
-    server.run()
-
 def main():
     app()
 
@@ -1,34 +1,80 @@
 # yt_rater/core/ai.py
-from typing import List
+from typing import Dict, List, Sequence
 import json
 import re
 import logging
 
-from google import genai
+from yt_rater.core.comment_selector import CommentSelector, estimate_tokens
 from yt_rater.core.config import Config
+from yt_rater.core.constants import Constants
 from yt_rater.core.exceptions import MissingAIAPIKeyException
+from yt_rater.core.metrics import AI_FALLBACKS
+from yt_rater.core.ratelimit import RateLimiter, get_limiter
+from yt_rater.core.resilience import CircuitBreaker
+from yt_rater.models.ai_rating import AIRating
+from yt_rater.models.comment import Comment
 
 logger = logging.getLogger(__name__)
-config = Config()
 
 class AIClient:
     """Base of GeminiClient and other AI."""
-    def __init__(self, ai: str , api_key: str | None = None, model: str | None = None):
+    # rough size of a rating answer, used to reserve tokens per minute
+    OUTPUT_TOKENS_PER_VIDEO = 16
+
+    def __init__(
+        self, ai: str , api_key: str | None = None, model: str | None = None,
+        limiter: RateLimiter | None = None,
+    ):
         self.ai = ai
         self._cfg = Config()
+        self.limiter = limiter or get_limiter(ai)
+        self.max_retries = self._cfg.get(ai, "max_retries", Constants.DEFAULT_AI_MAX_RETRIES)
+        self.breaker = CircuitBreaker(
+            ai,
+            failure_threshold=self._cfg.get(
+                ai, "circuit_failure_threshold", Constants.DEFAULT_AI_CIRCUIT_FAILURE_THRESHOLD
+            ),
+            reset_timeout=self._cfg.get(
+                ai, "circuit_reset_seconds", Constants.DEFAULT_AI_CIRCUIT_RESET_SECONDS
+            ),
+        )
+        self.selector = CommentSelector.from_config(ai, self._cfg)
         self.api_key = api_key or self._cfg.get(ai, "api_key")
-        self.model = model or self._cfg.get(ai, "model", default="gemini-2.5-flash-lite")
+        self._model = model
 
         if not self.api_key:
             raise MissingAIAPIKeyException(f"Missing ai API KEY. Configure it with 'yt-rater config'.")
 
-        self.client = genai.Client(api_key=self.api_key)
+        # imported here: google-genai is slow to import and only needed once rating
+        from google import genai
+        from google.genai import types
+
+        # "base_url" points the client at another endpoint (proxy, local stand-in)
+        base_url = self._cfg.get_str(ai, "base_url")
+        self.client = genai.Client(
+            api_key=self.api_key,
+            http_options=types.HttpOptions(base_url=base_url) if base_url else None,
+        )
+
+    @property
+    def model(self) -> str:
+        """Model given at construction, else the one of the config (live)."""
+        return self._model or self._cfg.get_str(self.ai, "model", Constants.DEFAULT_GEMINI_MODEL)
+
+    def _join_comments(
+        self, comments: Sequence[Comment | str], max_comments: int | None = None
+    ) -> str:
+        if max_comments is None:
+            max_comments = self._cfg.get(
+                "youtube", "max_comments_per_video", Constants.DEFAULT_MAX_COMMENTS_PER_VIDEO
+            )
+        selection = self.selector.select(comments, max_comments)
+        return "\n---\n".join(selection.texts)
 
     def _build_prompt(
-        self, comments: List[str], max_comments: int = config.get("youtube", "max_comments_per_video")
+        self, comments: Sequence[Comment | str], max_comments: int | None = None
     ) -> str:
-        comments = comments[:max_comments]
-        joined = "\n---\n".join(c.replace("\n", " ") for c in comments if c.strip())
+        joined = self._join_comments(comments, max_comments)
 
         prompt = (
             "Tu es un assistant qui évalue la pertinence globale d'une vidéo YouTube "
@@ -38,6 +84,16 @@ class AIClient:
         )
         return prompt
 
+    def _fallback(self, reason: str) -> AIRating:
+        """Neutral score returned when the AI could not rate (never cached)."""
+        AI_FALLBACKS.inc()
+        return AIRating(score=Constants.DEFAULT_FALLBACK_SCORE, fallback=True, reason=reason)
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Cheap token estimate (about 4 characters per token)."""
+        return estimate_tokens(text)
+
     def _extract_score(self, text: str) -> float | None:
         """Extract score from ai response."""
         try:
@@ -49,3 +105,44 @@ class AIClient:
         except Exception:
             pass
         return None
+
+    def _build_batch_prompt(
+        self,
+        comments_by_video: Dict[str, Sequence[Comment | str]],
+        max_comments: int | None = None,
+    ) -> str:
+        sections = "\n\n".join(
+            f"### Vidéo {video_id}\n{self._join_comments(comments, max_comments)}"
+            for video_id, comments in comments_by_video.items()
+        )
+        prompt = (
+            "Tu es un assistant qui évalue la pertinence globale de vidéos YouTube "
+            "à partir de leurs commentaires. Pour chaque vidéo ci-dessous, identifiée "
+            "par son ID, donne un nombre flottant compris entre 0.0 et 5.0 avec une "
+            "précision d'au plus deux chiffres après la virgule. Retourne UNIQUEMENT "
+            "une liste JSON d'objets {\"video_id\": ..., \"score\": ...}, un par vidéo.\n"
+            f"Voici les commentaires :\n{sections}"
+        )
+        return prompt
+
+    def _parse_batch_scores(self, text: str, video_ids: List[str]) -> Dict[str, float]:
+        """Parse a batched JSON answer, keeping only known IDs with a valid score."""
+        try:
+            items = json.loads(text)
+        except (TypeError, json.JSONDecodeError):
+            return {}
+        if isinstance(items, dict):
+            items = [{"video_id": k, "score": v} for k, v in items.items()]
+        if not isinstance(items, list):
+            return {}
+
+        scores: Dict[str, float] = {}
+        for item in items:
+            try:
+                video_id = str(item["video_id"])
+                score = float(item["score"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if video_id in video_ids and 0.0 <= score <= 5.0:
+                scores[video_id] = score
+        return scores
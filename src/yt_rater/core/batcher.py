@@ -0,0 +1,81 @@
+# yt_rater/core/batcher.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Sequence, Tuple
+
+from yt_rater.models.ai_rating import AIRating
+from yt_rater.models.comment import Comment
+
+
+class MicroBatcher:
+    """
+    Gather AI ratings requested close together (within window seconds, up to
+    max_size videos) and send them as one batched call.
+    """
+
+    def __init__(
+        self,
+        rate_batch: Callable[
+            [Dict[str, Sequence[Comment | str]]], Dict[str, AIRating | float]
+        ],
+        run_blocking: Callable[..., Awaitable[Any]],
+        window: float,
+        max_size: int,
+    ):
+        self._rate_batch = rate_batch
+        self._run_blocking = run_blocking
+        self.window = window
+        self.max_size = max_size
+        self._pending: Dict[str, Tuple[Sequence[Comment | str], asyncio.Future]] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, video_id: str, comments: Sequence[Comment | str]) -> AIRating | float:
+        """Queue comments of video_id for the next batch and await its score."""
+        loop = asyncio.get_running_loop()
+        if video_id in self._pending:
+            future = self._pending[video_id][1]
+        else:
+            future = loop.create_future()
+            self._pending[video_id] = (comments, future)
+
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(
+        self, batch: Dict[str, Tuple[Sequence[Comment | str], asyncio.Future]]
+    ) -> None:
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            scores = await self._run_blocking(
+                self._rate_batch, {video_id: comments for video_id, (comments, _) in batch.items()}
+            )
+        except Exception as e:
+            for _, future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for video_id, (_, future) in batch.items():
+            if future.done():
+                continue
+            if video_id in scores:
+                future.set_result(scores[video_id])
+            else:
+                future.set_exception(KeyError(f"No score returned for {video_id}"))
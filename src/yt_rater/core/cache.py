@@ -1,63 +1,323 @@
 # yt_rater/core/cache.py
-import json
-from datetime import datetime, timedelta
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Sequence
+from yt_rater.core.cache_backends import (
+    CacheBackend,
+    CacheEntry,
+    JSONCacheBackend,
+    RedisCacheBackend,
+    SQLiteCacheBackend,
+)
 from yt_rater.core.config import Config
 from yt_rater.core.constants import Constants
+from yt_rater.core.exceptions import UnknownCacheBackendException
+from yt_rater.core.fingerprint import CommentFingerprint
+from yt_rater.core.metrics import track
 
 class Cache:
+    """
+    Two-tier rating cache: a bounded in-memory LRU (hot tier) reading
+    through to a persistent backend (SQLite by default, or Redis shared
+    between several instances).
+    """
     CACHE_FILE = Constants.DEFAULT_CACHE_FILE
+    DB_FILE = Constants.DEFAULT_CACHE_DB_FILE
 
-    def __init__(self, expiration_days: int | None = None):
+    def __init__(
+        self,
+        expiration_days: int | None = None,
+        backend: CacheBackend | None = None,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        stale_while_revalidate: bool | None = None,
+        incremental_refresh: bool | None = None,
+    ):
         self._config = Config()
-        self._expiration_days = (
-            expiration_days if expiration_days is not None else self._config.get(
-                "cache", "expiration_days", Constants.DEFAULT_CACHE_EXPIRATION_DAYS
+        # explicit arguments win; otherwise values are read from the config
+        # on use, so a config file change applies without a restart
+        self._expiration_days = expiration_days
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._stale_while_revalidate = stale_while_revalidate
+        self._incremental_refresh = incremental_refresh
+        self._hot: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._hot_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+
+        self._backend = backend or self._create_backend()
+        self._last_purge = 0.0
+        self.purge_expired()
+
+    def _create_backend(self) -> CacheBackend:
+        """Instantiate the backend selected by the "backend" key of [cache]."""
+        name = self._config.get("cache", "backend", Constants.DEFAULT_CACHE_BACKEND)
+        if name == "sqlite":
+            return SQLiteCacheBackend(self.DB_FILE, legacy_file=self.CACHE_FILE)
+        if name == "json":
+            return JSONCacheBackend(self.CACHE_FILE)
+        if name == "redis":
+            return RedisCacheBackend(
+                url=self._config.get_str("cache", "redis_url", Constants.DEFAULT_CACHE_REDIS_URL),
+                prefix=self._config.get_str(
+                    "cache", "redis_prefix", Constants.DEFAULT_CACHE_REDIS_PREFIX
+                ),
             )
+        raise UnknownCacheBackendException(f"Unknown cache backend: {name}")
+
+    @property
+    def ttl(self) -> float:
+        """Entry lifetime in seconds."""
+        if self._expiration_days is not None:
+            return self._expiration_days * 86400
+        return self._config.get_float(
+            "cache", "expiration_days", Constants.DEFAULT_CACHE_EXPIRATION_DAYS
+        ) * 86400
+
+    @property
+    def max_entries(self) -> int:
+        if self._max_entries is not None:
+            return self._max_entries
+        return self._config.get_int(
+            "cache", "memory_max_entries", Constants.DEFAULT_CACHE_MEMORY_MAX_ENTRIES
         )
-        self._data: dict[str, dict] = {}
-        self._ensure_cache_file()
-        self.load()
-
-    def _ensure_cache_file(self) -> None:
-        """Create empty cache file if it not exists."""
-        if not self.CACHE_FILE.parent.exists():
-            self.CACHE_FILE.parent.mkdir(parents=True)
-        if not self.CACHE_FILE.exists():
-            self.save()
-
-    def load(self) -> None:
-        """Load cache from JSON file."""
-        try:
-            with open(self.CACHE_FILE, "r", encoding="utf-8") as f:
-                self._data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            self._data = {}
-
-    def save(self) -> None:
-        """Save cache in JSON file."""
-        with open(self.CACHE_FILE, "w", encoding="utf-8") as f:
-            json.dump(self._data, f, indent=Constants.DEFAULT_INDENT)
-
-    def is_expired(self, url: str) -> bool:
-        entry = self._data.get(url)
+
+    @property
+    def max_bytes(self) -> int:
+        if self._max_bytes is not None:
+            return self._max_bytes
+        return self._config.get_int(
+            "cache", "memory_max_bytes", Constants.DEFAULT_CACHE_MEMORY_MAX_BYTES
+        )
+
+    @property
+    def stale_while_revalidate(self) -> bool:
+        if self._stale_while_revalidate is not None:
+            return bool(self._stale_while_revalidate)
+        return self._config.get_bool("cache", "stale_while_revalidate", False)
+
+    @property
+    def incremental_refresh(self) -> bool:
+        if self._incremental_refresh is not None:
+            return bool(self._incremental_refresh)
+        return self._config.get_bool("cache", "incremental_refresh", True)
+
+    @property
+    def retention(self) -> float:
+        """
+        How long (seconds) an entry is kept: its TTL, plus the stale window when
+        expired entries are still useful (stale serving or incremental refresh).
+        """
+        if self.stale_while_revalidate or self.incremental_refresh:
+            stale_max_days = self._config.get_float(
+                "cache", "stale_max_days", Constants.DEFAULT_CACHE_STALE_MAX_DAYS
+            )
+            return self.ttl + stale_max_days * 86400
+        return self.ttl
+
+    @staticmethod
+    def _sizeof(key: str, entry: CacheEntry) -> int:
+        return sys.getsizeof(key) + sys.getsizeof(entry)
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        """Insert entry in the hot tier and evict least recently used ones."""
+        with self._lock:
+            previous = self._hot.pop(key, None)
+            if previous is not None:
+                self._hot_bytes -= self._sizeof(key, previous)
+            self._hot[key] = entry
+            self._hot_bytes += self._sizeof(key, entry)
+
+            max_entries, max_bytes = self.max_entries, self.max_bytes
+            while self._hot and (
+                (max_entries and len(self._hot) > max_entries)
+                or (max_bytes and self._hot_bytes > max_bytes)
+            ):
+                old_key, old_entry = self._hot.popitem(last=False)
+                self._hot_bytes -= self._sizeof(old_key, old_entry)
+                self.evictions += 1
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            entry = self._hot.pop(key, None)
+            if entry is not None:
+                self._hot_bytes -= self._sizeof(key, entry)
+
+    def _lookup(self, key: str) -> CacheEntry | None:
+        """Return the entry of key from memory, or from disk on a memory miss."""
+        with self._lock:
+            entry = self._hot.get(key)
+            if entry is not None:
+                self._hot.move_to_end(key)
+                return entry
+
+        entry = self._backend.get(key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def purge_expired(self) -> int:
+        """Remove expired entries from memory and from the backend."""
+        self._last_purge = time.time()
+        cutoff = self._last_purge - self.retention
+        with self._lock:
+            expired = [key for key, entry in self._hot.items() if entry.updated_at < cutoff]
+        for key in expired:
+            self._forget(key)
+        return self._backend.purge(cutoff)
+
+    def is_expired(self, video_id: str) -> bool:
+        entry = self._lookup(video_id)
         if not entry:
             return True
-        last_updated = datetime.fromisoformat(entry["last_updated"])
-        return datetime.now() - last_updated > timedelta(days=self._expiration_days)
+        return time.time() - entry.updated_at > self.ttl
+
+    def is_stale(self, entry: CacheEntry) -> bool:
+        """Return True if entry is past its TTL."""
+        return time.time() - entry.updated_at > self.ttl
+
+    def get_entry(self, video_id: str, allow_stale: bool = False) -> CacheEntry | None:
+        """
+        Return the entry of video_id if it has not expired. With allow_stale,
+        expired entries still inside the retention window are returned too.
+        """
+        in_memory = video_id in self._hot
+        with track("cache_lookup"):
+            entry = self._lookup(video_id)
+        return self._check(entry, in_memory, allow_stale)
+
+    def get_memory_entries(
+        self, video_ids: Sequence[str], allow_stale: bool = False
+    ) -> Dict[str, CacheEntry]:
+        """
+        get_entries from the memory tier only: no backend I/O, so it can run
+        on the event loop. Lookups not answered here are not counted.
+        """
+        entries = {}
+        with self._lock:
+            for key in dict.fromkeys(video_ids):
+                entry = self._hot.get(key)
+                if entry is not None and self._usable(entry, allow_stale):
+                    self._hot.move_to_end(key)
+                    entries[key] = entry
+        for entry in entries.values():
+            self._check(entry, True, allow_stale)
+        return entries
+
+    def get_entries(
+        self, video_ids: Sequence[str], allow_stale: bool = False
+    ) -> Dict[str, CacheEntry]:
+        """
+        get_entry for many videos: memory misses are read from the backend in
+        one round trip. Videos without a usable entry are left out.
+        """
+        keys = list(dict.fromkeys(video_ids))
+        with track("cache_lookup"):
+            with self._lock:
+                in_memory = {key: self._hot[key] for key in keys if key in self._hot}
+                for key in in_memory:
+                    self._hot.move_to_end(key)
+            missing = [key for key in keys if key not in in_memory]
+            loaded = self._backend.get_many(missing) if missing else {}
+        for key, entry in loaded.items():
+            self._remember(key, entry)
+
+        entries = {}
+        for key in keys:
+            entry = in_memory.get(key) or loaded.get(key)
+            entry = self._check(entry, key in in_memory, allow_stale)
+            if entry is not None:
+                entries[key] = entry
+        return entries
+
+    def _usable(self, entry: CacheEntry, allow_stale: bool) -> bool:
+        age = time.time() - entry.updated_at
+        return age <= self.retention and (age <= self.ttl or allow_stale)
 
-    def get(self, url: str) -> float | None:
-        """Return the score of url if it exists and has not expired."""
-        if self.is_expired(url):
+    def _check(
+        self, entry: CacheEntry | None, in_memory: bool, allow_stale: bool
+    ) -> CacheEntry | None:
+        """Return entry if it is usable, counting the lookup in the stats."""
+        if entry is None or not self._usable(entry, allow_stale):
+            self.misses += 1
             return None
-        return self._data[url]["score"]
+        if self.is_stale(entry):
+            self.stale_hits += 1
+        elif in_memory:
+            self.hits += 1
+        else:
+            self.disk_hits += 1
+        return entry
 
-    def set(self, url: str, score: float) -> None:
-        self._data[url] = {
-            "score": score,
-            "last_updated": datetime.now().isoformat()
+    def get(self, video_id: str) -> float | None:
+        """Return the score of video_id if it exists and has not expired."""
+        entry = self.get_entry(video_id)
+        return entry.score if entry is not None else None
+
+    def peek(self, video_id: str) -> CacheEntry | None:
+        """
+        Return the stored entry of video_id with its comment fingerprint,
+        expired or not (fingerprints are only kept on disk).
+        """
+        return self._backend.get(video_id)
+
+    def reload(self, video_id: str) -> CacheEntry | None:
+        """
+        Re-read video_id from the backend into memory, e.g. after another
+        instance sharing the backend rated it.
+        """
+        entry = self._backend.get(video_id)
+        if entry is None:
+            self._forget(video_id)
+        else:
+            self._remember(video_id, entry)
+        return entry
+
+    def set(
+        self, video_id: str, score: float, fingerprint: CommentFingerprint | None = None
+    ) -> CacheEntry:
+        now = time.time()
+        with track("cache_write"):
+            self._backend.set(video_id, CacheEntry(score, now, fingerprint), ttl=self.retention)
+        entry = CacheEntry(score, now)
+        self._remember(video_id, entry)
+        if now - self._last_purge > Constants.DEFAULT_CACHE_PURGE_INTERVAL:
+            self.purge_expired()
+        return entry
+
+    def touch(self, video_id: str) -> CacheEntry | None:
+        """Extend the TTL of video_id, keeping its score and fingerprint."""
+        stored = self._backend.get(video_id)
+        if stored is None:
+            return None
+        return self.set(video_id, stored.score, stored.fingerprint)
+
+    def close(self) -> None:
+        self._backend.close()
+
+    @property
+    def backend(self) -> CacheBackend:
+        return self._backend
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "stale_hits": self.stale_hits,
+            "evictions": self.evictions,
+            "memory_entries": len(self._hot),
+            "memory_bytes": self._hot_bytes,
         }
-        self.save()
 
     @property
     def data(self) -> dict:
-        return self._data
+        return {key: entry.to_dict() for key, entry in self._backend.items()}
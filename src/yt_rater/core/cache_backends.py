@@ -0,0 +1,431 @@
+# yt_rater/core/cache_backends.py
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Sequence, Tuple
+
+from yt_rater.core.constants import Constants
+from yt_rater.core.exceptions import InvalidURLException, MissingDependencyException
+from yt_rater.core.fingerprint import CommentFingerprint
+from yt_rater.core.video import extract_video_id
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry:
+    """
+    A stored rating: score + epoch timestamp of the last update, and
+    optionally the fingerprint of the comments it was computed from.
+    """
+    __slots__ = ("score", "updated_at", "fingerprint")
+
+    def __init__(
+        self, score: float, updated_at: float, fingerprint: CommentFingerprint | None = None
+    ):
+        self.score = score
+        self.updated_at = updated_at
+        self.fingerprint = fingerprint
+
+    @property
+    def last_updated(self) -> datetime:
+        return datetime.fromtimestamp(self.updated_at)
+
+    def to_dict(self) -> dict:
+        data: dict = {"score": self.score, "last_updated": self.last_updated.isoformat()}
+        if self.fingerprint is not None:
+            data["fingerprint"] = self.fingerprint.to_dict()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CacheEntry":
+        updated_at = datetime.fromisoformat(data["last_updated"]).timestamp()
+        fingerprint = data.get("fingerprint")
+        return cls(
+            float(data["score"]),
+            updated_at,
+            CommentFingerprint.from_dict(fingerprint) if fingerprint else None,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CacheEntry):
+            return NotImplemented
+        return self.score == other.score and self.updated_at == other.updated_at
+
+    def __repr__(self) -> str:
+        return f"CacheEntry(score={self.score!r}, updated_at={self.updated_at!r})"
+
+
+class CacheBackend(ABC):
+    """Persistent storage behind Cache, keyed by canonical video ID."""
+
+    @abstractmethod
+    def get(self, key: str) -> CacheEntry | None:
+        """Return the stored entry for key, expired or not."""
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, CacheEntry]:
+        """Return the stored entries of keys (missing keys are left out)."""
+        entries = {}
+        for key in keys:
+            entry = self.get(key)
+            if entry is not None:
+                entries[key] = entry
+        return entries
+
+    @abstractmethod
+    def set(self, key: str, entry: CacheEntry, ttl: float | None = None) -> None:
+        """
+        Insert or replace the entry for key. ttl (seconds after
+        entry.updated_at) is how long it must be kept at least; backends with
+        native expiry drop it afterwards, the others rely on purge.
+        """
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove the entry for key if it exists."""
+
+    @abstractmethod
+    def purge(self, older_than: float) -> int:
+        """Remove entries updated before older_than (epoch), return their count."""
+
+    @abstractmethod
+    def items(self) -> Iterator[Tuple[str, CacheEntry]]:
+        """Iterate over every stored entry."""
+
+    def close(self) -> None:
+        """Release resources held by the backend."""
+
+
+class JSONCacheBackend(CacheBackend):
+    """Whole-file JSON storage (the historical cache.json format)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._data: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.load()
+
+    def load(self) -> None:
+        """Load cache from JSON file."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._data = json.load(f)
+        except FileNotFoundError:
+            self._data = {}
+            self.save()
+        except json.JSONDecodeError:
+            logger.warning(f"JSONCacheBackend: {self.path} is corrupted, starting empty")
+            self._data = {}
+
+    def save(self) -> None:
+        """Save cache in JSON file (written to a temporary file, then renamed)."""
+        with self._lock:
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, indent=Constants.DEFAULT_INDENT)
+            os.replace(tmp, self.path)
+
+    def get(self, key: str) -> CacheEntry | None:
+        data = self._data.get(key)
+        return CacheEntry.from_dict(data) if data else None
+
+    def set(self, key: str, entry: CacheEntry, ttl: float | None = None) -> None:
+        with self._lock:
+            self._data[key] = entry.to_dict()
+        self.save()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            removed = self._data.pop(key, None)
+        if removed is not None:
+            self.save()
+
+    def purge(self, older_than: float) -> int:
+        expired = [key for key, entry in self.items() if entry.updated_at < older_than]
+        with self._lock:
+            for key in expired:
+                del self._data[key]
+        if expired:
+            self.save()
+        return len(expired)
+
+    def items(self) -> Iterator[Tuple[str, CacheEntry]]:
+        for key, data in list(self._data.items()):
+            yield key, CacheEntry.from_dict(data)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    SQLite storage in WAL mode: one indexed row per video, so a write costs
+    O(log n) instead of rewriting the whole file, and is crash-safe.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS ratings ("
+        " video_id TEXT PRIMARY KEY,"
+        " score REAL NOT NULL,"
+        " updated_at REAL NOT NULL"
+        ")",
+        "CREATE INDEX IF NOT EXISTS idx_ratings_updated_at ON ratings (updated_at)",
+    )
+    # columns added after the first release, created on open if missing
+    EXTRA_COLUMNS = {
+        "comment_ids": "TEXT",
+        "content_hash": "TEXT",
+        "last_published": "REAL",
+    }
+    COLUMNS = "score, updated_at, comment_ids, content_hash, last_published"
+    # bound parameters per query (SQLite's historical limit is 999)
+    MAX_QUERY_PARAMETERS = 500
+
+    def __init__(self, path: Path, legacy_file: Path | None = None):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Shared between the event loop and executor threads, guarded by _lock.
+        self._conn = sqlite3.connect(
+            str(self.path), check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in self.SCHEMA:
+            self._conn.execute(statement)
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(ratings)")}
+        for column, kind in self.EXTRA_COLUMNS.items():
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE ratings ADD COLUMN {column} {kind}")
+        if legacy_file is not None and legacy_file.exists():
+            self.migrate_json(legacy_file)
+
+    def migrate_json(self, legacy_file: Path) -> int:
+        """
+        Import a legacy cache.json (keyed by raw URL) once, then rename it
+        so the migration does not run again.
+        """
+        try:
+            with open(legacy_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"SQLiteCacheBackend: can't migrate {legacy_file}: {e}")
+            return 0
+
+        rows = []
+        for url, value in data.items():
+            try:
+                key = extract_video_id(url)
+                entry = CacheEntry.from_dict(value)
+            except (InvalidURLException, KeyError, TypeError, ValueError):
+                continue
+            rows.append((key, entry.score, entry.updated_at))
+
+        with self._lock:
+            # several URLs may map to the same video: keep the most recent
+            self._conn.executemany(
+                "INSERT INTO ratings (video_id, score, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(video_id) DO UPDATE SET "
+                "score = excluded.score, updated_at = excluded.updated_at "
+                "WHERE excluded.updated_at > ratings.updated_at",
+                rows,
+            )
+        legacy_file.rename(legacy_file.with_name(legacy_file.name + ".migrated"))
+        logger.info(f"SQLiteCacheBackend: migrated {len(rows)} entries from {legacy_file}")
+        return len(rows)
+
+    @staticmethod
+    def _entry(row: tuple) -> CacheEntry:
+        score, updated_at, comment_ids, content_hash, last_published = row
+        fingerprint = None
+        if comment_ids is not None:
+            fingerprint = CommentFingerprint(
+                tuple(json.loads(comment_ids)), content_hash, last_published or 0.0
+            )
+        return CacheEntry(score, updated_at, fingerprint)
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {self.COLUMNS} FROM ratings WHERE video_id = ?", (key,)
+            ).fetchone()
+        return self._entry(row) if row else None
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, CacheEntry]:
+        entries = {}
+        step = self.MAX_QUERY_PARAMETERS
+        for start in range(0, len(keys), step):
+            chunk = list(keys[start:start + step])
+            placeholders = ", ".join("?" * len(chunk))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT video_id, {self.COLUMNS} FROM ratings "
+                    f"WHERE video_id IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+            for row in rows:
+                entries[row[0]] = self._entry(row[1:])
+        return entries
+
+    def set(self, key: str, entry: CacheEntry, ttl: float | None = None) -> None:
+        fingerprint = entry.fingerprint
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO ratings (video_id, {self.COLUMNS}) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    entry.score,
+                    entry.updated_at,
+                    json.dumps(list(fingerprint.ids)) if fingerprint else None,
+                    fingerprint.content_hash if fingerprint else None,
+                    fingerprint.last_published if fingerprint else None,
+                ),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM ratings WHERE video_id = ?", (key,))
+
+    def purge(self, older_than: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM ratings WHERE updated_at < ?", (older_than,)
+            )
+        return cursor.rowcount
+
+    def items(self) -> Iterator[Tuple[str, CacheEntry]]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT video_id, {self.COLUMNS} FROM ratings"
+            ).fetchall()
+        for row in rows:
+            yield row[0], self._entry(row[1:])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Storage on a Redis server shared by several yt-rater instances, so a
+    video rated by one node is a hit for all. Entries are JSON strings
+    expiring natively, batch lookups take one pipelined round trip, and a
+    per-video lock lets one node rate a video while the others wait.
+    Needs the "redis" package (pip install yt-rater[redis]).
+    """
+
+    def __init__(
+        self,
+        url: str = Constants.DEFAULT_CACHE_REDIS_URL,
+        prefix: str = Constants.DEFAULT_CACHE_REDIS_PREFIX,
+        client: Any = None,
+    ):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise MissingDependencyException(
+                    "The redis cache backend needs the redis package: pip install redis"
+                )
+            client = redis.Redis.from_url(url)
+        self._client = client
+        self.prefix = prefix
+
+    def _name(self, key: str) -> str:
+        return f"{self.prefix}rating:{key}"
+
+    def _lock_name(self, key: str) -> str:
+        return f"{self.prefix}lock:{key}"
+
+    @staticmethod
+    def _text(value: bytes | str) -> str:
+        return value.decode() if isinstance(value, bytes) else value
+
+    @staticmethod
+    def _entry(value: bytes | str | None) -> CacheEntry | None:
+        if value is None:
+            return None
+        try:
+            return CacheEntry.from_dict(json.loads(value))
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"RedisCacheBackend: ignoring invalid entry: {e}")
+            return None
+
+    @staticmethod
+    def _dump(entry: CacheEntry) -> str:
+        return json.dumps(entry.to_dict())
+
+    def get(self, key: str) -> CacheEntry | None:
+        return self._entry(self._client.get(self._name(key)))
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, CacheEntry]:
+        # a pipeline rather than MGET: keys may live on different cluster slots
+        pipe = self._client.pipeline(transaction=False)
+        for key in keys:
+            pipe.get(self._name(key))
+        entries = {}
+        for key, value in zip(keys, pipe.execute()):
+            entry = self._entry(value)
+            if entry is not None:
+                entries[key] = entry
+        return entries
+
+    def set(self, key: str, entry: CacheEntry, ttl: float | None = None) -> None:
+        expire_ms = None
+        if ttl:
+            expire_ms = max(1, int((entry.updated_at + ttl - time.time()) * 1000))
+        self._client.set(self._name(key), self._dump(entry), px=expire_ms)
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self._name(key))
+
+    def purge(self, older_than: float) -> int:
+        # entries expire on their own (set with a TTL)
+        return 0
+
+    def items(self) -> Iterator[Tuple[str, CacheEntry]]:
+        start = len(self._name(""))
+        names = self._client.scan_iter(match=self._name("*"), count=500)
+        keys = [self._text(name)[start:] for name in names]
+        yield from self.get_many(keys).items()
+
+    def acquire_lock(self, key: str, timeout: float) -> str | None:
+        """
+        Take the lock of key for at most timeout seconds. Return the token
+        needed to release it, or None if another holder has it.
+        """
+        token = uuid.uuid4().hex
+        if self._client.set(self._lock_name(key), token, nx=True, px=int(timeout * 1000)):
+            return token
+        return None
+
+    def release_lock(self, key: str, token: str) -> None:
+        """Release the lock of key if it is still held with token."""
+        import redis
+
+        name = self._lock_name(key)
+        with self._client.pipeline() as pipe:
+            try:
+                # compare-and-delete: never drop a lock that expired and was retaken
+                pipe.watch(name)
+                value = pipe.get(name)
+                if value is not None and self._text(value) == token:
+                    pipe.multi()
+                    pipe.delete(name)
+                    pipe.execute()
+                else:
+                    pipe.unwatch()
+            except redis.WatchError:
+                pass
+
+    def is_locked(self, key: str) -> bool:
+        return bool(self._client.exists(self._lock_name(key)))
+
+    def close(self) -> None:
+        self._client.close()
@@ -0,0 +1,215 @@
+# yt_rater/core/comment_selector.py
+import logging
+import re
+import threading
+from typing import Dict, FrozenSet, List, Sequence
+
+from yt_rater.core.config import Config
+from yt_rater.core.constants import Constants
+from yt_rater.models.comment import Comment
+
+logger = logging.getLogger(__name__)
+
+# characters per shingle used for near-duplicate detection
+SHINGLE_SIZE = 5
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (about 4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+def _normalize(text: str) -> str:
+    """Lowercase, drop punctuation/emoji and collapse whitespace."""
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+def _shingles(normalized: str) -> FrozenSet[str]:
+    if len(normalized) <= SHINGLE_SIZE:
+        return frozenset([normalized])
+    return frozenset(
+        normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)
+    )
+
+
+def _jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    return len(a & b) / len(a | b)
+
+
+def _near(a: FrozenSet[str], b: FrozenSet[str], threshold: float) -> bool:
+    # Jaccard <= min/max size: most pairs are told apart without a set operation
+    if min(len(a), len(b)) < threshold * max(len(a), len(b)):
+        return False
+    return _jaccard(a, b) >= threshold
+
+
+class Selection:
+    """Comments kept for a prompt and what they cost compared to the naive prompt."""
+    __slots__ = ("texts", "dropped", "tokens_before", "tokens_after")
+
+    def __init__(
+        self, texts: List[str], dropped: Dict[str, int], tokens_before: int, tokens_after: int
+    ):
+        self.texts = texts
+        self.dropped = dropped
+        self.tokens_before = tokens_before
+        self.tokens_after = tokens_after
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.tokens_before - self.tokens_after)
+
+
+class CommentSelector:
+    """
+    Choose which comments go into a rating prompt: drop short/emoji-only
+    comments and exact or near duplicates (shingle Jaccard), rank the rest by
+    likes and replies, then keep as many as fit in the token budget.
+    Settings not given at construction are read from the config on each
+    selection.
+    """
+
+    def __init__(
+        self,
+        token_budget: int | None = None,
+        min_chars: int | None = None,
+        duplicate_similarity: float | None = None,
+        max_candidates: int | None = None,
+        section: str = "gemini",
+        config: Config | None = None,
+    ):
+        # None: read from the [section] of the config on each selection, so
+        # edits of config.toml apply without a restart
+        self._token_budget = token_budget
+        self._min_chars = min_chars
+        self._duplicate_similarity = duplicate_similarity
+        self._max_candidates = max_candidates
+        self.section = section
+        self._cfg = config or Config()
+        self._lock = threading.Lock()
+        self.selections = 0
+        self.comments_in = 0
+        self.comments_kept = 0
+        self.tokens_saved = 0
+
+    @classmethod
+    def from_config(cls, section: str, config: Config) -> "CommentSelector":
+        return cls(section=section, config=config)
+
+    @property
+    def token_budget(self) -> int:
+        if self._token_budget is not None:
+            return self._token_budget
+        return self._cfg.get_int(
+            self.section, "prompt_token_budget", Constants.DEFAULT_PROMPT_TOKEN_BUDGET
+        )
+
+    @property
+    def min_chars(self) -> int:
+        if self._min_chars is not None:
+            return self._min_chars
+        return self._cfg.get_int(
+            self.section, "min_comment_chars", Constants.DEFAULT_PROMPT_MIN_COMMENT_CHARS
+        )
+
+    @property
+    def duplicate_similarity(self) -> float:
+        if self._duplicate_similarity is not None:
+            return self._duplicate_similarity
+        return self._cfg.get_float(
+            self.section, "duplicate_similarity", Constants.DEFAULT_PROMPT_DUPLICATE_SIMILARITY
+        )
+
+    @property
+    def max_candidates(self) -> int:
+        """Comments considered at most (0: all): near-duplicate checks are quadratic."""
+        if self._max_candidates is not None:
+            return self._max_candidates
+        return self._cfg.get_int(
+            self.section, "max_candidate_comments", Constants.DEFAULT_PROMPT_MAX_CANDIDATES
+        )
+
+    @staticmethod
+    def _clean(text: str) -> str:
+        return text.replace("\n", " ").strip()
+
+    @staticmethod
+    def _cost(text: str) -> int:
+        # separator "\n---\n" between comments is about one token
+        return estimate_tokens(text) + 1
+
+    def _naive_tokens(self, comments: Sequence[Comment | str], max_comments: int) -> int:
+        """Tokens of the prompt built without selection (first max_comments)."""
+        texts = [c.text if isinstance(c, Comment) else c for c in comments[:max_comments]]
+        return sum(self._cost(self._clean(t)) for t in texts if t.strip())
+
+    def select(self, comments: Sequence[Comment | str], max_comments: int) -> Selection:
+        """Select at most max_comments comments within the token budget."""
+        token_budget, min_chars = self.token_budget, self.min_chars
+        similarity, max_candidates = self.duplicate_similarity, self.max_candidates
+        candidates = [c if isinstance(c, Comment) else Comment(text=c) for c in comments]
+        dropped = {"short": 0, "duplicate": 0, "capped": 0, "budget": 0}
+
+        # API order is relevance order: the first candidates are worth the most
+        if max_candidates and len(candidates) > max_candidates:
+            dropped["capped"] = len(candidates) - max_candidates
+            candidates = candidates[:max_candidates]
+
+        # filter short and duplicate comments, in API order
+        unique: List[Comment] = []
+        seen: set[str] = set()
+        kept_shingles: List[FrozenSet[str]] = []
+        for comment in candidates:
+            normalized = _normalize(comment.text)
+            if sum(ch.isalnum() for ch in normalized) < min_chars:
+                dropped["short"] += 1
+                continue
+            if normalized in seen:
+                dropped["duplicate"] += 1
+                continue
+            shingles = _shingles(normalized)
+            if similarity < 1.0 and any(
+                _near(shingles, other, similarity) for other in kept_shingles
+            ):
+                dropped["duplicate"] += 1
+                continue
+            seen.add(normalized)
+            kept_shingles.append(shingles)
+            unique.append(comment)
+
+        # most liked / discussed first (stable: ties keep API order)
+        unique.sort(key=lambda c: c.like_count + c.reply_count, reverse=True)
+
+        texts: List[str] = []
+        used = 0
+        for comment in unique:
+            if len(texts) >= max_comments:
+                break
+            text = self._clean(comment.text)
+            cost = self._cost(text)
+            if token_budget and used + cost > token_budget:
+                dropped["budget"] += 1
+                continue
+            texts.append(text)
+            used += cost
+
+        selection = Selection(texts, dropped, self._naive_tokens(comments, max_comments), used)
+        with self._lock:
+            self.selections += 1
+            self.comments_in += len(candidates)
+            self.comments_kept += len(texts)
+            self.tokens_saved += selection.tokens_saved
+        logger.info(
+            f"CommentSelector: kept {len(texts)}/{len(candidates)} comments "
+            f"({dropped}), {selection.tokens_after} prompt tokens, saved {selection.tokens_saved}"
+        )
+        return selection
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "selections": self.selections,
+            "comments_in": self.comments_in,
+            "comments_kept": self.comments_kept,
+            "tokens_saved": self.tokens_saved,
+        }
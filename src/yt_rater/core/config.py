@@ -1,48 +1,175 @@
 # yt_rater/core/config.py
+import copy
+import logging
+import os
+import threading
+import time
 import tomllib
 import tomli_w
-from typing import Any, Dict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
 from yt_rater.core.constants import Constants
 
+logger = logging.getLogger(__name__)
+
+
 class Config:
+    """
+    Process-wide configuration: one shared instance per config file, loaded
+    once and reloaded when the file changes on disk (checked at most every
+    RELOAD_CHECK_INTERVAL seconds), so limits, TTLs and model names can be
+    changed without restarting.
+    """
     CONFIG_DIR = Constants.DEFAULT_DIR
     CONFIG_FILE = Constants.DEFAULT_CONFIG_FILE
+    # seconds between two checks of the config file modification time
+    RELOAD_CHECK_INTERVAL = 1.0
+
+    _instances: Dict[Path, "Config"] = {}
+    _instances_lock = threading.Lock()
+
+    def __new__(cls) -> "Config":
+        with cls._instances_lock:
+            instance = cls._instances.get(cls.CONFIG_FILE)
+            if instance is None:
+                instance = super().__new__(cls)
+                instance._initialized = False
+                cls._instances[cls.CONFIG_FILE] = instance
+            return instance
 
     def __init__(self) -> None:
+        if self._initialized:
+            # Config() on the shared instance: make sure it is up to date
+            self._ensure_config_file()
+            self.reload_if_changed(force=True)
+            return
+        # bind the instance to the file it was created for
+        self.CONFIG_DIR = type(self).CONFIG_DIR
+        self.CONFIG_FILE = type(self).CONFIG_FILE
         self._config: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        self._signature: Tuple[int, int] | None = None
+        self._checked_at = time.monotonic()
+        self._listeners: List[Callable[["Config"], None]] = []
         self._ensure_config_file()
         self.load()
+        self._initialized = True
 
     def _ensure_config_file(self) -> None:
         """Create the folder + the config file if it does not exist."""
         if not self.CONFIG_DIR.exists():
             self.CONFIG_DIR.mkdir(parents=True)
         if not self.CONFIG_FILE.exists():
-            self.save(Constants.DEFAULT_CONFIG)
+            self.save(self._config or copy.deepcopy(Constants.DEFAULT_CONFIG))
+
+    def _file_signature(self) -> Tuple[int, int] | None:
+        try:
+            stat = os.stat(self.CONFIG_FILE)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
 
     def load(self) -> None:
         """Load config from TOML file."""
-        with open(self.CONFIG_FILE, "rb") as f:
-            self._config = tomllib.load(f)
+        with self._lock:
+            with open(self.CONFIG_FILE, "rb") as f:
+                self._config = tomllib.load(f)
+            self._signature = self._file_signature()
+
+    def reload_if_changed(self, force: bool = False) -> bool:
+        """
+        Reload the file if it changed since last load. Unless force, the
+        file is checked at most every RELOAD_CHECK_INTERVAL seconds.
+        """
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.RELOAD_CHECK_INTERVAL:
+            return False
+        with self._lock:
+            self._checked_at = now
+            signature = self._file_signature()
+            if signature is None or signature == self._signature:
+                return False
+            try:
+                self.load()
+            except (OSError, tomllib.TOMLDecodeError) as e:
+                # e.g. file being written by an editor: keep the current values
+                logger.warning(f"Config: can't reload {self.CONFIG_FILE}: {e}")
+                self._signature = signature
+                return False
+        logger.info(f"Config: reloaded {self.CONFIG_FILE}")
+        self._notify()
+        return True
 
     def save(self, config: Dict[str, Any] | None = None) -> None:
         """Save config in TOML file."""
-        if config is not None:
-            self._config = config
-        with open(self.CONFIG_FILE, "wb") as f:
-            tomli_w.dump(self._config, f)
+        with self._lock:
+            if config is not None:
+                self._config = config
+            with open(self.CONFIG_FILE, "wb") as f:
+                tomli_w.dump(self._config, f)
+            self._signature = self._file_signature()
+
+    def on_reload(self, callback: Callable[["Config"], None]) -> None:
+        """Call callback(config) each time this config is reloaded or set."""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def _notify(self) -> None:
+        for callback in list(self._listeners):
+            try:
+                callback(self)
+            except Exception as e:
+                logger.warning(f"Config: reload listener failed: {e}")
 
     def get(self, section: str, key: str, default=None) -> Any:
+        self.reload_if_changed()
         if section not in self._config:
             return default
         return self._config[section].get(key, default)
 
+    def _typed(self, section: str, key: str, default: Any, kind: Callable[[Any], Any]) -> Any:
+        value = self.get(section, key, default)
+        try:
+            return kind(value)
+        except (TypeError, ValueError):
+            logger.warning(f"Config: invalid {section}.{key} = {value!r}, using {default!r}")
+            return default
+
+    def get_int(self, section: str, key: str, default: int = 0) -> int:
+        return self._typed(section, key, default, int)
+
+    def get_float(self, section: str, key: str, default: float = 0.0) -> float:
+        return self._typed(section, key, default, float)
+
+    def get_str(self, section: str, key: str, default: str = "") -> str:
+        return self._typed(section, key, default, str)
+
+    def get_bool(self, section: str, key: str, default: bool = False) -> bool:
+        def to_bool(value: Any) -> bool:
+            if isinstance(value, str):
+                if value.strip().lower() in ("1", "true", "yes", "on"):
+                    return True
+                if value.strip().lower() in ("0", "false", "no", "off", ""):
+                    return False
+                raise ValueError(value)
+            return bool(value)
+
+        return self._typed(section, key, default, to_bool)
+
     def set(self, section: str, key: str, value: Any) -> None:
-        if section not in self._config:
-            self._config[section] = {}
-        self._config[section][key] = value
-        self.save(self._config)
+        with self._lock:
+            if section not in self._config:
+                self._config[section] = {}
+            self._config[section][key] = value
+            self.save(self._config)
+        self._notify()
 
     @property
     def data(self) -> Dict[str, Any]:
         return self._config
+
+    @classmethod
+    def reset(cls) -> None:
+        """Forget the shared instances (next Config() reloads from disk)."""
+        with cls._instances_lock:
+            cls._instances.clear()
@@ -6,27 +6,151 @@ class Constants:
     DEFAULT_FOLDER_NAME = ".yt_rater"
     DEFAULT_CONFIG_FILE_NAME = "config.toml"
     DEFAULT_CACHE_FILE_NAME = "cache.json"
+    DEFAULT_CACHE_DB_FILE_NAME = "cache.sqlite3"
     DEFAULT_CACHE_EXPIRATION_DAYS = 7
+    DEFAULT_CACHE_BACKEND = "sqlite"
+    DEFAULT_CACHE_PURGE_INTERVAL = 3600
+    DEFAULT_CACHE_MEMORY_MAX_ENTRIES = 10000
+    DEFAULT_CACHE_MEMORY_MAX_BYTES = 0
+    DEFAULT_CACHE_STALE_MAX_DAYS = 30
+    DEFAULT_CACHE_RERATE_SIMILARITY = 0.9
+    DEFAULT_CACHE_REDIS_URL = "redis://localhost:6379/0"
+    DEFAULT_CACHE_REDIS_PREFIX = "yt_rater:"
+    DEFAULT_CACHE_LOCK_TIMEOUT_SECONDS = 60
+    DEFAULT_CACHE_LOCK_WAIT_SECONDS = 30
+    DEFAULT_SERVER_MAX_BACKGROUND_REFRESHES = 2
+    DEFAULT_SERVER_BATCH_CONCURRENCY = 4
+    DEFAULT_BATCH_MAX_ITEMS = 50
+    DEFAULT_SERVER_MAX_PENDING_JOBS = 1000
+    DEFAULT_SERVER_JOB_RETENTION_SECONDS = 600
+    DEFAULT_SERVER_RATING_SLOTS = 0
+    DEFAULT_SERVER_RESERVED_INTERACTIVE_SLOTS = 1
+    DEFAULT_SERVER_PREFETCH_AGING_SECONDS = 10
+    DEFAULT_GEMINI_MODEL = "gemini-2.5-flash-lite"
+    DEFAULT_GEMINI_BATCH_MAX_SIZE = 8
+    DEFAULT_GEMINI_BATCH_WINDOW_MS = 25
+    DEFAULT_GEMINI_MAX_OUTPUT_TOKENS = 8
+    DEFAULT_GEMINI_THINKING_BUDGET = 0
     DEFAULT_INDENT = 4
     DEFAULT_SERVER_PORT = 8888
+    DEFAULT_SERVER_MAX_WORKERS = 8
     DEFAULT_MAX_COMMENTS_PER_VIDEO = 50
+    YOUTUBE_COMMENT_THREADS_MAX_RESULTS = 100
+    YOUTUBE_VIDEOS_LIST_MAX_IDS = 50
+    YOUTUBE_PLAYLIST_ITEMS_MAX_RESULTS = 50
+    DEFAULT_WARM_CONCURRENCY = 4
+    DEFAULT_WARM_MAX_QUOTA_WAIT_SECONDS = 60
+    DEFAULT_YOUTUBE_UNITS_PER_DAY = 10000
+    DEFAULT_YOUTUBE_BACKEND = "http"
+    DEFAULT_YOUTUBE_HTTP_TIMEOUT_SECONDS = 10
+    DEFAULT_YOUTUBE_MAX_CONNECTIONS = 10
+    DEFAULT_YOUTUBE_KEEPALIVE_SECONDS = 30
+    DEFAULT_GEMINI_REQUESTS_PER_MINUTE = 15
+    DEFAULT_GEMINI_TOKENS_PER_MINUTE = 250000
+    # a quota wait sleeps in a worker thread: answer 429 with Retry-After instead
+    DEFAULT_MAX_QUOTA_WAIT_SECONDS = 0
+    DEFAULT_MIN_BACKOFF_SECONDS = 1
+    DEFAULT_MAX_BACKOFF_SECONDS = 60
+    DEFAULT_FALLBACK_SCORE = 2.5
+    DEFAULT_AI_MAX_RETRIES = 2
+    DEFAULT_AI_RETRY_BASE_DELAY = 0.5
+    DEFAULT_AI_RETRY_MAX_DELAY = 1
+    # retries sleep in a worker thread: bounded, the breaker handles outages
+    DEFAULT_AI_RETRY_MAX_TOTAL_DELAY = 2
+    DEFAULT_AI_CIRCUIT_FAILURE_THRESHOLD = 5
+    DEFAULT_AI_CIRCUIT_RESET_SECONDS = 30
+    DEFAULT_PROMPT_TOKEN_BUDGET = 2000
+    DEFAULT_PROMPT_MIN_COMMENT_CHARS = 3
+    DEFAULT_PROMPT_DUPLICATE_SIMILARITY = 0.8
+    DEFAULT_PROMPT_MAX_CANDIDATES = 200
+    DEFAULT_ROUTER_HEDGE_PERCENTILE = 95
+    DEFAULT_ROUTER_HEDGE_DELAY_MS = 2000
+    DEFAULT_ROUTER_HEDGE_MIN_SAMPLES = 20
+    DEFAULT_ROUTER_MAX_HEDGE_RATIO = 0.1
+    DEFAULT_ROUTER_DOWNGRADE_QUEUE_DEPTH = 8
+    DEFAULT_ROUTER_MAX_WORKERS = 16
+    DEFAULT_ROUTER_LATENCY_WINDOW = 200
+    # conservative, not measured against Gemini: see benchmarks/prescorer_eval.py
+    DEFAULT_PRESCORER_CONFIDENCE_THRESHOLD = 0.85
+    DEFAULT_PRESCORER_MIN_OPINIONATED = 5
     DEFAULT_DIR = Path.home() / DEFAULT_FOLDER_NAME
     DEFAULT_CONFIG_FILE = DEFAULT_DIR / DEFAULT_CONFIG_FILE_NAME
     DEFAULT_CACHE_FILE = DEFAULT_DIR / DEFAULT_CACHE_FILE_NAME
+    DEFAULT_CACHE_DB_FILE = DEFAULT_DIR / DEFAULT_CACHE_DB_FILE_NAME
 
     DEFAULT_CONFIG: Dict[str, Any] = {
         "youtube": {
             "api_key": "",
             "max_comments_per_video": DEFAULT_MAX_COMMENTS_PER_VIDEO,
+            "prefetch_metadata": True,
+            "units_per_day": DEFAULT_YOUTUBE_UNITS_PER_DAY,
+            "max_quota_wait_seconds": 0,
+            "backend": DEFAULT_YOUTUBE_BACKEND,
+            "http_timeout_seconds": DEFAULT_YOUTUBE_HTTP_TIMEOUT_SECONDS,
+            "max_connections": DEFAULT_YOUTUBE_MAX_CONNECTIONS,
+            "base_url": "",
         },
         "gemini": {
             "api_key": "",
-            "model": "gemini-2.5-flash-lite",
+            "model": DEFAULT_GEMINI_MODEL,
+            "batch_max_size": DEFAULT_GEMINI_BATCH_MAX_SIZE,
+            "batch_window_ms": DEFAULT_GEMINI_BATCH_WINDOW_MS,
+            "requests_per_minute": DEFAULT_GEMINI_REQUESTS_PER_MINUTE,
+            "tokens_per_minute": DEFAULT_GEMINI_TOKENS_PER_MINUTE,
+            "max_quota_wait_seconds": DEFAULT_MAX_QUOTA_WAIT_SECONDS,
+            "max_retries": DEFAULT_AI_MAX_RETRIES,
+            "circuit_failure_threshold": DEFAULT_AI_CIRCUIT_FAILURE_THRESHOLD,
+            "circuit_reset_seconds": DEFAULT_AI_CIRCUIT_RESET_SECONDS,
+            "prompt_token_budget": DEFAULT_PROMPT_TOKEN_BUDGET,
+            "min_comment_chars": DEFAULT_PROMPT_MIN_COMMENT_CHARS,
+            "duplicate_similarity": DEFAULT_PROMPT_DUPLICATE_SIMILARITY,
+            "max_candidate_comments": DEFAULT_PROMPT_MAX_CANDIDATES,
+            "max_output_tokens": DEFAULT_GEMINI_MAX_OUTPUT_TOKENS,
+            "thinking_budget": DEFAULT_GEMINI_THINKING_BUDGET,
+            "structured_output": True,
+            "stream": False,
+            "base_url": "",
         },
         "cache": {
             "expiration_days": DEFAULT_CACHE_EXPIRATION_DAYS,
+            "backend": DEFAULT_CACHE_BACKEND,
+            "memory_max_entries": DEFAULT_CACHE_MEMORY_MAX_ENTRIES,
+            "memory_max_bytes": DEFAULT_CACHE_MEMORY_MAX_BYTES,
+            "stale_while_revalidate": False,
+            "stale_max_days": DEFAULT_CACHE_STALE_MAX_DAYS,
+            "incremental_refresh": True,
+            "rerate_similarity": DEFAULT_CACHE_RERATE_SIMILARITY,
+            "redis_url": DEFAULT_CACHE_REDIS_URL,
+            "redis_prefix": DEFAULT_CACHE_REDIS_PREFIX,
+            "lock_timeout_seconds": DEFAULT_CACHE_LOCK_TIMEOUT_SECONDS,
+            "lock_wait_seconds": DEFAULT_CACHE_LOCK_WAIT_SECONDS,
+        },
+        "router": {
+            "enabled": False,
+            "models": [],
+            "hedge_percentile": DEFAULT_ROUTER_HEDGE_PERCENTILE,
+            "hedge_delay_ms": DEFAULT_ROUTER_HEDGE_DELAY_MS,
+            "hedge_min_samples": DEFAULT_ROUTER_HEDGE_MIN_SAMPLES,
+            "max_hedge_ratio": DEFAULT_ROUTER_MAX_HEDGE_RATIO,
+            "downgrade_queue_depth": DEFAULT_ROUTER_DOWNGRADE_QUEUE_DEPTH,
+            "max_workers": DEFAULT_ROUTER_MAX_WORKERS,
+        },
+        "prescorer": {
+            "enabled": False,
+            "confidence_threshold": DEFAULT_PRESCORER_CONFIDENCE_THRESHOLD,
+            "min_opinionated_comments": DEFAULT_PRESCORER_MIN_OPINIONATED,
+            "as_fallback": True,
         },
         "server": {
-            "port": DEFAULT_SERVER_PORT
+            "port": DEFAULT_SERVER_PORT,
+            "max_workers": DEFAULT_SERVER_MAX_WORKERS,
+            "max_background_refreshes": DEFAULT_SERVER_MAX_BACKGROUND_REFRESHES,
+            "batch_concurrency": DEFAULT_SERVER_BATCH_CONCURRENCY,
+            "async_jobs": False,
+            "max_pending_jobs": DEFAULT_SERVER_MAX_PENDING_JOBS,
+            "job_retention_seconds": DEFAULT_SERVER_JOB_RETENTION_SECONDS,
+            "rating_slots": DEFAULT_SERVER_RATING_SLOTS,
+            "reserved_interactive_slots": DEFAULT_SERVER_RESERVED_INTERACTIVE_SLOTS,
+            "prefetch_aging_seconds": DEFAULT_SERVER_PREFETCH_AGING_SECONDS,
         }
     }
@@ -36,3 +36,34 @@ class InvalidURLException(YTRaterException):
 
 class NoCommentFound(YTRaterException):
     """Throw when YouTube video hasn't comment."""
+
+class ChannelNotFoundException(YTRaterException):
+    """Throw when a YouTube channel doesn't exist."""
+
+class UnknownCacheBackendException(YTRaterException):
+    """Throw when the configured cache backend doesn't exist."""
+
+class MissingDependencyException(YTRaterException):
+    """Throw when an optional package needed by the configuration isn't installed."""
+
+class UnknownYouTubeBackendException(YTRaterException):
+    """Throw when the configured YouTube client backend doesn't exist."""
+
+class QuotaExceededException(YTRaterException):
+    """Throw when a provider quota (YouTube units, Gemini RPM/TPM) is exhausted."""
+
+    def __init__(
+            self, msg: str | None = None, stacktrace: Sequence[str] | None = None,
+            retry_after: float = 0.0,
+    ) -> None:
+        super().__init__(msg, stacktrace)
+        self.retry_after = retry_after
+
+class JobQueueFullException(YTRaterException):
+    """Throw when too many rating jobs are already waiting."""
+
+class CircuitOpenException(YTRaterException):
+    """Throw when a provider is failing and calls are short-circuited."""
+
+class ClientDisconnectedException(YTRaterException):
+    """Throw when the client of a queued rating went away before its turn."""
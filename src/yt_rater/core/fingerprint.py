@@ -0,0 +1,68 @@
+# yt_rater/core/fingerprint.py
+import hashlib
+from typing import List, Sequence, Tuple
+from yt_rater.models.comment import Comment
+
+
+class CommentFingerprint:
+    """
+    Identity of the comment set a score was computed from: comment IDs,
+    a hash of their content and the date of the newest one.
+    """
+    __slots__ = ("ids", "content_hash", "last_published")
+
+    def __init__(self, ids: Tuple[str, ...], content_hash: str, last_published: float):
+        self.ids = ids
+        self.content_hash = content_hash
+        self.last_published = last_published
+
+    @classmethod
+    def of(cls, comments: Sequence[Comment]) -> "CommentFingerprint":
+        digest = hashlib.sha256()
+        for comment in sorted(comments, key=lambda c: (c.id, c.text)):
+            digest.update(comment.id.encode())
+            digest.update(b"\0")
+            digest.update(comment.text.encode())
+            digest.update(b"\0")
+        return cls(
+            ids=tuple(c.id for c in comments),
+            content_hash=digest.hexdigest(),
+            last_published=max((c.published_at for c in comments), default=0.0),
+        )
+
+    def similarity(self, ids: Sequence[str]) -> float:
+        """Jaccard similarity between our comment IDs and ids."""
+        ours, theirs = set(self.ids), set(ids)
+        if not ours and not theirs:
+            return 1.0
+        return len(ours & theirs) / len(ours | theirs)
+
+    def updated_ids(self, new_comments: List[Comment], max_comments: int) -> List[str]:
+        """
+        Estimate of the comment IDs a score would be computed from now: the
+        new ones, then ours. Full fetches are in relevance order, so the
+        comments past max_comments may differ; only the set matters here.
+        """
+        new_ids = [c.id for c in new_comments]
+        known = set(new_ids)
+        return (new_ids + [i for i in self.ids if i not in known])[:max_comments]
+
+    def to_dict(self) -> dict:
+        return {
+            "ids": list(self.ids),
+            "content_hash": self.content_hash,
+            "last_published": self.last_published,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CommentFingerprint":
+        return cls(tuple(data["ids"]), data["content_hash"], float(data["last_published"]))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CommentFingerprint):
+            return NotImplemented
+        # full fetches are in relevance order: a reorder is not a change
+        return (
+            sorted(self.ids) == sorted(other.ids)
+            and self.content_hash == other.content_hash
+        )
@@ -1,15 +1,33 @@
-from typing import List
+from typing import TYPE_CHECKING, Any, Dict, Sequence, Tuple
 import logging
+import re
+import time
 
-from google import genai
+import httpx
 from yt_rater.core.ai import AIClient
+from yt_rater.core.constants import Constants
 from yt_rater.core.exceptions import (
+    CircuitOpenException,
     MissingAIAPIKeyException,
     MissingGeminiAPIKeyException,
+    QuotaExceededException,
 )
+from yt_rater.core.metrics import AI_TIME_TO_SCORE, AI_TOKENS, track
+from yt_rater.core.ratelimit import RateLimiter
+from yt_rater.core.resilience import retry
+from yt_rater.models.ai_rating import AIRating
+from yt_rater.models.comment import Comment
+from yt_rater.models.video_score import VideoScore
+
+if TYPE_CHECKING:
+    # google-genai is slow to import: at runtime, imported where used
+    from google.genai import types
 
 logger = logging.getLogger(__name__)
 
+# first number of a streamed answer, with what follows it
+_STREAMED_NUMBER = re.compile(r"\d+(?:\.(\d*))?(.?)", re.DOTALL)
+
 
 class GeminiClient(AIClient):
     """
@@ -18,29 +36,235 @@ class GeminiClient(AIClient):
     ~/.yt_rater/config.toml et optionnellement "model".
     """
 
-    def __init__(self, api_key: str | None = None, model: str | None = None):
+    def __init__(
+        self, api_key: str | None = None, model: str | None = None,
+        limiter: RateLimiter | None = None,
+    ):
         try:
-            super().__init__("gemini", api_key, model)
+            super().__init__("gemini", api_key, model, limiter)
         except MissingAIAPIKeyException:
             raise MissingGeminiAPIKeyException("Missing ai API KEY. Configure it with 'yt-rater config'.")
 
-        self.client = genai.Client(api_key=self.api_key)
+    @property
+    def retryable_errors(self) -> Tuple[type, ...]:
+        """Transient failures worth retrying (5xx, timeouts, dropped connections)."""
+        from google.genai import errors
+
+        return (errors.ServerError, httpx.TransportError)
+
+    @property
+    def stream(self) -> bool:
+        """Stream single ratings and stop reading once the score is known."""
+        return self._cfg.get_bool("gemini", "stream", False)
+
+    def _thinking_config(self) -> "types.ThinkingConfig":
+        """
+        Reasoning tokens of "thinking" models (thinking_budget, 0: none, -1:
+        the model decides). They count as output, so a score needs none.
+        """
+        from google.genai import types
+
+        return types.ThinkingConfig(
+            thinking_budget=self._cfg.get_int(
+                "gemini", "thinking_budget", Constants.DEFAULT_GEMINI_THINKING_BUDGET
+            )
+        )
+
+    def _rating_config(self) -> "types.GenerateContentConfig":
+        """
+        Config of a single rating: no thinking by default, generation capped
+        at max_output_tokens (0: uncapped) and, with structured_output, the
+        answer constrained to a bare JSON number in [0, 5].
+        """
+        from google.genai import types
+
+        max_output_tokens = self._cfg.get_int(
+            "gemini", "max_output_tokens", Constants.DEFAULT_GEMINI_MAX_OUTPUT_TOKENS
+        )
+        config = types.GenerateContentConfig(
+            max_output_tokens=max_output_tokens or None,
+            thinking_config=self._thinking_config(),
+        )
+        if self._cfg.get_bool("gemini", "structured_output", True):
+            config.response_mime_type = "application/json"
+            config.response_schema = types.Schema(
+                type=types.Type.NUMBER, minimum=0.0, maximum=5.0
+            )
+        return config
+
+    def _generate(
+        self, prompt: str, config: "types.GenerateContentConfig | None" = None, videos: int = 1,
+        stream: bool = False,
+    ) -> str:
+        """
+        Call generate_content within the requests/tokens per minute quota and
+        return the answer text. With stream, the answer is read as it is
+        generated and the stream closed as soon as it holds a whole score.
+        """
+        from google.genai import errors
+
+        self.limiter.acquire(
+            requests=1,
+            tokens=self._estimate_tokens(prompt) + videos * self.OUTPUT_TOKENS_PER_VIDEO,
+        )
+        try:
+            with track("ai_request"):
+                if stream:
+                    text, usage = self._generate_stream(prompt, config)
+                else:
+                    response = self.client.models.generate_content(
+                        model=self.model,
+                        contents=prompt,
+                        config=config,
+                    )
+                    text = response.text or ""
+                    usage = getattr(response, "usage_metadata", None)
+        except errors.APIError as e:
+            if e.code == 429:
+                retry_after = self.limiter.backoff()
+                raise QuotaExceededException(
+                    f"Gemini rate limit reached: {e}", retry_after=retry_after
+                )
+            raise
+        self.limiter.succeeded()
+        self._count_tokens(prompt, text, usage)
+        return text
+
+    def _generate_stream(
+        self, prompt: str, config: "types.GenerateContentConfig | None"
+    ) -> Tuple[str, Any]:
+        """Streamed answer text, cut after the first whole score, and its usage metadata."""
+        text, usage = "", None
+        chunks = self.client.models.generate_content_stream(
+            model=self.model,
+            contents=prompt,
+            config=config,
+        )
+        try:
+            for chunk in chunks:
+                text += chunk.text or ""
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                if self._has_score(text):
+                    break
+        finally:
+            # stops the download (and the generation) of the rest
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+        return text, usage
+
+    @staticmethod
+    def _has_score(text: str) -> bool:
+        """
+        Whether a partial answer already holds a whole number: followed by
+        another character, or with the two decimals of the prompted precision.
+        """
+        match = _STREAMED_NUMBER.search(text)
+        if match is None:
+            return False
+        decimals, following = match.groups()
+        return bool(following) or (decimals is not None and len(decimals) >= 2)
+
+    def _count_tokens(self, prompt: str, text: str, usage: Any) -> None:
+        """Record prompt/response token counts, from usage metadata when available."""
+        prompt_tokens = getattr(usage, "prompt_token_count", None)
+        response_tokens = getattr(usage, "candidates_token_count", None)
+        AI_TOKENS.labels("prompt").inc(prompt_tokens or self._estimate_tokens(prompt))
+        AI_TOKENS.labels("response").inc(response_tokens or self._estimate_tokens(text))
+
+    def _request(
+        self, prompt: str, config: "types.GenerateContentConfig | None" = None, videos: int = 1,
+        stream: bool = False,
+    ) -> str:
+        """
+        _generate behind the circuit breaker, retried with jittered backoff on
+        transient errors. Rate limits are neither retried nor counted as failures.
+        """
+        return self.breaker.call(
+            lambda: retry(
+                lambda: self._generate(prompt, config, videos, stream),
+                attempts=self.max_retries + 1,
+                base_delay=Constants.DEFAULT_AI_RETRY_BASE_DELAY,
+                max_delay=Constants.DEFAULT_AI_RETRY_MAX_DELAY,
+                max_total_delay=Constants.DEFAULT_AI_RETRY_MAX_TOTAL_DELAY,
+                retry_on=self.retryable_errors,
+            ),
+            ignore=(QuotaExceededException,),
+        )
 
-    def rate_comments(self, comments: List[str]) -> float:
+    def rate_comments(self, comments: Sequence[Comment | str]) -> AIRating:
         """YouTube video rating based on comments."""
+        with track("ai_rating"):
+            return self._rate_comments(comments)
+
+    def _rate_comments(self, comments: Sequence[Comment | str]) -> AIRating:
         prompt = self._build_prompt(comments)
+        stream = self.stream
 
+        start = time.perf_counter()
         try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt
-            )
-            text = response.text or ""
-            score = self._extract_score(text)
-            if score:
-                return score
-            logger.warning("GeminiClient: can't parse output -> return 2.5")
+            text = self._request(prompt, self._rating_config(), stream=stream)
+        except QuotaExceededException:
+            # never turn a quota error into a fake score
+            raise
+        except CircuitOpenException as e:
+            return self._fallback(str(e.msg))
         except Exception as e:
             logger.error(f"GeminiClient error: {e}")
+            return self._fallback(f"error: {e}")
+
+        score = self._extract_score(text)
+        if score is None:
+            logger.warning("GeminiClient: can't parse output -> fallback")
+            return self._fallback("unparsable output")
+        AI_TIME_TO_SCORE.labels("stream" if stream else "full").observe(
+            time.perf_counter() - start
+        )
+        return AIRating(score=score)
+
+    def rate_comments_batch(
+        self, comments_by_video: Dict[str, Sequence[Comment | str]]
+    ) -> Dict[str, AIRating]:
+        """
+        Rate several videos with one request, using a JSON response schema.
+        Videos missing from the answer are rated one by one.
+        """
+        with track("ai_batch_rating"):
+            return self._rate_comments_batch(comments_by_video)
+
+    def _rate_comments_batch(
+        self, comments_by_video: Dict[str, Sequence[Comment | str]]
+    ) -> Dict[str, AIRating]:
+        from google.genai import types
+
+        video_ids = list(comments_by_video)
+        scores: Dict[str, AIRating] = {}
+        if len(video_ids) > 1:
+            prompt = self._build_batch_prompt(comments_by_video)
+            try:
+                text = self._request(
+                    prompt,
+                    config=types.GenerateContentConfig(
+                        response_mime_type="application/json",
+                        response_schema=list[VideoScore],
+                        thinking_config=self._thinking_config(),
+                    ),
+                    videos=len(video_ids),
+                )
+                scores = {
+                    video_id: AIRating(score=score)
+                    for video_id, score in self._parse_batch_scores(text, video_ids).items()
+                }
+            except QuotaExceededException:
+                raise
+            except CircuitOpenException as e:
+                return {video_id: self._fallback(str(e.msg)) for video_id in video_ids}
+            except Exception as e:
+                logger.error(f"GeminiClient batch error: {e}")
 
-        return 2.5
+        missing = [video_id for video_id in video_ids if video_id not in scores]
+        if scores and missing:
+            logger.warning(f"GeminiClient: {len(missing)} video(s) missing from batch -> retry")
+        for video_id in missing:
+            scores[video_id] = self.rate_comments(comments_by_video[video_id])
+        return scores
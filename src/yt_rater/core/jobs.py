@@ -0,0 +1,172 @@
+# yt_rater/core/jobs.py
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Set
+
+from yt_rater.core.exceptions import JobQueueFullException
+from yt_rater.core.metrics import track
+from yt_rater.models.job import JobStatus
+from yt_rater.models.rating_request import Priority
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """A rating running in background: its state, result or error."""
+
+    def __init__(self, video_id: str, priority: Priority = Priority.INTERACTIVE):
+        self.id = uuid.uuid4().hex
+        self.video_id = video_id
+        self.priority = priority
+        self.status = JobStatus.PENDING
+        self.created_at = datetime.now()
+        self.finished_at: float | None = None
+        self.result: Any = None
+        self.error: Exception | None = None
+        self._changed = asyncio.Event()
+        # task running the job: replaced when the job is queued again
+        self._task: asyncio.Task | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.DONE, JobStatus.FAILED)
+
+    def _set(self, status: JobStatus) -> None:
+        self.status = status
+        if self.finished:
+            self.finished_at = time.monotonic()
+        # wake up the current waiters, later ones wait for the next change
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def updates(self) -> AsyncIterator["Job"]:
+        """Yield the job now, then after each status change until it is finished."""
+        while True:
+            changed = self._changed
+            yield self
+            if self.finished:
+                return
+            await changed.wait()
+
+
+class JobQueue:
+    """
+    Bounded set of background ratings, each run by its own task: the
+    worker (the rater) decides when it starts, by priority, and calls
+    on_admit() then; the job is running from there. At most max_pending
+    jobs are unfinished. Submitting a video that already has an unfinished
+    job returns that job, queued again at the new priority if it is higher
+    and the job has not started. Finished jobs are kept retention seconds
+    for polling.
+    """
+
+    def __init__(
+        self,
+        worker: Callable[..., Awaitable[Any]],
+        max_pending: int,
+        retention: float,
+    ):
+        self.worker = worker
+        self.max_pending = max_pending
+        self.retention = retention
+        self._jobs: Dict[str, Job] = {}
+        self._active: Dict[str, Job] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.submitted = 0
+        self.attached = 0
+
+    def submit(self, video_id: str, priority: Priority = Priority.INTERACTIVE) -> Job:
+        """Start a rating of video_id, or return its unfinished job."""
+        self._purge()
+        job = self._active.get(video_id)
+        if job is not None:
+            self.attached += 1
+            if priority is Priority.INTERACTIVE and job.priority is not Priority.INTERACTIVE:
+                self._raise_priority(job, priority)
+            return job
+
+        if len(self._active) >= self.max_pending:
+            raise JobQueueFullException(f"{self.max_pending} jobs already pending")
+        job = Job(video_id, priority)
+        self.submitted += 1
+        self._jobs[job.id] = job
+        self._active[video_id] = job
+        self._start(job)
+        return job
+
+    def _start(self, job: Job) -> None:
+        task = asyncio.get_running_loop().create_task(
+            self._work(job), name=f"yt-rater-job-{job.id}"
+        )
+        job._task = task
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _raise_priority(self, job: Job, priority: Priority) -> None:
+        """A more urgent caller attached to job: queue it again with its priority."""
+        job.priority = priority
+        if job.status is not JobStatus.PENDING:
+            return
+        # leaving the scheduler queue is all the cancelled task does
+        old_task = job._task
+        self._start(job)
+        if old_task is not None:
+            old_task.cancel()
+
+    def get(self, job_id: str) -> Job | None:
+        self._purge()
+        return self._jobs.get(job_id)
+
+    async def _work(self, job: Job) -> None:
+        try:
+            with track("job"):
+                job.result = await self.worker(
+                    job.video_id, job.priority, on_admit=lambda: job._set(JobStatus.RUNNING)
+                )
+        except asyncio.CancelledError:
+            if job._task is not asyncio.current_task():
+                # queued again with a higher priority: the new task runs it
+                return
+            self._active.pop(job.video_id, None)
+            raise
+        except Exception as e:
+            job.error = e
+            job._set(JobStatus.FAILED)
+        else:
+            job._set(JobStatus.DONE)
+        self._active.pop(job.video_id, None)
+
+    def _purge(self) -> None:
+        """Forget the jobs finished more than retention seconds ago."""
+        cutoff = time.monotonic() - self.retention
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    async def join(self) -> None:
+        """Wait until every submitted job is finished."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def aclose(self) -> None:
+        """Cancel the unfinished jobs."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "submitted": self.submitted,
+            "attached": self.attached,
+            "pending": sum(job.status is JobStatus.PENDING for job in self._active.values()),
+            "active": len(self._active),
+            "jobs": len(self._jobs),
+        }
@@ -0,0 +1,56 @@
+# yt_rater/core/lexicon.py
+# Polarity (-1.0 very negative .. 1.0 very positive) of English and French
+# terms and phrases frequent in YouTube comments, used by the pre-scorer.
+# Terms are lowercase and without accents (text is normalized the same way).
+LEXICON = {
+    # English
+    "amazing": 0.9, "awesome": 0.9, "excellent": 0.9, "brilliant": 0.9, "masterpiece": 1.0,
+    "fantastic": 0.9, "incredible": 0.8, "outstanding": 0.9, "perfect": 0.8, "superb": 0.9,
+    "great": 0.7, "good": 0.5, "nice": 0.5, "cool": 0.4, "love": 0.8, "loved": 0.8,
+    "beautiful": 0.7, "helpful": 0.8, "useful": 0.7, "informative": 0.7, "clear": 0.5,
+    "interesting": 0.6, "insightful": 0.8, "enjoyed": 0.7, "best": 0.7, "thanks": 0.5,
+    "thank": 0.5, "learned": 0.6, "recommend": 0.6, "underrated": 0.6, "quality": 0.4,
+    "fun": 0.5, "funny": 0.5, "wholesome": 0.7, "subscribed": 0.6, "legend": 0.6,
+    "bad": -0.6, "terrible": -0.9, "awful": -0.9, "horrible": -0.9, "worst": -0.9,
+    "boring": -0.7, "useless": -0.8, "waste": -0.8, "clickbait": -0.9, "scam": -1.0,
+    "fake": -0.7, "misleading": -0.8, "wrong": -0.6, "hate": -0.8, "stupid": -0.7,
+    "cringe": -0.7, "annoying": -0.6, "disappointed": -0.7, "disappointing": -0.7,
+    "dislike": -0.6, "unwatchable": -0.9, "garbage": -0.9, "trash": -0.9, "lies": -0.8,
+    "poor": -0.5, "mediocre": -0.5, "confusing": -0.5, "unsubscribed": -0.8, "meh": -0.3,
+    "good job": 0.8, "well done": 0.8, "well explained": 0.9, "so good": 0.8,
+    "very helpful": 0.9, "thank you": 0.6, "not bad": 0.4, "not worth": -0.7,
+    "waste of time": -1.0, "too long": -0.4, "fell asleep": -0.6,
+    # French
+    "genial": 0.9, "excellente": 0.9, "magnifique": 0.9, "superbe": 0.9, "parfait": 0.8,
+    "parfaite": 0.8, "incroyable": 0.8, "formidable": 0.9, "bravo": 0.8, "merci": 0.5,
+    "top": 0.6, "super": 0.7, "bien": 0.4, "bon": 0.4, "bonne": 0.4,
+    "interessant": 0.6, "interessante": 0.6, "instructif": 0.7, "instructive": 0.7,
+    "utile": 0.7, "clair": 0.5, "claire": 0.5, "passionnant": 0.8, "adore": 0.8,
+    "aime": 0.6, "pepite": 0.9, "chef": 0.5, "qualite": 0.4, "drole": 0.5,
+    "nul": -0.8, "nulle": -0.8, "mauvais": -0.6, "mauvaise": -0.6,
+    "ennuyeux": -0.7, "ennuyeuse": -0.7, "inutile": -0.8, "arnaque": -1.0,
+    "faux": -0.6, "fausse": -0.6, "mensonge": -0.8, "mensonges": -0.8, "deteste": -0.8,
+    "decevant": -0.7, "decevante": -0.7, "decu": -0.7, "decue": -0.7,
+    "naze": -0.7, "bidon": -0.7, "pire": -0.8, "gachis": -0.7, "lourd": -0.4,
+    "tres bien": 0.8, "trop bien": 0.8, "bien explique": 0.9, "super video": 0.9,
+    "merci beaucoup": 0.7, "pas mal": 0.5, "pas terrible": -0.5, "perte de temps": -1.0,
+    "du grand art": 1.0, "a chier": -1.0, "sans interet": -0.8,
+    # neutral phrases, so that their words are not scored alone
+    "nulle part": 0.0, "pas de quoi": 0.0, "no problem": 0.0,
+    # emoji
+    "\U0001f44d": 0.6, "❤": 0.7, "\U0001f60d": 0.8, "\U0001f525": 0.6,
+    "\U0001f64f": 0.5, "\U0001f44f": 0.7, "\U0001f602": 0.3, "\U0001f44e": -0.7,
+    "\U0001f621": -0.7, "\U0001f92e": -0.9, "\U0001f634": -0.5, "\U0001f4a9": -0.8,
+}
+
+# words flipping the polarity of the following terms
+NEGATORS = {
+    "not", "no", "never", "nothing", "dont", "isnt", "wasnt", "didnt", "doesnt", "cant",
+    "ne", "n", "pas", "jamais", "rien", "aucun", "aucune", "sans",
+}
+
+# words strengthening the following term
+INTENSIFIERS = {
+    "very": 1.3, "so": 1.2, "really": 1.2, "extremely": 1.4, "too": 1.1,
+    "tres": 1.3, "trop": 1.2, "vraiment": 1.2, "tellement": 1.3, "hyper": 1.3,
+}
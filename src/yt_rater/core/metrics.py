@@ -0,0 +1,190 @@
+# yt_rater/core/metrics.py
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Process-wide instruments, updated by the clients and exposed on /metrics.
+REGISTRY = CollectorRegistry(auto_describe=True)
+
+LATENCY_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+STAGE_SECONDS = Histogram(
+    "yt_rater_stage_seconds",
+    "Duration of each rating stage (request, cache, youtube, ai).",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+IN_FLIGHT = Gauge(
+    "yt_rater_in_flight",
+    "Operations of each stage currently running.",
+    ["stage"],
+    registry=REGISTRY,
+)
+ERRORS = Counter(
+    "yt_rater_errors",
+    "Errors raised by each stage, by exception type.",
+    ["stage", "type"],
+    registry=REGISTRY,
+)
+YOUTUBE_PAGES = Histogram(
+    "yt_rater_youtube_pages_per_video",
+    "commentThreads pages fetched per video.",
+    buckets=(1, 2, 3, 5, 10, 20),
+    registry=REGISTRY,
+)
+AI_TOKENS = Counter(
+    "yt_rater_ai_tokens",
+    "Tokens sent to (prompt) and received from (response) the AI.",
+    ["kind"],
+    registry=REGISTRY,
+)
+AI_TIME_TO_SCORE = Histogram(
+    "yt_rater_ai_time_to_score_seconds",
+    "Time from the AI request to a parsed score, by mode (full answer or stream).",
+    ["mode"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+AI_ROUTE_SECONDS = Histogram(
+    "yt_rater_ai_route_seconds",
+    "Duration of the AI calls of each route (provider or model) of the router, "
+    "by kind (single or batch rating).",
+    ["route", "kind"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+AI_HEDGES = Counter(
+    "yt_rater_ai_hedges",
+    "Hedged AI requests, by the call whose answer was used (primary or hedge).",
+    ["winner"],
+    registry=REGISTRY,
+)
+AI_DOWNGRADES = Counter(
+    "yt_rater_ai_downgrades",
+    "AI ratings sent to the cheapest route because the queue was deep.",
+    registry=REGISTRY,
+)
+AI_FAILOVERS = Counter(
+    "yt_rater_ai_failovers",
+    "AI ratings sent to the next route because the first one failed or gave a fallback.",
+    registry=REGISTRY,
+)
+PRESCORER_RATINGS = Counter(
+    "yt_rater_prescorer_ratings",
+    "Ratings answered by the local pre-scorer, instead of the AI (short_circuit) "
+    "or when it failed (fallback).",
+    ["outcome"],
+    registry=REGISTRY,
+)
+AI_FALLBACKS = Counter(
+    "yt_rater_ai_fallbacks",
+    "AI ratings answered with the fallback score.",
+    registry=REGISTRY,
+)
+
+
+@contextmanager
+def track(stage: str) -> Iterator[None]:
+    """Time a stage, count it in flight and count its errors by type."""
+    IN_FLIGHT.labels(stage).inc()
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        ERRORS.labels(stage, type(e).__name__).inc()
+        raise
+    finally:
+        STAGE_SECONDS.labels(stage).observe(time.perf_counter() - start)
+        IN_FLIGHT.labels(stage).dec()
+
+
+class RaterCollector:
+    """
+    Expose the counters a Rater (and its cache) already keeps, read at
+    scrape time: cache lookups and hit ratio, coalesced misses, etc.
+    """
+
+    def __init__(self, rater: Any):
+        self.rater = rater
+
+    def collect(self) -> Iterator[Any]:
+        cache = self.rater.cache.stats
+        lookups = CounterMetricFamily(
+            "yt_rater_cache_lookups", "Cache lookups by result.", labels=["result"]
+        )
+        for result, key in (
+            ("memory_hit", "hits"), ("disk_hit", "disk_hits"),
+            ("stale_hit", "stale_hits"), ("miss", "misses"),
+        ):
+            lookups.add_metric([result], cache[key])
+        yield lookups
+
+        total = cache["hits"] + cache["disk_hits"] + cache["stale_hits"] + cache["misses"]
+        hits = total - cache["misses"]
+        yield GaugeMetricFamily(
+            "yt_rater_cache_hit_ratio", "Share of cache lookups answered from cache.",
+            value=hits / total if total else 0.0,
+        )
+        yield GaugeMetricFamily(
+            "yt_rater_cache_memory_entries", "Entries in the in-memory cache tier.",
+            value=cache["memory_entries"],
+        )
+        yield CounterMetricFamily(
+            "yt_rater_cache_evictions", "Entries evicted from the in-memory tier.",
+            value=cache["evictions"],
+        )
+
+        singleflight = self.rater.singleflight.stats
+        yield CounterMetricFamily(
+            "yt_rater_coalesced_requests", "Cache misses served by an in-flight rating.",
+            value=singleflight["coalesced"],
+        )
+        yield CounterMetricFamily(
+            "yt_rater_kept_ratings", "Expired ratings kept because comments did not change.",
+            value=self.rater.kept_ratings,
+        )
+        yield CounterMetricFamily(
+            "yt_rater_peer_ratings", "Misses answered by a rating made by another instance.",
+            value=self.rater.peer_ratings,
+        )
+
+        scheduler = self.rater.scheduler.stats
+        queued = GaugeMetricFamily(
+            "yt_rater_scheduler_queued", "Cache misses waiting for a rating slot, by priority.",
+            labels=["priority"],
+        )
+        for key, value in scheduler.items():
+            if key.startswith("queued_"):
+                queued.add_metric([key.removeprefix("queued_")], value)
+        yield queued
+        yield CounterMetricFamily(
+            "yt_rater_scheduler_dropped",
+            "Queued ratings dropped because their client disconnected.",
+            value=scheduler["dropped"],
+        )
+
+        selector = getattr(self.rater.ai, "selector", None)
+        if selector is not None:
+            yield CounterMetricFamily(
+                "yt_rater_prompt_tokens_saved",
+                "Prompt tokens saved by comment selection.",
+                value=selector.stats["tokens_saved"],
+            )
+
+
+def render(*registries: CollectorRegistry) -> bytes:
+    """Prometheus text exposition of the process-wide metrics plus registries."""
+    return b"".join(generate_latest(r) for r in (REGISTRY, *registries))
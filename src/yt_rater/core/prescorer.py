@@ -0,0 +1,219 @@
+# yt_rater/core/prescorer.py
+import math
+import re
+import unicodedata
+from typing import Any, Dict, List, Sequence, Tuple
+
+from yt_rater.core.config import Config
+from yt_rater.core.constants import Constants
+from yt_rater.core.exceptions import MissingDependencyException
+from yt_rater.core.lexicon import INTENSIFIERS, LEXICON, NEGATORS
+from yt_rater.models.comment import Comment
+
+# words and the emoji the lexicon knows
+_TOKEN = re.compile(r"[^\W\d_]+|[☀-➿\U0001f300-\U0001faff]")
+# tokens after a negator whose polarity is flipped
+NEGATION_SCOPE = 3
+# flipped polarity is weaker ("not great" is not "terrible")
+NEGATION_FACTOR = 0.7
+# below this |polarity| a comment is considered neutral
+MIN_COMMENT_POLARITY = 0.1
+# share of opinionated comments for full confidence
+FULL_CONFIDENCE_COVERAGE = 0.25
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, accent-free words and emoji of text."""
+    text = unicodedata.normalize("NFKD", text.lower().replace("n't", " not"))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _TOKEN.findall(text)
+
+
+class PreScore:
+    """
+    Local estimate of a video rating: score (0-5), confidence (0-1), mean
+    polarity (-1..1) and how many comments carried an opinion.
+    """
+    __slots__ = ("score", "confidence", "polarity", "opinionated", "comments")
+
+    def __init__(
+        self, score: float, confidence: float, polarity: float, opinionated: int, comments: int
+    ):
+        self.score = score
+        self.confidence = confidence
+        self.polarity = polarity
+        self.opinionated = opinionated
+        self.comments = comments
+
+    def __repr__(self) -> str:
+        return f"PreScore(score={self.score!r}, confidence={self.confidence!r})"
+
+
+class PreScorer:
+    """
+    CPU-only lexicon scorer (English and French words, phrases up to three
+    words and emoji, with negation and intensifiers), used before the AI:
+    a confident score for a clear-cut video saves the AI call, and any
+    score beats the neutral fallback when the AI is unavailable. Comments
+    of many videos are scored at once with NumPy. Needs the "numpy" package.
+    """
+
+    def __init__(self, min_opinionated: int = Constants.DEFAULT_PRESCORER_MIN_OPINIONATED):
+        try:
+            import numpy
+        except ImportError:
+            raise MissingDependencyException(
+                "The pre-scorer needs the numpy package: pip install numpy"
+            )
+        self._np = numpy
+        self.min_opinionated = min_opinionated
+        self._terms = {term: i for i, term in enumerate(LEXICON)}
+        self._weights = numpy.array(list(LEXICON.values()), dtype=numpy.float64)
+        self._max_words = max(len(term.split()) for term in LEXICON)
+
+    @classmethod
+    def from_config(cls, config: Config) -> "PreScorer":
+        return cls(
+            min_opinionated=config.get_int(
+                "prescorer", "min_opinionated_comments",
+                Constants.DEFAULT_PRESCORER_MIN_OPINIONATED,
+            )
+        )
+
+    def _matches(self, tokens: List[str]) -> List[Tuple[int, float]]:
+        """(term index, multiplier) of the lexicon terms found, longest first."""
+        matches = []
+        negated_until = -1
+        i = 0
+        while i < len(tokens):
+            for size in range(min(self._max_words, len(tokens) - i), 0, -1):
+                term = " ".join(tokens[i:i + size])
+                if term in self._terms:
+                    break
+            else:
+                if tokens[i] in NEGATORS:
+                    negated_until = i + NEGATION_SCOPE
+                i += 1
+                continue
+
+            multiplier = 1.0
+            if i > 0 and tokens[i - 1] in INTENSIFIERS:
+                multiplier *= INTENSIFIERS[tokens[i - 1]]
+            if i <= negated_until:
+                multiplier *= -NEGATION_FACTOR
+            matches.append((self._terms[term], multiplier))
+            i += size
+        return matches
+
+    def score(self, comments: Sequence[Comment | str]) -> PreScore:
+        return self.score_many([comments])[0]
+
+    def score_many(self, videos: Sequence[Sequence[Comment | str]]) -> List[PreScore]:
+        """Score several videos (their comments) in one vectorized pass."""
+        np = self._np
+        term_ids: List[int] = []
+        multipliers: List[float] = []
+        comment_ids: List[int] = []
+        comment_video: List[int] = []
+        likes: List[int] = []
+        for video_index, comments in enumerate(videos):
+            for comment in comments:
+                text = comment.text if isinstance(comment, Comment) else comment
+                for term_id, multiplier in self._matches(tokenize(text)):
+                    term_ids.append(term_id)
+                    multipliers.append(multiplier)
+                    comment_ids.append(len(comment_video))
+                comment_video.append(video_index)
+                likes.append(comment.like_count if isinstance(comment, Comment) else 0)
+
+        n_videos, n_comments = len(videos), len(comment_video)
+        contributions = self._weights[np.array(term_ids, dtype=np.intp)] * np.array(multipliers)
+        # per comment: saturated sum of its terms' polarity
+        polarity = np.tanh(
+            np.bincount(np.array(comment_ids, dtype=np.intp), contributions, minlength=n_comments)
+        )
+        video = np.array(comment_video, dtype=np.intp)
+        # liked comments speak for more viewers
+        weight = 1.0 + np.log1p(np.array(likes, dtype=np.float64))
+        opinionated = np.abs(polarity) >= MIN_COMMENT_POLARITY
+        weight_op = np.where(opinionated, weight, 0.0)
+
+        totals = np.bincount(video, minlength=n_videos)
+        counts = np.bincount(video, opinionated.astype(np.float64), minlength=n_videos)
+        weight_sum = np.bincount(video, weight_op, minlength=n_videos)
+        polarity_sum = np.bincount(video, weight_op * polarity, minlength=n_videos)
+        positive = np.bincount(video, np.where(polarity > 0, weight_op, 0.0), minlength=n_videos)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.where(weight_sum > 0, polarity_sum / weight_sum, 0.0)
+            # share of the opinionated comments on the majority side
+            agreement = np.where(
+                weight_sum > 0, np.maximum(positive, weight_sum - positive) / weight_sum, 0.0
+            )
+            coverage = np.where(totals > 0, counts / totals, 0.0)
+        confidence = (
+            agreement
+            * np.minimum(1.0, counts / max(1, self.min_opinionated))
+            * np.minimum(1.0, coverage / FULL_CONFIDENCE_COVERAGE)
+        )
+        scores = np.clip(2.5 + 2.5 * mean, 0.0, 5.0)
+
+        return [
+            PreScore(
+                score=round(float(scores[i]), 2),
+                confidence=round(float(confidence[i]), 3),
+                polarity=round(float(mean[i]), 3),
+                opinionated=int(counts[i]),
+                comments=int(totals[i]),
+            )
+            for i in range(n_videos)
+        ]
+
+
+def evaluate(
+    scorer: PreScorer, records: Sequence[Dict[str, Any]], threshold: float
+) -> Dict[str, Any]:
+    """
+    Agreement of the pre-scorer with recorded AI scores, over all videos and
+    over the ones it would answer alone (confidence >= threshold). records
+    are {"comments": [...], "ai_score": float}.
+    """
+    prescores = scorer.score_many([record["comments"] for record in records])
+    pairs = [(p, float(r["ai_score"])) for p, r in zip(prescores, records)]
+    confident = [(p, ai) for p, ai in pairs if p.confidence >= threshold]
+
+    def agreement(subset: List[Tuple[PreScore, float]]) -> Dict[str, Any]:
+        if not subset:
+            return {"videos": 0}
+        errors = [abs(p.score - ai) for p, ai in subset]
+        return {
+            "videos": len(subset),
+            "mae": round(sum(errors) / len(errors), 3),
+            "within_0_5": round(sum(e <= 0.5 for e in errors) / len(errors), 3),
+            "within_1": round(sum(e <= 1.0 for e in errors) / len(errors), 3),
+            # both on the same side of the neutral 2.5
+            "same_side": round(
+                sum((p.score - 2.5) * (ai - 2.5) > 0 for p, ai in subset) / len(subset), 3
+            ),
+            "pearson": _pearson([p.score for p, _ in subset], [ai for _, ai in subset]),
+        }
+
+    return {
+        "threshold": threshold,
+        "short_circuit_ratio": round(len(confident) / len(pairs), 3) if pairs else 0.0,
+        "all": agreement(pairs),
+        "short_circuited": agreement(confident),
+    }
+
+
+def _pearson(xs: List[float], ys: List[float]) -> float | None:
+    n = len(xs)
+    if n < 2:
+        return None
+    mean_x, mean_y = sum(xs) / n, sum(ys) / n
+    cov = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    var_y = sum((y - mean_y) ** 2 for y in ys)
+    if var_x == 0 or var_y == 0:
+        return None
+    return round(cov / math.sqrt(var_x * var_y), 3)
@@ -0,0 +1,215 @@
+# yt_rater/core/ratelimit.py
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+from yt_rater.core.config import Config
+from yt_rater.core.constants import Constants
+from yt_rater.core.exceptions import QuotaExceededException
+
+
+class TokenBucket:
+    """Token bucket holding up to capacity tokens, refilled continuously."""
+
+    def __init__(
+        self, capacity: float, refill_per_second: float, clock: Callable[[], float] = time.monotonic
+    ):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.refill_per_second
+        )
+        self._updated = now
+
+    @property
+    def available(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount tokens are available (inf if never)."""
+        self._refill()
+        if self._tokens >= amount:
+            return 0.0
+        if amount > self.capacity or self.refill_per_second <= 0:
+            return float("inf")
+        return (amount - self._tokens) / self.refill_per_second
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self._tokens -= amount
+
+    def resize(self, capacity: float, refill_per_second: float) -> None:
+        """Change the limit, keeping the tokens already consumed."""
+        self._refill()
+        used = self.capacity - self._tokens
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._tokens = max(0.0, capacity - used)
+
+    def drain(self) -> None:
+        self._refill()
+        self._tokens = 0.0
+
+    def status(self) -> Dict[str, float]:
+        return {
+            "capacity": self.capacity,
+            "available": round(self.available, 2),
+            "refill_per_second": self.refill_per_second,
+        }
+
+
+class RateLimiter:
+    """
+    Client-side quota of one provider: a set of named token buckets (e.g.
+    requests and tokens per minute) plus an adaptive backoff after 429s.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        buckets: Dict[str, TokenBucket],
+        max_wait: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Any] = time.sleep,
+    ):
+        self.name = name
+        self.buckets = buckets
+        self.max_wait = max_wait
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._backoff = 0.0
+        self._blocked_until = 0.0
+        self.throttled = 0
+        self.rejected = 0
+
+    # config key -> (bucket name, refill period in seconds)
+    CONFIG_BUCKETS: Dict[str, Tuple[str, float]] = {
+        "units_per_day": ("units", 86400),
+        "requests_per_minute": ("requests", 60),
+        "tokens_per_minute": ("tokens", 60),
+    }
+
+    @classmethod
+    def from_config(cls, name: str, config: Config) -> "RateLimiter":
+        """Build the limiter of provider name from its config.toml section (0 = unlimited)."""
+        buckets: Dict[str, TokenBucket] = {}
+        for key, (bucket, period) in cls.CONFIG_BUCKETS.items():
+            limit = config.get(name, key, 0)
+            if limit:
+                buckets[bucket] = TokenBucket(limit, limit / period)
+        max_wait = config.get(name, "max_quota_wait_seconds", Constants.DEFAULT_MAX_QUOTA_WAIT_SECONDS)
+        return cls(name, buckets, max_wait=max_wait)
+
+    def reconfigure(self, config: Config) -> None:
+        """
+        Apply the limits of config in place (e.g. after a config reload):
+        resize, add or remove buckets, keeping the tokens already consumed.
+        """
+        with self._lock:
+            for key, (bucket, period) in self.CONFIG_BUCKETS.items():
+                limit = config.get_float(self.name, key, 0)
+                if not limit:
+                    self.buckets.pop(bucket, None)
+                elif bucket not in self.buckets:
+                    self.buckets[bucket] = TokenBucket(limit, limit / period)
+                else:
+                    self.buckets[bucket].resize(limit, limit / period)
+            self.max_wait = config.get_float(
+                self.name, "max_quota_wait_seconds", Constants.DEFAULT_MAX_QUOTA_WAIT_SECONDS
+            )
+
+    def _wait_time(self, amounts: Dict[str, float]) -> float:
+        wait = max(0.0, self._blocked_until - self._clock())
+        for bucket, amount in amounts.items():
+            if bucket in self.buckets:
+                wait = max(wait, self.buckets[bucket].wait_time(amount))
+        return wait
+
+    def acquire(self, **amounts: float) -> None:
+        """
+        Take amounts from the buckets (e.g. requests=1, tokens=1200), waiting
+        up to max_wait seconds. Raise QuotaExceededException otherwise.
+        """
+        deadline = self._clock() + self.max_wait
+        while True:
+            with self._lock:
+                wait = self._wait_time(amounts)
+                if wait == 0.0:
+                    for bucket, amount in amounts.items():
+                        if bucket in self.buckets:
+                            self.buckets[bucket].take(amount)
+                    return
+                if self._clock() + wait > deadline:
+                    self.rejected += 1
+                    raise QuotaExceededException(
+                        f"{self.name} quota exhausted, retry in {wait:.0f}s", retry_after=wait
+                    )
+                self.throttled += 1
+            self._sleep(wait)
+
+    def backoff(self) -> float:
+        """Provider answered 429: pause all calls, doubling the pause each time."""
+        with self._lock:
+            self._backoff = min(
+                max(self._backoff * 2, Constants.DEFAULT_MIN_BACKOFF_SECONDS),
+                Constants.DEFAULT_MAX_BACKOFF_SECONDS,
+            )
+            self._blocked_until = self._clock() + self._backoff
+            return self._backoff
+
+    def exhaust(self, bucket: str) -> None:
+        """Provider says a quota is used up: empty the matching bucket."""
+        with self._lock:
+            if bucket in self.buckets:
+                self.buckets[bucket].drain()
+
+    def succeeded(self) -> None:
+        """A call went through: reset the backoff."""
+        self._backoff = 0.0
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "buckets": {name: bucket.status() for name, bucket in self.buckets.items()},
+                "blocked_for": round(max(0.0, self._blocked_until - self._clock()), 2),
+                "throttled": self.throttled,
+                "rejected": self.rejected,
+            }
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _reconfigure_limiters(config: Config) -> None:
+    for limiter in limiters().values():
+        limiter.reconfigure(config)
+
+
+def get_limiter(name: str) -> RateLimiter:
+    """Process-wide limiter of a provider ("youtube", "gemini"), built on first use."""
+    with _limiters_lock:
+        if name not in _limiters:
+            config = Config()
+            _limiters[name] = RateLimiter.from_config(name, config)
+            # limits edited in config.toml apply without a restart
+            config.on_reload(_reconfigure_limiters)
+        return _limiters[name]
+
+
+def limiters() -> Dict[str, RateLimiter]:
+    return dict(_limiters)
+
+
+def reset_limiters() -> None:
+    """Forget every limiter (they are rebuilt from config on next use)."""
+    with _limiters_lock:
+        _limiters.clear()
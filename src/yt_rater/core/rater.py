@@ -0,0 +1,451 @@
+# yt_rater/core/rater.py
+import asyncio
+import functools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Sequence, Tuple
+
+from yt_rater.core.batcher import MicroBatcher
+from yt_rater.core.cache import Cache
+from yt_rater.core.cache_backends import CacheEntry
+from yt_rater.core.config import Config
+from yt_rater.core.constants import Constants
+from yt_rater.core.exceptions import NoCommentFound, QuotaExceededException
+from yt_rater.core.fingerprint import CommentFingerprint
+from yt_rater.core.metrics import PRESCORER_RATINGS
+from yt_rater.core.prescorer import PreScore, PreScorer
+from yt_rater.core.scheduler import PriorityScheduler
+from yt_rater.core.singleflight import SingleFlight
+from yt_rater.models.ai_rating import AIRating
+from yt_rater.models.rating_request import Priority
+from yt_rater.models.rating_response import RatingResponse
+from yt_rater.models.video_metadata import VideoMetadata
+
+logger = logging.getLogger(__name__)
+
+
+class Rater:
+    """
+    Rating pipeline shared by the server routes: cache lookup, then on a miss
+    YouTube comments -> AI rating -> cache, with concurrent misses coalesced
+    (across instances too when the cache backend is shared).
+    """
+    # seconds between two checks of a video being rated by another instance
+    LOCK_POLL_INTERVAL = 0.1
+
+    def __init__(self, cache: Cache, youtube: Any, ai: Any, config: Config | None = None):
+        self.cache = cache
+        self.youtube = youtube
+        self.ai = ai
+        self.config = config or Config()
+        self.singleflight = SingleFlight()
+        # misses wait their turn for fetch + rating, watched videos first
+        self.scheduler = PriorityScheduler.from_config(self.config)
+
+        # YouTube and AI clients are synchronous: run them in a bounded
+        # pool so a cache miss never blocks the event loop.
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.config.get(
+                "server", "max_workers", Constants.DEFAULT_SERVER_MAX_WORKERS
+            ),
+            thread_name_prefix="yt-rater",
+        )
+
+        # Misses arriving close together are rated with one AI call. AI
+        # clients without a batch API are rated one video at a time.
+        self.batcher: MicroBatcher | None = None
+        batch_max_size = self.config.get(
+            "gemini", "batch_max_size", Constants.DEFAULT_GEMINI_BATCH_MAX_SIZE
+        )
+        if batch_max_size > 1 and hasattr(self.ai, "rate_comments_batch"):
+            self.batcher = MicroBatcher(
+                self.ai.rate_comments_batch,
+                self.call,
+                window=self.config.get(
+                    "gemini", "batch_window_ms", Constants.DEFAULT_GEMINI_BATCH_WINDOW_MS
+                ) / 1000,
+                max_size=batch_max_size,
+            )
+
+        # local scorer tried before the AI (clear-cut videos skip the AI call)
+        self.prescorer: PreScorer | None = None
+        if self.config.get_bool("prescorer", "enabled", False):
+            self.prescorer = PreScorer.from_config(self.config)
+
+        # videos.list results prefetched in bulk, consumed by the miss path
+        self._metadata: Dict[str, VideoMetadata] = {}
+
+        # expired ratings kept because their comments did not change
+        self.kept_ratings = 0
+        # AI failures answered with the fallback score (never cached)
+        self.fallback_ratings = 0
+        # misses answered by a rating computed by another instance
+        self.peer_ratings = 0
+
+        # stale-while-revalidate: video IDs being refreshed in background
+        self._refreshing: set[str] = set()
+        self._background_tasks: set[asyncio.Task] = set()
+        self._refresh_slots = asyncio.Semaphore(
+            self.config.get(
+                "server", "max_background_refreshes",
+                Constants.DEFAULT_SERVER_MAX_BACKGROUND_REFRESHES,
+            )
+        )
+
+    async def run_blocking(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking call in the executor and await its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Await func: coroutine functions on the event loop, others in the executor."""
+        if asyncio.iscoroutinefunction(func):
+            return await func(*args, **kwargs)
+        return await self.run_blocking(func, *args, **kwargs)
+
+    async def lookup(
+        self, video_id: str, allow_stale: bool | None = None
+    ) -> RatingResponse | None:
+        """
+        Answer from cache if possible. Stale entries are served (and refreshed
+        in background) when allow_stale, by default when stale-while-revalidate
+        is enabled.
+        """
+        return (await self.lookup_many([video_id], allow_stale)).get(video_id)
+
+    async def lookup_many(
+        self, video_ids: Sequence[str], allow_stale: bool | None = None
+    ) -> Dict[str, RatingResponse]:
+        """
+        lookup for many videos. Memory hits are answered on the event loop,
+        the others with one backend round trip in the executor.
+        """
+        if allow_stale is None:
+            allow_stale = self.cache.stale_while_revalidate
+        entries = self.cache.get_memory_entries(video_ids, allow_stale)
+        missing = [video_id for video_id in video_ids if video_id not in entries]
+        if missing:
+            entries.update(
+                await self.run_blocking(self.cache.get_entries, missing, allow_stale)
+            )
+        return {
+            video_id: self._cached_response(video_id, entry)
+            for video_id, entry in entries.items()
+        }
+
+    def _cached_response(self, video_id: str, entry: CacheEntry) -> RatingResponse:
+        stale = self.cache.is_stale(entry)
+        if stale:
+            self.schedule_refresh(video_id)
+        return RatingResponse(score=entry.score, last_updated=entry.last_updated, stale=stale)
+
+    async def rate(
+        self,
+        video_id: str,
+        priority: Priority = Priority.INTERACTIVE,
+        disconnected: Callable[[], Awaitable[bool]] | None = None,
+        allow_stale: bool | None = None,
+        on_admit: Callable[[], None] | None = None,
+    ) -> RatingResponse:
+        """
+        Return the rating of video_id, from cache or freshly computed. Misses
+        are scheduled by priority; disconnected() tells whether the client
+        went away while queued (the rating is then dropped). allow_stale as
+        in lookup: False re-rates a stale entry now. on_admit() is called
+        once a miss leaves the queue (or joins a rating already running).
+        """
+        response = await self.lookup(video_id, allow_stale)
+        if response is not None:
+            return response
+
+        # concurrent misses for the same video share one fetch + rating
+        if not self.singleflight.in_flight(video_id):
+            async with self.scheduler.slot(priority, disconnected) as waited:
+                if on_admit is not None:
+                    on_admit()
+                # the request ahead in the queue may have rated it meanwhile
+                response = await self.lookup(video_id, allow_stale) if waited else None
+                if response is not None:
+                    return response
+                return await self.singleflight.do(video_id, lambda: self._rate_shared(video_id))
+        if on_admit is not None:
+            on_admit()
+        return await self.singleflight.do(video_id, lambda: self._rate_shared(video_id))
+
+    async def rate_many(
+        self, video_ids: Sequence[str], concurrency: int,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> AsyncIterator[Tuple[int, RatingResponse | Exception]]:
+        """
+        Rate several videos, yielding (index, rating or exception) as soon as
+        each one is ready. Cache hits come first; misses run at most
+        concurrency at a time, scheduled with priority.
+        """
+        try:
+            hits = await self.lookup_many(video_ids)
+        except Exception as e:
+            # retried (and reported) one video at a time by rate()
+            logger.warning(f"Rater: bulk cache lookup failed: {e}")
+            hits = {}
+
+        misses: List[Tuple[int, str]] = []
+        for index, video_id in enumerate(video_ids):
+            if video_id in hits:
+                yield index, hits[video_id]
+            else:
+                misses.append((index, video_id))
+        if not misses:
+            return
+
+        # one videos.list call tells which misses have comments at all
+        await self.prefetch_metadata([video_id for _, video_id in misses])
+
+        slots = asyncio.Semaphore(concurrency)
+
+        async def rate_one(index: int, video_id: str) -> Tuple[int, RatingResponse | Exception]:
+            try:
+                async with slots:
+                    return index, await self.rate(video_id, priority)
+            except Exception as e:
+                return index, e
+
+        tasks = [asyncio.ensure_future(rate_one(i, v)) for i, v in misses]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # consumer went away (e.g. client disconnected): drop what is left
+            for task in tasks:
+                task.cancel()
+            for _, video_id in misses:
+                self._metadata.pop(video_id, None)
+
+    @property
+    def prefetch_enabled(self) -> bool:
+        return bool(self.config.get("youtube", "prefetch_metadata", True)) and hasattr(
+            self.youtube, "fetch_video_metadata"
+        )
+
+    async def prefetch_metadata(self, video_ids: List[str]) -> None:
+        """Bulk-fetch comment counts of video_ids for the upcoming misses."""
+        if not self.prefetch_enabled:
+            return
+        try:
+            metadata = await self.call(self.youtube.fetch_video_metadata, video_ids)
+        except Exception as e:
+            logger.warning(f"Rater: metadata prefetch failed: {e}")
+            return
+        self._metadata.update(metadata)
+
+    @property
+    def incremental_enabled(self) -> bool:
+        return self.cache.incremental_refresh and hasattr(self.youtube, "fetch_comment_threads")
+
+    async def _keep_if_unchanged(
+        self, video_id: str, fingerprint: CommentFingerprint, max_comments: int
+    ) -> RatingResponse | None:
+        """
+        Fetch only the comments published since the last rating. If the comment
+        set is (almost) the same, extend the old score's TTL instead of re-rating.
+        """
+        try:
+            new_comments = await self.call(
+                self.youtube.fetch_comment_threads,
+                video_id,
+                max_comments,
+                since=fingerprint.last_published,
+            )
+        except Exception as e:
+            logger.warning(f"Rater: incremental fetch of {video_id} failed: {e}")
+            return None
+
+        ids = fingerprint.updated_ids(new_comments, max_comments)
+        threshold = self.config.get(
+            "cache", "rerate_similarity", Constants.DEFAULT_CACHE_RERATE_SIMILARITY
+        )
+        if fingerprint.similarity(ids) < threshold:
+            return None
+        return await self._keep(video_id)
+
+    async def _keep(self, video_id: str) -> RatingResponse | None:
+        entry = await self.run_blocking(self.cache.touch, video_id)
+        if entry is None:
+            return None
+        self.kept_ratings += 1
+        return RatingResponse(score=entry.score, last_updated=entry.last_updated)
+
+    async def _rate_shared(self, video_id: str) -> RatingResponse:
+        """
+        _rate_video_id under a per-video lock when the cache backend is shared
+        between instances: one of them rates the video, the others wait for
+        its score (or rate it themselves if it gives up or takes too long).
+        """
+        backend = self.cache.backend
+        if not hasattr(backend, "acquire_lock"):
+            return await self._rate_video_id(video_id)
+
+        timeout = self.config.get_float(
+            "cache", "lock_timeout_seconds", Constants.DEFAULT_CACHE_LOCK_TIMEOUT_SECONDS
+        )
+        token = await self.run_blocking(backend.acquire_lock, video_id, timeout)
+        if token is None:
+            response = await self._wait_for_peer(video_id)
+            if response is not None:
+                self.peer_ratings += 1
+                return response
+            token = await self.run_blocking(backend.acquire_lock, video_id, timeout)
+        try:
+            return await self._rate_video_id(video_id)
+        finally:
+            if token is not None:
+                await self.run_blocking(backend.release_lock, video_id, token)
+
+    async def _wait_for_peer(self, video_id: str) -> RatingResponse | None:
+        """
+        Wait for the instance holding the lock of video_id to store a fresh
+        score. None if it released the lock without one or took too long.
+        """
+        backend = self.cache.backend
+        deadline = time.monotonic() + self.config.get_float(
+            "cache", "lock_wait_seconds", Constants.DEFAULT_CACHE_LOCK_WAIT_SECONDS
+        )
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.LOCK_POLL_INTERVAL)
+            entry = await self.run_blocking(self.cache.reload, video_id)
+            if entry is not None and not self.cache.is_stale(entry):
+                return RatingResponse(score=entry.score, last_updated=entry.last_updated)
+            if not await self.run_blocking(backend.is_locked, video_id):
+                return None
+        logger.warning(f"Rater: gave up waiting for another instance to rate {video_id}")
+        return None
+
+    async def _rate_video_id(self, video_id: str) -> RatingResponse:
+        """Fetch comments, rate them and store the score (cache miss path)."""
+        max_comments = self.config.get("youtube", "max_comments_per_video")
+
+        # an expired score whose comments barely changed is kept as is
+        previous = (
+            await self.run_blocking(self.cache.peek, video_id)
+            if self.incremental_enabled else None
+        )
+        if previous is not None and previous.fingerprint is not None:
+            response = await self._keep_if_unchanged(video_id, previous.fingerprint, max_comments)
+            if response is not None:
+                return response
+
+        # skip videos without comments before paying for commentThreads + AI.
+        # Only known for batches: for a single video, commentThreads answers
+        # that itself and a videos.list call would only add a round trip
+        metadata = self._metadata.pop(video_id, None)
+        if metadata is not None and not metadata.has_comments:
+            raise NoCommentFound
+
+        # fetch comments
+        fingerprint: CommentFingerprint | None = None
+        if self.incremental_enabled:
+            threads = await self.call(
+                self.youtube.fetch_comment_threads, video_id, max_comments
+            )
+            # full Comment objects: the prompt builder ranks them by likes/replies
+            comments = threads
+            if threads:
+                fingerprint = CommentFingerprint.of(threads)
+            if fingerprint is not None and previous is not None and previous.fingerprint == fingerprint:
+                response = await self._keep(video_id)
+                if response is not None:
+                    return response
+        else:
+            comments = await self.call(
+                self.youtube.fetch_comments, video_id, max_comments=max_comments
+            )
+        if not comments:
+            raise NoCommentFound
+
+        # get ai rating, unless the local pre-scorer is confident enough
+        prescore = None
+        if self.prescorer is not None:
+            # tokenizing is pure Python: keep it off the event loop
+            prescore = await self.run_blocking(self.prescorer.score, comments)
+        threshold = self.config.get_float(
+            "prescorer", "confidence_threshold", Constants.DEFAULT_PRESCORER_CONFIDENCE_THRESHOLD
+        )
+        if prescore is not None and prescore.confidence >= threshold:
+            PRESCORER_RATINGS.labels("short_circuit").inc()
+            rating = AIRating(score=prescore.score)
+        else:
+            rating = await self._rate_with_ai(video_id, comments, prescore)
+
+        # a fallback score must not poison the cache: next request retries
+        if rating.fallback:
+            self.fallback_ratings += 1
+            logger.warning(f"Rater: fallback score for {video_id} ({rating.reason}), not cached")
+            return RatingResponse(score=rating.score, last_updated=datetime.now(), fallback=True)
+
+        # save in cache
+        entry = await self.run_blocking(self.cache.set, video_id, rating.score, fingerprint)
+
+        return RatingResponse(score=entry.score, last_updated=entry.last_updated)
+
+    async def _rate_with_ai(
+        self, video_id: str, comments: Sequence[Any], prescore: PreScore | None
+    ) -> AIRating:
+        """
+        AI rating of comments. When the AI is rate-limited or failed, the local
+        pre-score (if any) replaces the neutral fallback score.
+        """
+        use_prescore = prescore is not None and self.config.get_bool(
+            "prescorer", "as_fallback", True
+        )
+        try:
+            if self.batcher is not None:
+                rating = AIRating.of(await self.batcher.submit(video_id, comments))
+            else:
+                rating = AIRating.of(await self.call(self.ai.rate_comments, comments))
+        except QuotaExceededException as e:
+            if not use_prescore:
+                raise
+            rating = AIRating(score=0.0, fallback=True, reason=f"AI rate-limited: {e.msg}")
+
+        if rating.fallback and use_prescore:
+            PRESCORER_RATINGS.labels("fallback").inc()
+            # still a fallback: not cached, the AI is asked again next time
+            return AIRating(
+                score=prescore.score, fallback=True, reason=f"local pre-score ({rating.reason})"
+            )
+        return rating
+
+    def schedule_refresh(self, video_id: str) -> None:
+        """Refresh a stale entry in background, at most once per video at a time."""
+        if video_id in self._refreshing or self.singleflight.in_flight(video_id):
+            return
+        self._refreshing.add(video_id)
+        task = asyncio.create_task(self._refresh(video_id))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _refresh(self, video_id: str) -> None:
+        try:
+            async with self._refresh_slots, self.scheduler.slot(Priority.PREFETCH):
+                await self.singleflight.do(video_id, lambda: self._rate_shared(video_id))
+        except Exception as e:
+            logger.warning(f"Rater: background refresh of {video_id} failed: {e}")
+        finally:
+            self._refreshing.discard(video_id)
+
+    async def wait_background(self) -> None:
+        """Wait for the background refreshes in progress."""
+        await asyncio.gather(*self._background_tasks, return_exceptions=True)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if hasattr(self.ai, "close"):
+            self.ai.close()
+        self.cache.close()
+
+    async def aclose(self) -> None:
+        """close(), plus the async clients' connection pools."""
+        if hasattr(self.youtube, "aclose"):
+            await self.youtube.aclose()
+        self.close()
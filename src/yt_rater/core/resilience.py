@@ -0,0 +1,121 @@
+# yt_rater/core/resilience.py
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Tuple, Type
+
+from yt_rater.core.exceptions import CircuitOpenException
+
+logger = logging.getLogger(__name__)
+
+
+def retry(
+    func: Callable[[], Any],
+    attempts: int,
+    base_delay: float,
+    max_delay: float,
+    retry_on: Tuple[Type[BaseException], ...],
+    sleep: Callable[[float], Any] = time.sleep,
+    max_total_delay: float | None = None,
+) -> Any:
+    """
+    Call func, retrying up to attempts - 1 times on retry_on exceptions with
+    exponential backoff and full jitter (delay drawn in [0, base * 2^n]).
+    The backoff sleeps in the calling thread: once max_total_delay seconds
+    were spent sleeping, the error is raised instead (long outages are the
+    circuit breaker's job).
+    """
+    slept = 0.0
+    for attempt in range(attempts):
+        try:
+            return func()
+        except retry_on as e:
+            budget = float("inf") if max_total_delay is None else max_total_delay - slept
+            if attempt == attempts - 1 or budget <= 0:
+                raise
+            delay = min(budget, random.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
+            slept += delay
+            logger.warning(f"retry {attempt + 1}/{attempts - 1} in {delay:.2f}s after: {e}")
+            sleep(delay)
+
+
+class CircuitBreaker:
+    """
+    Fail fast while a provider is down: after failure_threshold consecutive
+    failures the circuit opens for reset_timeout seconds, then lets one trial
+    call through (half-open) and closes again if it succeeds.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self.state = self.CLOSED
+        self.rejected = 0
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenException if the call must not be attempted."""
+        with self._lock:
+            if self.state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_running = False
+            if self.state == self.OPEN or (self.state == self.HALF_OPEN and self._trial_running):
+                self.rejected += 1
+                raise CircuitOpenException(f"{self.name} circuit is open")
+            if self.state == self.HALF_OPEN:
+                self._trial_running = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._trial_running = False
+            self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"CircuitBreaker: {self.name} circuit opened")
+                self.state = self.OPEN
+                self._opened_at = self._clock()
+
+    def release(self) -> None:
+        """End a call without a verdict (e.g. it was rate limited)."""
+        with self._lock:
+            self._trial_running = False
+
+    def call(
+        self, func: Callable[[], Any], ignore: Tuple[Type[BaseException], ...] = ()
+    ) -> Any:
+        """Call func through the breaker. ignore exceptions don't count as failures."""
+        self.before_call()
+        try:
+            result = func()
+        except ignore:
+            self.release()
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def status(self) -> dict:
+        return {"state": self.state, "failures": self._failures, "rejected": self.rejected}
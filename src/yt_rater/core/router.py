@@ -0,0 +1,296 @@
+# yt_rater/core/router.py
+import asyncio
+import functools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Sequence
+
+from yt_rater.core.config import Config
+from yt_rater.core.constants import Constants
+from yt_rater.core.metrics import AI_DOWNGRADES, AI_FAILOVERS, AI_HEDGES, AI_ROUTE_SECONDS
+from yt_rater.models.ai_rating import AIRating
+from yt_rater.models.comment import Comment
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyStats:
+    """Latencies of the last window calls of a route, with call and error counts."""
+
+    def __init__(self, window: int = Constants.DEFAULT_ROUTER_LATENCY_WINDOW):
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def record(self, seconds: float, failed: bool = False) -> None:
+        with self._lock:
+            self.calls += 1
+            if failed:
+                self.errors += 1
+            else:
+                self._latencies.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._latencies)
+
+    def percentile(self, p: float) -> float | None:
+        """p-th percentile (0-100) of the recent latencies (nearest rank), None if none."""
+        with self._lock:
+            ordered = sorted(self._latencies)
+        if not ordered:
+            return None
+        rank = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))
+        return ordered[rank]
+
+    def status(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+class Route:
+    """An AI client (a provider or a model) the router can send ratings to."""
+
+    def __init__(self, name: str, client: Any):
+        self.name = name
+        self.client = client
+        # single ratings and batches have their own latency profile
+        self.stats = {"single": LatencyStats(), "batch": LatencyStats()}
+
+
+class AIRouter:
+    """
+    Rate with several AI clients (providers or models of one provider),
+    behind the AIClient interface. routes are in order of preference and
+    the last one is the cheapest or fastest:
+
+    - hedging: when the call to a route takes longer than its usual
+      latency (hedge_percentile of its recent calls, hedge_delay until
+      min_samples calls were seen), the same rating is sent to the next
+      route. The first real score wins and the other call is cancelled.
+      Hedges are capped at max_hedge_ratio of the requests.
+    - failover: when a route fails or gives a fallback score (circuit
+      open, unparsable answer...) before any hedge, the next route is
+      asked.
+    - downgrade: while downgrade_queue_depth ratings are already in
+      flight, new ones go to the last route.
+
+    Synchronous clients run in the router's thread pool: cancelling them
+    only drops their answer, the call itself runs to its end.
+    """
+
+    def __init__(
+        self,
+        routes: Sequence[Route],
+        hedge_percentile: float = Constants.DEFAULT_ROUTER_HEDGE_PERCENTILE,
+        hedge_delay: float = Constants.DEFAULT_ROUTER_HEDGE_DELAY_MS / 1000,
+        min_samples: int = Constants.DEFAULT_ROUTER_HEDGE_MIN_SAMPLES,
+        max_hedge_ratio: float = Constants.DEFAULT_ROUTER_MAX_HEDGE_RATIO,
+        downgrade_queue_depth: int = Constants.DEFAULT_ROUTER_DOWNGRADE_QUEUE_DEPTH,
+        max_workers: int = Constants.DEFAULT_ROUTER_MAX_WORKERS,
+    ):
+        if not routes:
+            raise ValueError("AIRouter needs at least one route")
+        self.routes = list(routes)
+        self.hedge_percentile = hedge_percentile
+        self.hedge_delay = hedge_delay
+        self.min_samples = min_samples
+        self.max_hedge_ratio = max_hedge_ratio
+        self.downgrade_queue_depth = downgrade_queue_depth
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="yt-rater-ai"
+        )
+        self.in_flight = 0
+        self.requests = 0
+        self.hedges = 0
+        self.hedges_won = 0
+        self.downgrades = 0
+        self.failovers = 0
+
+    @classmethod
+    def from_config(cls, config: Config, client_factory: Callable[[str], Any]) -> "AIRouter":
+        """
+        Router over the "models" of [router] (a list, or comma-separated),
+        each client made by client_factory(model). Without models, the
+        configured Gemini model is hedged with itself.
+        """
+        models = config.get("router", "models", []) or []
+        if isinstance(models, str):
+            models = [model.strip() for model in models.split(",") if model.strip()]
+        if not models:
+            models = [config.get_str("gemini", "model", Constants.DEFAULT_GEMINI_MODEL)]
+        return cls(
+            [Route(model, client_factory(model)) for model in models],
+            hedge_percentile=config.get_float(
+                "router", "hedge_percentile", Constants.DEFAULT_ROUTER_HEDGE_PERCENTILE
+            ),
+            hedge_delay=config.get_float(
+                "router", "hedge_delay_ms", Constants.DEFAULT_ROUTER_HEDGE_DELAY_MS
+            ) / 1000,
+            min_samples=config.get_int(
+                "router", "hedge_min_samples", Constants.DEFAULT_ROUTER_HEDGE_MIN_SAMPLES
+            ),
+            max_hedge_ratio=config.get_float(
+                "router", "max_hedge_ratio", Constants.DEFAULT_ROUTER_MAX_HEDGE_RATIO
+            ),
+            downgrade_queue_depth=config.get_int(
+                "router", "downgrade_queue_depth", Constants.DEFAULT_ROUTER_DOWNGRADE_QUEUE_DEPTH
+            ),
+            max_workers=config.get_int(
+                "router", "max_workers", Constants.DEFAULT_ROUTER_MAX_WORKERS
+            ),
+        )
+
+    @property
+    def selector(self) -> Any:
+        """Comment selector of the preferred route (for the prompt metrics)."""
+        return getattr(self.routes[0].client, "selector", None)
+
+    async def rate_comments(self, comments: Sequence[Comment | str]) -> AIRating:
+        return await self._route("single", comments)
+
+    async def rate_comments_batch(
+        self, comments_by_video: Dict[str, Sequence[Comment | str]]
+    ) -> Dict[str, AIRating]:
+        return await self._route("batch", comments_by_video)
+
+    def _pick(self) -> int:
+        """Index of the route for a new rating: the last one when the queue is deep."""
+        if len(self.routes) > 1 and self.in_flight >= self.downgrade_queue_depth:
+            self.downgrades += 1
+            AI_DOWNGRADES.inc()
+            return len(self.routes) - 1
+        return 0
+
+    def _delay(self, route: Route, kind: str) -> float:
+        """How long to wait for route before hedging."""
+        stats = route.stats[kind]
+        if len(stats) < self.min_samples:
+            return self.hedge_delay
+        return stats.percentile(self.hedge_percentile)
+
+    def _may_hedge(self) -> bool:
+        return self.hedges < self.max_hedge_ratio * self.requests
+
+    async def _route(self, kind: str, payload: Any) -> Any:
+        index = self._pick()
+        primary = self.routes[index]
+        # the next route, or the same one again for the last
+        hedge = self.routes[min(index + 1, len(self.routes) - 1)]
+
+        self.requests += 1
+        self.in_flight += 1
+        tasks = [asyncio.create_task(self._call(primary, kind, payload))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self._delay(primary, kind))
+            if not done and self._may_hedge():
+                self.hedges += 1
+                logger.info(f"AIRouter: {primary.name} is slow, hedging with {hedge.name}")
+                tasks.append(asyncio.create_task(self._call(hedge, kind, payload)))
+                winner = await self._first_good(*tasks)
+                if winner is tasks[1]:
+                    self.hedges_won += 1
+                AI_HEDGES.labels("hedge" if winner is tasks[1] else "primary").inc()
+                return winner.result()
+
+            await asyncio.wait(tasks)
+            if _is_good(tasks[0]) or hedge is primary:
+                return tasks[0].result()
+            self.failovers += 1
+            AI_FAILOVERS.inc()
+            logger.warning(f"AIRouter: {primary.name} gave no score, failing over to {hedge.name}")
+            tasks.append(asyncio.create_task(self._call(hedge, kind, payload)))
+            return (await self._first_good(*tasks)).result()
+        finally:
+            self.in_flight -= 1
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    @staticmethod
+    async def _first_good(first: asyncio.Task, second: asyncio.Task) -> asyncio.Task:
+        """
+        The first task to finish with a real score (not an error or a
+        fallback), or first if neither did. The caller cancels the other.
+        """
+        pending = {first, second}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if _is_good(task):
+                    return task
+        return first
+
+    async def _call(self, route: Route, kind: str, payload: Any) -> Any:
+        method = route.client.rate_comments if kind == "single" else route.client.rate_comments_batch
+        if asyncio.iscoroutinefunction(method):
+            return await self._timed(route, kind, method, payload)
+        loop = asyncio.get_running_loop()
+        # timed in the thread: a cancelled (slow) call still counts in the stats
+        return await loop.run_in_executor(
+            self.executor, functools.partial(self._timed_sync, route, kind, method, payload)
+        )
+
+    @staticmethod
+    def _observe(route: Route, kind: str, start: float, failed: bool) -> None:
+        seconds = time.perf_counter() - start
+        route.stats[kind].record(seconds, failed)
+        if not failed:
+            AI_ROUTE_SECONDS.labels(route.name, kind).observe(seconds)
+
+    def _timed_sync(self, route: Route, kind: str, method: Callable, payload: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            result = method(payload)
+        except Exception:
+            self._observe(route, kind, start, failed=True)
+            raise
+        self._observe(route, kind, start, failed=False)
+        return result
+
+    async def _timed(self, route: Route, kind: str, method: Callable, payload: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            result = await method(payload)
+        except Exception:
+            self._observe(route, kind, start, failed=True)
+            raise
+        self._observe(route, kind, start, failed=False)
+        return result
+
+    def status(self) -> dict:
+        return {
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "hedges": self.hedges,
+            "hedges_won": self.hedges_won,
+            "downgrades": self.downgrades,
+            "failovers": self.failovers,
+            "routes": {
+                route.name: {kind: stats.status() for kind, stats in route.stats.items()}
+                for route in self.routes
+            },
+        }
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _is_good(task: asyncio.Task) -> bool:
+    """Whether a finished call gave a real score (no error, not a fallback)."""
+    return task.exception() is None and not _is_fallback(task.result())
+
+
+def _is_fallback(result: Any) -> bool:
+    """Whether a rating (or every rating of a batch) is a fallback."""
+    if isinstance(result, dict):
+        return bool(result) and all(_is_fallback(rating) for rating in result.values())
+    return isinstance(result, AIRating) and result.fallback
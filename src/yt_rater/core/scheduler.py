@@ -0,0 +1,169 @@
+# yt_rater/core/scheduler.py
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict
+
+from yt_rater.core.config import Config
+from yt_rater.core.constants import Constants
+from yt_rater.core.exceptions import ClientDisconnectedException
+from yt_rater.core.metrics import track
+from yt_rater.models.rating_request import Priority
+
+# wait of a priority relative to interactive, in units of the aging delay
+_RANKS = {Priority.INTERACTIVE: 0, Priority.PREFETCH: 1}
+
+
+class _Waiter:
+    __slots__ = ("priority", "key", "future")
+
+    def __init__(self, priority: Priority, key: float, future: asyncio.Future):
+        self.priority = priority
+        # served in key order: arrival time, later for lower priorities
+        self.key = key
+        self.future = future
+
+
+class PriorityScheduler:
+    """
+    Admission of cache misses to the fetch and rating stages: at most slots
+    run at a time, the others wait and are served interactive first.
+    reserved slots are kept for interactive ratings, so the watched video
+    never waits behind prefetches only. A prefetch that waited aging
+    seconds ranks as a new interactive request, so it is not starved.
+    Queued ratings whose client went away are dropped.
+    """
+    # seconds between two checks of a queued client's connection
+    POLL_INTERVAL = 0.1
+
+    def __init__(
+        self,
+        slots: int = Constants.DEFAULT_SERVER_MAX_WORKERS,
+        reserved: int = Constants.DEFAULT_SERVER_RESERVED_INTERACTIVE_SLOTS,
+        aging: float = Constants.DEFAULT_SERVER_PREFETCH_AGING_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.slots = max(1, slots)
+        # prefetches always get at least one slot
+        self.reserved = max(0, min(reserved, self.slots - 1))
+        self.aging = aging
+        self._clock = clock
+        self._queues: Dict[Priority, Deque[_Waiter]] = {
+            priority: deque() for priority in Priority
+        }
+        self.running = 0
+        self.admitted = 0
+        self.dropped = 0
+
+    @classmethod
+    def from_config(cls, config: Config) -> "PriorityScheduler":
+        slots = config.get_int("server", "rating_slots", Constants.DEFAULT_SERVER_RATING_SLOTS)
+        return cls(
+            # 0: as many as the blocking calls running at once
+            slots=slots or config.get_int(
+                "server", "max_workers", Constants.DEFAULT_SERVER_MAX_WORKERS
+            ),
+            reserved=config.get_int(
+                "server", "reserved_interactive_slots",
+                Constants.DEFAULT_SERVER_RESERVED_INTERACTIVE_SLOTS,
+            ),
+            aging=config.get_float(
+                "server", "prefetch_aging_seconds",
+                Constants.DEFAULT_SERVER_PREFETCH_AGING_SECONDS,
+            ),
+        )
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        priority: Priority = Priority.INTERACTIVE,
+        disconnected: Callable[[], Awaitable[bool]] | None = None,
+    ) -> AsyncIterator[bool]:
+        """Hold a slot for the block. Yields whether the caller had to wait for it."""
+        waited = await self.acquire(priority, disconnected)
+        try:
+            yield waited
+        finally:
+            self.release()
+
+    def _allowed(self, priority: Priority) -> bool:
+        limit = self.slots if priority is Priority.INTERACTIVE else self.slots - self.reserved
+        return self.running < limit
+
+    def _dispatch(self) -> None:
+        """Give the free slots to the first waiters allowed to run."""
+        while True:
+            heads = [
+                queue[0] for priority, queue in self._queues.items()
+                if queue and self._allowed(priority)
+            ]
+            if not heads:
+                return
+            waiter = min(heads, key=lambda w: w.key)
+            self._queues[waiter.priority].popleft()
+            self.running += 1
+            self.admitted += 1
+            waiter.future.set_result(None)
+
+    async def acquire(
+        self,
+        priority: Priority = Priority.INTERACTIVE,
+        disconnected: Callable[[], Awaitable[bool]] | None = None,
+    ) -> bool:
+        """
+        Wait for a slot. While queued, disconnected() is checked every
+        POLL_INTERVAL: ClientDisconnectedException once it is True.
+        """
+        if not any(self._queues.values()) and self._allowed(priority):
+            self.running += 1
+            self.admitted += 1
+            return False
+
+        waiter = _Waiter(
+            priority,
+            self._clock() + _RANKS[priority] * self.aging,
+            asyncio.get_running_loop().create_future(),
+        )
+        self._queues[priority].append(waiter)
+        self._dispatch()
+        if waiter.future.done():
+            # only lower priorities were queued: admitted right away
+            return False
+        try:
+            with track(f"queue_{priority.value}"):
+                while not waiter.future.done():
+                    await asyncio.wait(
+                        {waiter.future}, timeout=self.POLL_INTERVAL if disconnected else None
+                    )
+                    if (
+                        not waiter.future.done()
+                        and disconnected is not None
+                        and await disconnected()
+                    ):
+                        self.dropped += 1
+                        raise ClientDisconnectedException(
+                            f"Client went away before its {priority.value} rating started"
+                        )
+        except BaseException:
+            if waiter.future.done():
+                # admitted meanwhile: hand the slot over
+                self.release()
+            else:
+                waiter.future.cancel()
+                self._queues[priority].remove(waiter)
+            raise
+        return True
+
+    def release(self) -> None:
+        self.running -= 1
+        self._dispatch()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "running": self.running,
+            "admitted": self.admitted,
+            "dropped": self.dropped,
+            **{f"queued_{p.value}": len(queue) for p, queue in self._queues.items()},
+        }
@@ -1,30 +1,91 @@
-from fastapi import FastAPI, HTTPException
+import hashlib
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from email.utils import formatdate, parsedate_to_datetime
+from typing import AsyncIterator, Dict, List
+
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from datetime import datetime
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from prometheus_client import CollectorRegistry
 
-from yt_rater.models.rating_request import RatingRequest
+from yt_rater.models.batch_rating_request import BatchRatingRequest
+from yt_rater.models.batch_rating_response import BatchRatingItem, BatchRatingResponse
+from yt_rater.models.job import JobResponse
+from yt_rater.models.rating_request import Priority, RatingRequest
 from yt_rater.models.rating_response import RatingResponse
 from yt_rater.core.cache import Cache
 from yt_rater.core.config import Config
+from yt_rater.core.constants import Constants
 from yt_rater.core.youtube import YoutubeClient
+from yt_rater.core.youtube_http import HttpYoutubeClient
 from yt_rater.core.gemini import GeminiClient
-from yt_rater.core.exceptions import InvalidURLException, NoCommentFound
+from yt_rater.core.jobs import Job, JobQueue
+from yt_rater.core.metrics import CONTENT_TYPE_LATEST, RaterCollector, render, track
+from yt_rater.core.rater import Rater
+from yt_rater.core.router import AIRouter
+from yt_rater.core.ratelimit import get_limiter, limiters
+from yt_rater.core.video import VIDEO_ID_PATTERN
+from yt_rater.core.exceptions import (
+    ClientDisconnectedException,
+    InvalidURLException,
+    JobQueueFullException,
+    NoCommentFound,
+    QuotaExceededException,
+    UnknownYouTubeBackendException,
+)
 
-config = Config()
+logger = logging.getLogger(__name__)
 
 class Server:
-    def __init__(self, port: int = config.get("server", "port")):
-        self.port = port
-        print (self.port)
-        self.app = FastAPI(title="YT Rater API")
+    def __init__(self, port: int | None = None):
         self.config = Config()
+        self.port = port or self.config.get("server", "port", Constants.DEFAULT_SERVER_PORT)
+        self.app = FastAPI(title="YT Rater API", lifespan=self._lifespan)
         self.cache = Cache()
-        self.youtube = YoutubeClient()
-        self.gemini = GeminiClient()
+        self.youtube = self._create_youtube_client()
+        self.gemini = self._create_ai_client()
+        self.rater = Rater(self.cache, self.youtube, self.gemini, self.config)
+        # cache misses rated in background in async mode, admitted by priority by the rater
+        self.jobs = JobQueue(
+            self.rater.rate,
+            max_pending=self.config.get_int(
+                "server", "max_pending_jobs", Constants.DEFAULT_SERVER_MAX_PENDING_JOBS
+            ),
+            retention=self.config.get_float(
+                "server", "job_retention_seconds", Constants.DEFAULT_SERVER_JOB_RETENTION_SECONDS
+            ),
+        )
+        # per-server metrics (cache, coalescing...), next to the process-wide ones
+        self.metrics = CollectorRegistry()
+        self.metrics.register(RaterCollector(self.rater))
 
         self._setup_routes()
         self._setup_cors()
 
+    def _create_youtube_client(self):
+        """Instantiate the client selected by the "backend" key of [youtube]."""
+        backend = self.config.get_str("youtube", "backend", Constants.DEFAULT_YOUTUBE_BACKEND)
+        if backend == "http":
+            return HttpYoutubeClient()
+        if backend == "discovery":
+            return YoutubeClient()
+        raise UnknownYouTubeBackendException(f"Unknown YouTube backend: {backend}")
+
+    def _create_ai_client(self):
+        """Gemini, or a router over several Gemini models if [router] is enabled."""
+        if self.config.get_bool("router", "enabled", False):
+            return AIRouter.from_config(self.config, lambda model: GeminiClient(model=model))
+        return GeminiClient()
+
+    @asynccontextmanager
+    async def _lifespan(self, app: FastAPI):
+        yield
+        await self.jobs.aclose()
+        await self.rater.aclose()
+
     def _setup_cors(self):
         """Allow front-end to access local API."""
         self.app.add_middleware(
@@ -33,42 +94,239 @@ class Server:
             allow_credentials=True,
             allow_methods=["*"],
             allow_headers=["*"],
+            # readable by the extension, e.g. to revalidate by hand
+            expose_headers=["ETag", "Last-Modified", "Location", "Retry-After"],
         )
 
-    def _setup_routes(self):
-        @self.app.post("/rate", response_model=RatingResponse)
-        async def rate_video(request: RatingRequest):
-            url = str(request.url)
+    @staticmethod
+    def _http_error(e: Exception) -> HTTPException:
+        """Map a rating failure to the HTTP error returned to the client."""
+        if isinstance(e, InvalidURLException):
+            return HTTPException(status_code=403, detail=f"403 Forbidden {e}")
+        if isinstance(e, NoCommentFound):
+            return HTTPException(status_code=404, detail=f"No Comment Found!")
+        if isinstance(e, QuotaExceededException):
+            return HTTPException(
+                status_code=429,
+                detail=f"Too Many Requests: {e.msg}",
+                headers={"Retry-After": str(max(1, round(e.retry_after)))},
+            )
+        if isinstance(e, ClientDisconnectedException):
+            # nobody reads it: nginx's "client closed request"
+            return HTTPException(status_code=499, detail=f"Client Closed Request: {e.msg}")
+        if isinstance(e, JobQueueFullException):
+            return HTTPException(
+                status_code=503,
+                detail=f"Service Unavailable: {e.msg}",
+                headers={"Retry-After": "1"},
+            )
+        return HTTPException(status_code=500, detail=f"Internal Server Error: {e}")
+
+    def _cache_headers(self, video_id: str, response: RatingResponse) -> Dict[str, str]:
+        """
+        HTTP caching headers of a rating: validators from the stored entry and
+        a max-age of its remaining TTL. Stale entries must be revalidated
+        (they are being refreshed), fallbacks are not to be stored at all.
+        """
+        if response.fallback:
+            return {"Cache-Control": "no-store"}
+        updated_at = response.last_updated.timestamp()
+        tag = hashlib.blake2s(
+            f"{video_id}:{response.score}:{updated_at}".encode(), digest_size=8
+        ).hexdigest()
+        headers = {
+            "ETag": f'"{tag}"',
+            "Last-Modified": formatdate(updated_at, usegmt=True),
+        }
+        if response.stale:
+            headers["Cache-Control"] = "no-cache"
+        else:
+            max_age = max(0, int(self.cache.ttl - (time.time() - updated_at)))
+            headers["Cache-Control"] = f"public, max-age={max_age}"
+        return headers
+
+    @staticmethod
+    def _not_modified(request: Request, headers: Dict[str, str]) -> bool:
+        """
+        Whether the client copy is current: If-None-Match matches the ETag
+        (weak comparison), or, without If-None-Match, nothing changed since
+        If-Modified-Since.
+        """
+        etag = headers.get("ETag")
+        if etag is None:
+            return False
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            return parsedate_to_datetime(headers["Last-Modified"]) <= since
+        return False
+
+    def _wants_async(self, prefer: str | None) -> bool:
+        """Async mode: enabled in config, or asked with "Prefer: respond-async"."""
+        if prefer and "respond-async" in [p.strip().lower() for p in prefer.split(",")]:
+            return True
+        return self.config.get_bool("server", "async_jobs", False)
 
-            # check cache
-            score = self.cache.get(url)
-            if score is not None:
-                return RatingResponse(score=score, last_updated=datetime.now())
+    def _job_response(self, job: Job) -> JobResponse:
+        error = self._http_error(job.error) if job.error is not None else None
+        return JobResponse(
+            id=job.id,
+            video_id=job.video_id,
+            status=job.status,
+            created_at=job.created_at,
+            result=job.result,
+            error_status=error.status_code if error else None,
+            error=error.detail if error else None,
+        )
 
+    async def _rate_batch(
+        self, items: List[str], priority: Priority = Priority.INTERACTIVE
+    ) -> AsyncIterator[BatchRatingItem]:
+        """Yield one BatchRatingItem per input, in completion order."""
+        video_ids: List[str] = []
+        positions: List[int] = []
+        for index, item in enumerate(items):
             try:
-                # extract video ID
-                video_id = self.youtube.get_video_id(url)
+                video_ids.append(self.youtube.get_video_id(item))
+                positions.append(index)
+            except InvalidURLException as e:
+                error = self._http_error(e)
+                yield BatchRatingItem(
+                    index=index, input=item, status=error.status_code, error=error.detail
+                )
 
-                # fetch comments
-                comments = self.youtube.fetch_comments(
-                    video_id, max_comments=config.get("youtube", "max_comments_per_video")
+        concurrency = self.config.get(
+            "server", "batch_concurrency", Constants.DEFAULT_SERVER_BATCH_CONCURRENCY
+        )
+        async for i, result in self.rater.rate_many(video_ids, concurrency, priority):
+            index = positions[i]
+            if isinstance(result, Exception):
+                error = self._http_error(result)
+                yield BatchRatingItem(
+                    index=index, input=items[index], video_id=video_ids[i],
+                    status=error.status_code, error=error.detail,
+                )
+            else:
+                yield BatchRatingItem(
+                    index=index, input=items[index], video_id=video_ids[i],
+                    score=result.score, last_updated=result.last_updated, stale=result.stale,
+                    fallback=result.fallback,
                 )
-                if not comments:
-                    raise NoCommentFound
 
-                # get gemini rating
-                score = self.gemini.rate_comments(comments)
+    def _setup_routes(self):
+        @self.app.post(
+            "/rate", response_model=RatingResponse, responses={202: {"model": JobResponse}}
+        )
+        async def rate_video(
+            request: RatingRequest, http_request: Request, prefer: str | None = Header(default=None)
+        ):
+            url = str(request.url)
+
+            try:
+                with track("request"):
+                    # extract video ID
+                    video_id = self.youtube.get_video_id(url)
 
-                # save in cache
-                self.cache.set(url, score)
+                    if not self._wants_async(prefer):
+                        return await self.rater.rate(
+                            video_id, request.priority, http_request.is_disconnected
+                        )
 
-                return RatingResponse(score=score, last_updated=datetime.now())
-            except InvalidURLException as e:
-                raise HTTPException(status_code=403, detail=f"403 Forbidden {e}")
-            except NoCommentFound as e:
-                raise HTTPException(status_code=404, detail=f"No Comment Found!")
+                    # async mode: answer hits, turn misses into a job to poll
+                    response = await self.rater.lookup(video_id)
+                    if response is not None:
+                        return response
+                    job = self.jobs.submit(video_id, request.priority)
             except Exception as e:
-                raise HTTPException(status_code=500, detail=f"Internal Server Error: {e}")
+                raise self._http_error(e)
+
+            return JSONResponse(
+                self._job_response(job).model_dump(mode="json"),
+                status_code=202,
+                headers={"Location": f"/jobs/{job.id}", "Preference-Applied": "respond-async"},
+            )
+
+        @self.app.get("/rate/{video_id}", response_model=RatingResponse)
+        async def get_rating(
+            video_id: str, request: Request, priority: Priority = Priority.INTERACTIVE
+        ):
+            """
+            Rating of a video ID, cacheable by the browser and proxies: answers
+            If-None-Match / If-Modified-Since with 304 Not Modified.
+            """
+            try:
+                with track("request"):
+                    if not VIDEO_ID_PATTERN.match(video_id):
+                        raise InvalidURLException(f"Invalid video ID: {video_id}")
+                    response = await self.rater.rate(video_id, priority, request.is_disconnected)
+            except Exception as e:
+                raise self._http_error(e)
+
+            headers = self._cache_headers(video_id, response)
+            if self._not_modified(request, headers):
+                return Response(status_code=304, headers=headers)
+            return Response(
+                response.model_dump_json(), media_type="application/json", headers=headers
+            )
+
+        @self.app.get("/jobs/{job_id}", response_model=JobResponse)
+        async def get_job(job_id: str):
+            job = self.jobs.get(job_id)
+            if job is None:
+                raise HTTPException(status_code=404, detail="Unknown or expired job")
+            return self._job_response(job)
+
+        @self.app.get("/jobs/{job_id}/events")
+        async def job_events(job_id: str):
+            """Server-sent events: the job state now, then on each change until finished."""
+            job = self.jobs.get(job_id)
+            if job is None:
+                raise HTTPException(status_code=404, detail="Unknown or expired job")
+
+            async def events() -> AsyncIterator[str]:
+                async for update in job.updates():
+                    data = self._job_response(update).model_dump_json()
+                    yield f"event: {update.status.value}\ndata: {data}\n\n"
+
+            return StreamingResponse(
+                events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"}
+            )
+
+        @self.app.post("/rate/batch", response_model=BatchRatingResponse)
+        async def rate_batch(request: BatchRatingRequest):
+            with track("batch_request"):
+                results = [
+                    item async for item in self._rate_batch(request.items, request.priority)
+                ]
+            results.sort(key=lambda item: item.index)
+            return BatchRatingResponse(results=results)
+
+        @self.app.post("/rate/batch/stream")
+        async def rate_batch_stream(request: BatchRatingRequest):
+            async def lines() -> AsyncIterator[str]:
+                async for item in self._rate_batch(request.items, request.priority):
+                    yield json.dumps(item.model_dump(mode="json")) + "\n"
+
+            return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+        @self.app.get("/quota")
+        async def quota():
+            """Remaining client-side quota of each provider."""
+            for provider in ("youtube", "gemini"):
+                get_limiter(provider)
+            return {name: limiter.status() for name, limiter in limiters().items()}
+
+        @self.app.get("/metrics")
+        async def metrics():
+            """Prometheus metrics in text exposition format."""
+            return Response(render(self.metrics), media_type=CONTENT_TYPE_LATEST)
 
     def run(self):
         import uvicorn
@@ -0,0 +1,71 @@
+# yt_rater/core/video.py
+import re
+from urllib.parse import urlparse, parse_qs
+from yt_rater.core.exceptions import InvalidURLException
+
+VIDEO_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{11}$")
+PLAYLIST_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{12,}$")
+CHANNEL_ID_PATTERN = re.compile(r"^UC[A-Za-z0-9_-]{22}$")
+HANDLE_PATTERN = re.compile(r"^@[A-Za-z0-9._-]{3,30}$")
+YOUTUBE_HOSTS = ["www.youtube.com", "youtube.com", "m.youtube.com", "music.youtube.com"]
+PATH_PREFIXES = ["/shorts/", "/embed/", "/live/", "/v/"]
+
+
+def extract_video_id(url: str) -> str:
+    """
+    Return the canonical video ID of a YouTube URL (or of a bare video ID),
+    so that "youtu.be/X" and "watch?v=X&t=30" share the same cache entry.
+    """
+    url = url.strip()
+    if VIDEO_ID_PATTERN.match(url):
+        return url
+
+    parsed = urlparse(url)
+    hostname = parsed.hostname or ""
+    if hostname in YOUTUBE_HOSTS:
+        if parsed.path == "/watch":
+            qs = parse_qs(parsed.query)
+            vid = qs.get("v", [None])[0]
+            if vid:
+                return vid
+        for prefix in PATH_PREFIXES:
+            if parsed.path.startswith(prefix):
+                vid = parsed.path[len(prefix):].split("/")[0]
+                if vid:
+                    return vid
+    elif hostname == "youtu.be":
+        vid = parsed.path.lstrip("/").split("/")[0]
+        if vid:
+            return vid
+    raise InvalidURLException(f"Invalid URL: {url}")
+
+
+def extract_playlist_id(url: str) -> str:
+    """Return the playlist ID of a playlist URL ("list=" parameter) or bare ID."""
+    url = url.strip()
+    if PLAYLIST_ID_PATTERN.match(url):
+        return url
+    parsed = urlparse(url)
+    if parsed.hostname in YOUTUBE_HOSTS or parsed.hostname == "youtu.be":
+        playlist_id = parse_qs(parsed.query).get("list", [None])[0]
+        if playlist_id:
+            return playlist_id
+    raise InvalidURLException(f"Invalid playlist URL: {url}")
+
+
+def extract_channel(url: str) -> str:
+    """
+    Return the channel ID ("UC...") or handle ("@name") of a channel URL,
+    bare channel ID or handle.
+    """
+    url = url.strip()
+    if CHANNEL_ID_PATTERN.match(url) or HANDLE_PATTERN.match(url):
+        return url
+    parsed = urlparse(url)
+    if parsed.hostname in YOUTUBE_HOSTS:
+        parts = [part for part in parsed.path.split("/") if part]
+        if len(parts) >= 2 and parts[0] == "channel" and CHANNEL_ID_PATTERN.match(parts[1]):
+            return parts[1]
+        if parts and HANDLE_PATTERN.match(parts[0]):
+            return parts[0]
+    raise InvalidURLException(f"Invalid channel URL: {url}")
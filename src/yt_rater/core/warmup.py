@@ -0,0 +1,199 @@
+# yt_rater/core/warmup.py
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List
+
+from yt_rater.core.constants import Constants
+from yt_rater.core.exceptions import NoCommentFound, QuotaExceededException, YTRaterException
+from yt_rater.core.rater import Rater
+from yt_rater.core.video import extract_channel, extract_playlist_id, extract_video_id
+from yt_rater.models.rating_request import Priority
+
+logger = logging.getLogger(__name__)
+
+
+class Checkpoint:
+    """
+    Video IDs already warmed, one per line in a file appended as the run
+    goes, so an interrupted run resumes where it stopped.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.done: set[str] = set()
+        if path.exists():
+            self.done = {line.strip() for line in path.read_text().splitlines() if line.strip()}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def add(self, video_id: str) -> None:
+        self.done.add(video_id)
+        self._file.write(video_id + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def read_inputs(lines: Iterable[str]) -> List[str]:
+    """Video URLs or IDs of a file, skipping blank lines and # comments."""
+    inputs = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            inputs.append(line)
+    return inputs
+
+
+async def iter_sources(
+    youtube: Any,
+    videos: Iterable[str] = (),
+    playlists: Iterable[str] = (),
+    channels: Iterable[str] = (),
+    limit: int | None = None,
+) -> AsyncIterator[str]:
+    """
+    Yield video URLs/IDs, then the videos of playlists, then the uploads of
+    channels (at most limit per playlist or channel), listed lazily.
+    """
+    for video in videos:
+        yield video
+    playlist_ids = [extract_playlist_id(playlist) for playlist in playlists]
+    if (playlist_ids or channels) and not hasattr(youtube, "playlist_video_ids"):
+        raise YTRaterException("Playlists and channels need the \"http\" YouTube backend")
+    for channel in channels:
+        playlist_ids.append(await youtube.uploads_playlist_id(extract_channel(channel)))
+    for playlist_id in playlist_ids:
+        async for video_id in youtube.playlist_video_ids(playlist_id, limit):
+            yield video_id
+
+
+class Warmer:
+    """
+    Rate a stream of videos ahead of time so that later requests hit the
+    cache: concurrency videos at a time through the Rater (cache, quotas,
+    batching included), waiting out short quota pauses and stopping on
+    long ones. Yields one record per video, with its timing.
+    """
+
+    def __init__(
+        self,
+        rater: Rater,
+        concurrency: int = Constants.DEFAULT_WARM_CONCURRENCY,
+        checkpoint: Checkpoint | None = None,
+        max_quota_wait: float = Constants.DEFAULT_WARM_MAX_QUOTA_WAIT_SECONDS,
+    ):
+        self.rater = rater
+        self.concurrency = concurrency
+        self.checkpoint = checkpoint
+        self.max_quota_wait = max_quota_wait
+        self.counts: Dict[str, int] = {}
+        self._stop = asyncio.Event()
+
+    async def run(self, inputs: AsyncIterable[str]) -> AsyncIterator[Dict[str, Any]]:
+        """Warm inputs (video URLs or IDs), yielding a record per video, then a summary."""
+        start = time.perf_counter()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        records: asyncio.Queue = asyncio.Queue()
+
+        async def produce() -> None:
+            seen: set[str] = set()
+            try:
+                async for item in inputs:
+                    if self._stop.is_set():
+                        break
+                    try:
+                        video_id = extract_video_id(item)
+                    except YTRaterException as e:
+                        await records.put(self._record(item, "invalid", error=e.msg))
+                        continue
+                    if video_id in seen or (self.checkpoint and video_id in self.checkpoint.done):
+                        self._count("skipped")
+                        continue
+                    seen.add(video_id)
+                    await queue.put(video_id)
+            except Exception as e:
+                # listing a playlist or channel failed: warm what was listed
+                logger.error(f"Warmer: can't list videos: {e}")
+                await records.put(self._record(None, "error", error=str(e)))
+            finally:
+                for _ in range(self.concurrency):
+                    await queue.put(None)
+
+        async def work() -> None:
+            while (video_id := await queue.get()) is not None:
+                if not self._stop.is_set():
+                    await records.put(await self._warm(video_id))
+
+        async def pipeline() -> None:
+            try:
+                await asyncio.gather(produce(), *(work() for _ in range(self.concurrency)))
+            finally:
+                await records.put(None)
+
+        task = asyncio.create_task(pipeline())
+        try:
+            while (record := await records.get()) is not None:
+                yield record
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        seconds = time.perf_counter() - start
+        warmed = sum(n for status, n in self.counts.items() if status != "skipped")
+        yield {"summary": {
+            **self.counts,
+            "videos": warmed,
+            "seconds": round(seconds, 3),
+            "videos_per_second": round(warmed / seconds, 2) if seconds else 0.0,
+        }}
+
+    def _count(self, status: str) -> None:
+        self.counts[status] = self.counts.get(status, 0) + 1
+
+    def _record(self, video_id: str | None, status: str, **fields: Any) -> Dict[str, Any]:
+        self._count(status)
+        return {"video_id": video_id, "status": status, **fields}
+
+    async def _warm(self, video_id: str) -> Dict[str, Any]:
+        """Rate one video unless cached, and record the outcome."""
+        start = time.perf_counter()
+        fields: Dict[str, Any] = {}
+        try:
+            # stale scores are re-rated, not served: the checkpoint needs fresh ones
+            response = await self.rater.lookup(video_id, allow_stale=False)
+            if response is not None:
+                status = "cached"
+            else:
+                response = await self._rate(video_id)
+                status = "fallback" if response.fallback else "rated"
+            fields["score"] = response.score
+        except NoCommentFound:
+            status = "no_comments"
+        except QuotaExceededException as e:
+            # the next videos would fail too: stop, the checkpoint allows resuming
+            self._stop.set()
+            status = "quota_exceeded"
+            fields.update(error=e.msg, retry_after=e.retry_after)
+        except Exception as e:
+            status = "error"
+            fields["error"] = str(e)
+        fields["seconds"] = round(time.perf_counter() - start, 3)
+
+        # fallbacks and errors are retried by the next run
+        if self.checkpoint is not None and status in ("cached", "rated", "no_comments"):
+            self.checkpoint.add(video_id)
+        return self._record(video_id, status, **fields)
+
+    async def _rate(self, video_id: str):
+        while True:
+            try:
+                # behind the videos users are watching
+                return await self.rater.rate(video_id, Priority.PREFETCH, allow_stale=False)
+            except QuotaExceededException as e:
+                if self._stop.is_set() or e.retry_after > self.max_quota_wait:
+                    raise
+                logger.info(f"Warmer: quota reached, waiting {e.retry_after:.1f}s")
+                await asyncio.sleep(e.retry_after)
@@ -1,17 +1,68 @@
 # yt_rater/core/youtube
-from typing import List
-from urllib.parse import urlparse, parse_qs
-from googleapiclient.discovery import build # type: ignore
+from datetime import datetime
+from typing import Dict, List, Tuple
 from yt_rater.core.config import Config
+from yt_rater.core.constants import Constants
 from yt_rater.core.exceptions import (
-    InvalidURLException,
     MissingYouTubeAPIKeyException,
+    NoCommentFound,
+    QuotaExceededException,
 )
-config = Config()
+from yt_rater.core.metrics import YOUTUBE_PAGES, track
+from yt_rater.core.ratelimit import RateLimiter, get_limiter
+from yt_rater.core.video import extract_video_id
+from yt_rater.models.comment import Comment
+from yt_rater.models.video_metadata import VideoMetadata
+
+
+# partial responses: only the fields rating needs
+COMMENT_THREADS_FIELDS = (
+    "items(id,snippet/totalReplyCount,"
+    "snippet/topLevelComment/snippet(textDisplay,publishedAt,likeCount)),"
+    "nextPageToken"
+)
+VIDEOS_FIELDS = "items(id,statistics/commentCount)"
+PLAYLIST_ITEMS_FIELDS = "items/contentDetails/videoId,nextPageToken"
+CHANNELS_FIELDS = "items/contentDetails/relatedPlaylists/uploads"
+
+
+def parse_comment_thread(item: dict) -> Comment:
+    """Build a Comment from a commentThreads resource."""
+    snippet = item["snippet"]["topLevelComment"]["snippet"]
+    published = snippet.get("publishedAt")
+    return Comment(
+        id=item.get("id", ""),
+        text=snippet.get("textDisplay", ""),
+        published_at=datetime.fromisoformat(published).timestamp() if published else 0.0,
+        like_count=snippet.get("likeCount", 0),
+        reply_count=item["snippet"].get("totalReplyCount", 0),
+    )
+
+
+def parse_video_metadata(video_ids: List[str], items: List[dict]) -> Dict[str, VideoMetadata]:
+    """Comment availability of video_ids from videos.list items (missing = unavailable)."""
+    metadata: Dict[str, VideoMetadata] = {
+        video_id: VideoMetadata(video_id=video_id, available=False) for video_id in video_ids
+    }
+    for item in items:
+        count = item.get("statistics", {}).get("commentCount")
+        metadata[item["id"]] = VideoMetadata(
+            video_id=item["id"],
+            comment_count=int(count) if count is not None else None,
+        )
+    return metadata
+
+
+def build(*args, **kwargs):
+    """googleapiclient.discovery.build, imported on first use (slow to import)."""
+    from googleapiclient.discovery import build as discovery_build # type: ignore
+    return discovery_build(*args, **kwargs)
+
 
 class YoutubeClient:
-    def __init__(self, api_key: str | None = None):
+    def __init__(self, api_key: str | None = None, limiter: RateLimiter | None = None):
         self._cfg = Config()
+        self.limiter = limiter or get_limiter("youtube")
         self.api_key = api_key or self._cfg.get("youtube", "api_key")
         if not self.api_key:
             raise MissingYouTubeAPIKeyException(
@@ -19,40 +70,89 @@ class YoutubeClient:
             )
         self.youtube = build("youtube", "v3", developerKey=self.api_key)
 
+    def _execute(self, request, units: int = 1) -> dict:
+        """Execute an API request, charging its quota cost (in units) first."""
+        from googleapiclient.errors import HttpError # type: ignore
+
+        self.limiter.acquire(units=units)
+        try:
+            response = request.execute()
+        except HttpError as e:
+            status = getattr(e.resp, "status", None)
+            if status == 429 or (status == 403 and b"quotaExceeded" in (e.content or b"")):
+                if status == 403:
+                    self.limiter.exhaust("units")
+                retry_after = self.limiter.backoff()
+                raise QuotaExceededException(
+                    f"YouTube quota exceeded ({status})", retry_after=retry_after
+                )
+            if status == 403 and b"commentsDisabled" in (e.content or b""):
+                raise NoCommentFound
+            raise
+        self.limiter.succeeded()
+        return response
+
     def get_video_id(self, url: str) -> str:
         """Extract the video ID from YouTube URL."""
-        parsed = urlparse(url)
-        hostname = parsed.hostname or ""
-        if hostname in ["www.youtube.com", "youtube.com"] and parsed.path == "/watch":
-            qs = parse_qs(parsed.query)
-            vid = qs.get("v", [None])[0]
-            if vid:
-                return vid
-        elif hostname == "youtu.be":
-            return parsed.path.lstrip("/")
-        raise InvalidURLException(f"Invalid URL: {url}")
+        return extract_video_id(url)
 
     def fetch_comments(
-        self, video_id: str, max_comments: int = config.get("youtube", "max_comments_per_video")
+        self, video_id: str, max_comments: int | None = None
     ) -> List[str]:
         """Fetch up to max_comments comments for a YouTube video."""
-        comments: List[str] = []
+        return [c.text for c in self.fetch_comment_threads(video_id, max_comments)]
+
+    def fetch_comment_threads(
+        self,
+        video_id: str,
+        max_comments: int | None = None,
+        since: float | None = None,
+    ) -> List[Comment]:
+        """
+        Fetch up to max_comments top-level comments, in the API's relevance
+        order. With since (epoch), fetch them newest first and stop at the
+        first comment published at or before it.
+        """
+        with track("youtube_comments"):
+            comments, pages = self._fetch_comment_pages(video_id, max_comments, since)
+        YOUTUBE_PAGES.observe(pages)
+        return comments
+
+    def _fetch_comment_pages(
+        self, video_id: str, max_comments: int | None, since: float | None
+    ) -> Tuple[List[Comment], int]:
+        """fetch_comment_threads, also returning the number of pages fetched."""
+        pages = 0
+        comments: List[Comment] = []
         page_token = None
-        max_comments = min(max_comments, self._cfg.get("youtube", "max_comments_per_video"))
+        limit = self._cfg.get(
+            "youtube", "max_comments_per_video", Constants.DEFAULT_MAX_COMMENTS_PER_VIDEO
+        )
+        max_comments = limit if max_comments is None else min(max_comments, limit)
+
+        # only an incremental fetch needs the newest comments first
+        order = {} if since is None else {"order": "time"}
 
         while len(comments) < max_comments:
             request = self.youtube.commentThreads().list(
                 part="snippet",
                 videoId=video_id,
                 textFormat="plainText",
-                maxResults=max_comments - len(comments),
+                maxResults=min(
+                    max_comments - len(comments), Constants.YOUTUBE_COMMENT_THREADS_MAX_RESULTS
+                ),
                 pageToken=page_token,
+                fields=COMMENT_THREADS_FIELDS,
+                **order,
             )
-            response = request.execute()
+            response = self._execute(request)
+            pages += 1
 
             for item in response.get("items", []):
-                snippet = item["snippet"]["topLevelComment"]["snippet"]
-                comments.append(snippet.get("textDisplay", ""))
+                comment = parse_comment_thread(item)
+                if since is not None and comment.published_at <= since:
+                    return comments, pages
+                comments.append(comment)
                 if len(comments) >= max_comments:
                     break
 
@@ -60,4 +160,24 @@ class YoutubeClient:
             if not page_token:
                 break
 
-        return comments
+        return comments, pages
+
+    def fetch_video_metadata(self, video_ids: List[str]) -> Dict[str, VideoMetadata]:
+        """
+        Fetch comment availability of many videos with videos.list (up to 50
+        IDs and 1 quota unit per call). Unknown or private videos are
+        returned as unavailable.
+        """
+        items: List[dict] = []
+        step = Constants.YOUTUBE_VIDEOS_LIST_MAX_IDS
+        for start in range(0, len(video_ids), step):
+            chunk = video_ids[start:start + step]
+            request = self.youtube.videos().list(
+                part="statistics",
+                id=",".join(chunk),
+                maxResults=len(chunk),
+                fields=VIDEOS_FIELDS,
+            )
+            with track("youtube_metadata"):
+                items.extend(self._execute(request).get("items", []))
+        return parse_video_metadata(video_ids, items)
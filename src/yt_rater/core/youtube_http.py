@@ -0,0 +1,219 @@
+# yt_rater/core/youtube_http.py
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+import httpx
+
+from yt_rater.core.config import Config
+from yt_rater.core.constants import Constants
+from yt_rater.core.exceptions import (
+    ChannelNotFoundException,
+    MissingYouTubeAPIKeyException,
+    NoCommentFound,
+    QuotaExceededException,
+)
+from yt_rater.core.metrics import YOUTUBE_PAGES, track
+from yt_rater.core.ratelimit import RateLimiter, get_limiter
+from yt_rater.core.video import extract_video_id
+from yt_rater.core.youtube import (
+    CHANNELS_FIELDS,
+    COMMENT_THREADS_FIELDS,
+    PLAYLIST_ITEMS_FIELDS,
+    VIDEOS_FIELDS,
+    parse_comment_thread,
+    parse_video_metadata,
+)
+from yt_rater.models.comment import Comment
+from yt_rater.models.video_metadata import VideoMetadata
+
+
+class HttpYoutubeClient:
+    """
+    Lean YouTube Data API client for the two endpoints rating needs
+    (commentThreads and videos), over a pooled keep-alive httpx.AsyncClient.
+    Same interface as YoutubeClient, with coroutine fetch methods.
+    """
+    BASE_URL = "https://www.googleapis.com/youtube/v3"
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        limiter: RateLimiter | None = None,
+        base_url: str | None = None,
+        timeout: float | None = None,
+        max_connections: int | None = None,
+    ):
+        self._cfg = Config()
+        self.limiter = limiter or get_limiter("youtube")
+        self.api_key = api_key or self._cfg.get("youtube", "api_key")
+        if not self.api_key:
+            raise MissingYouTubeAPIKeyException(
+                "Missing YouTube API KEY. Configure it with 'yt-rater config'"
+            )
+        timeout = timeout or self._cfg.get_float(
+            "youtube", "http_timeout_seconds", Constants.DEFAULT_YOUTUBE_HTTP_TIMEOUT_SECONDS
+        )
+        max_connections = max_connections or self._cfg.get_int(
+            "youtube", "max_connections", Constants.DEFAULT_YOUTUBE_MAX_CONNECTIONS
+        )
+        self.client = httpx.AsyncClient(
+            base_url=base_url or self._cfg.get_str("youtube", "base_url") or self.BASE_URL,
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0)),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=Constants.DEFAULT_YOUTUBE_KEEPALIVE_SECONDS,
+            ),
+        )
+
+    async def _get(self, path: str, params: Dict[str, Any], units: int = 1) -> dict:
+        """GET an API resource, charging its quota cost (in units) first."""
+        if self.limiter.max_wait:
+            # acquire may sleep until quota is available: not on the event loop
+            await asyncio.to_thread(self.limiter.acquire, units=units)
+        else:
+            self.limiter.acquire(units=units)
+
+        response = await self.client.get(path, params={**params, "key": self.api_key})
+        status = response.status_code
+        if status == 429 or (status == 403 and "quotaExceeded" in response.text):
+            if status == 403:
+                self.limiter.exhaust("units")
+            retry_after = self.limiter.backoff()
+            raise QuotaExceededException(
+                f"YouTube quota exceeded ({status})", retry_after=retry_after
+            )
+        if status == 403 and "commentsDisabled" in response.text:
+            raise NoCommentFound
+        response.raise_for_status()
+        self.limiter.succeeded()
+        return response.json()
+
+    def get_video_id(self, url: str) -> str:
+        """Extract the video ID from YouTube URL."""
+        return extract_video_id(url)
+
+    async def fetch_comments(self, video_id: str, max_comments: int | None = None) -> List[str]:
+        """Fetch up to max_comments comments for a YouTube video."""
+        return [c.text for c in await self.fetch_comment_threads(video_id, max_comments)]
+
+    async def fetch_comment_threads(
+        self,
+        video_id: str,
+        max_comments: int | None = None,
+        since: float | None = None,
+    ) -> List[Comment]:
+        """
+        Fetch up to max_comments top-level comments, in the API's relevance
+        order. With since (epoch), fetch them newest first and stop at the
+        first comment published at or before it.
+        """
+        with track("youtube_comments"):
+            comments, pages = await self._fetch_comment_pages(video_id, max_comments, since)
+        YOUTUBE_PAGES.observe(pages)
+        return comments
+
+    async def _fetch_comment_pages(
+        self, video_id: str, max_comments: int | None, since: float | None
+    ) -> Tuple[List[Comment], int]:
+        """fetch_comment_threads, also returning the number of pages fetched."""
+        pages = 0
+        comments: List[Comment] = []
+        page_token = None
+        limit = self._cfg.get(
+            "youtube", "max_comments_per_video", Constants.DEFAULT_MAX_COMMENTS_PER_VIDEO
+        )
+        max_comments = limit if max_comments is None else min(max_comments, limit)
+
+        while len(comments) < max_comments:
+            params = {
+                "part": "snippet",
+                "videoId": video_id,
+                "textFormat": "plainText",
+                "maxResults": min(
+                    max_comments - len(comments), Constants.YOUTUBE_COMMENT_THREADS_MAX_RESULTS
+                ),
+                "fields": COMMENT_THREADS_FIELDS,
+            }
+            if since is not None:
+                # only an incremental fetch needs the newest comments first
+                params["order"] = "time"
+            if page_token:
+                params["pageToken"] = page_token
+            response = await self._get("/commentThreads", params)
+            pages += 1
+
+            for item in response.get("items", []):
+                comment = parse_comment_thread(item)
+                if since is not None and comment.published_at <= since:
+                    return comments, pages
+                comments.append(comment)
+                if len(comments) >= max_comments:
+                    break
+
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                break
+
+        return comments, pages
+
+    async def fetch_video_metadata(self, video_ids: List[str]) -> Dict[str, VideoMetadata]:
+        """
+        Fetch comment availability of many videos with videos.list (up to 50
+        IDs and 1 quota unit per call). Unknown or private videos are
+        returned as unavailable.
+        """
+        step = Constants.YOUTUBE_VIDEOS_LIST_MAX_IDS
+        with track("youtube_metadata"):
+            responses = await asyncio.gather(*(
+                self._get("/videos", {
+                    "part": "statistics",
+                    "id": ",".join(video_ids[start:start + step]),
+                    "maxResults": len(video_ids[start:start + step]),
+                    "fields": VIDEOS_FIELDS,
+                })
+                for start in range(0, len(video_ids), step)
+            ))
+        items = [item for response in responses for item in response.get("items", [])]
+        return parse_video_metadata(video_ids, items)
+
+    async def playlist_video_ids(
+        self, playlist_id: str, max_videos: int | None = None
+    ) -> AsyncIterator[str]:
+        """Yield the video IDs of a playlist, page by page (1 quota unit per page)."""
+        count = 0
+        page_token = None
+        while True:
+            params = {
+                "part": "contentDetails",
+                "playlistId": playlist_id,
+                "maxResults": Constants.YOUTUBE_PLAYLIST_ITEMS_MAX_RESULTS,
+                "fields": PLAYLIST_ITEMS_FIELDS,
+            }
+            if page_token:
+                params["pageToken"] = page_token
+            response = await self._get("/playlistItems", params)
+            for item in response.get("items", []):
+                yield item["contentDetails"]["videoId"]
+                count += 1
+                if max_videos is not None and count >= max_videos:
+                    return
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return
+
+    async def uploads_playlist_id(self, channel: str) -> str:
+        """ID of the uploads playlist of a channel, given its ID or @handle."""
+        params = {"part": "contentDetails", "fields": CHANNELS_FIELDS}
+        if channel.startswith("@"):
+            params["forHandle"] = channel
+        else:
+            params["id"] = channel
+        items = (await self._get("/channels", params)).get("items") or []
+        if not items:
+            raise ChannelNotFoundException(f"Channel not found: {channel}")
+        return items[0]["contentDetails"]["relatedPlaylists"]["uploads"]
+
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        await self.client.aclose()
@@ -0,0 +1,15 @@
+# yt_rater/models/ai_rating.py
+from pydantic import BaseModel, Field
+
+class AIRating(BaseModel):
+    """Result of an AI rating: a real score, or a fallback when the AI failed."""
+    score: float = Field(ge=0.0, le=5.0)
+    fallback: bool = False
+    reason: str | None = None
+
+    @classmethod
+    def of(cls, value: "AIRating | float") -> "AIRating":
+        """Wrap a bare float score (e.g. from a simple AI client)."""
+        if isinstance(value, AIRating):
+            return value
+        return cls(score=float(value))
@@ -0,0 +1,9 @@
+# yt_rater/models/batch_rating_request.py
+from typing import List
+from pydantic import BaseModel, Field
+from yt_rater.core.constants import Constants
+from yt_rater.models.rating_request import Priority
+
+class BatchRatingRequest(BaseModel):
+    items: List[str] = Field(min_length=1, max_length=Constants.DEFAULT_BATCH_MAX_ITEMS)
+    priority: Priority = Priority.INTERACTIVE
@@ -0,0 +1,18 @@
+# yt_rater/models/batch_rating_response.py
+from typing import List
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+class BatchRatingItem(BaseModel):
+    index: int
+    input: str
+    video_id: str | None = None
+    status: int = 200
+    score: float | None = Field(default=None, ge=0.0, le=5.0)
+    last_updated: datetime | None = None
+    stale: bool = False
+    fallback: bool = False
+    error: str | None = None
+
+class BatchRatingResponse(BaseModel):
+    results: List[BatchRatingItem]
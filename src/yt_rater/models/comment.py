@@ -0,0 +1,10 @@
+# yt_rater/models/comment.py
+from pydantic import BaseModel
+
+class Comment(BaseModel):
+    """A top-level YouTube comment, as far as rating needs it."""
+    id: str = ""
+    text: str
+    published_at: float = 0.0
+    like_count: int = 0
+    reply_count: int = 0
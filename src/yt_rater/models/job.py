@@ -0,0 +1,22 @@
+# yt_rater/models/job.py
+from datetime import datetime
+from enum import Enum
+from pydantic import BaseModel
+from yt_rater.models.rating_response import RatingResponse
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+class JobResponse(BaseModel):
+    id: str
+    video_id: str
+    status: JobStatus
+    created_at: datetime
+    # set once done
+    result: RatingResponse | None = None
+    # set once failed: HTTP status the synchronous /rate would have returned
+    error_status: int | None = None
+    error: str | None = None
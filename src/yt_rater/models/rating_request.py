@@ -1,5 +1,12 @@
 # yt_rater/models/rating_request.py
+from enum import Enum
 from pydantic import BaseModel, HttpUrl
 
+class Priority(str, Enum):
+    """How soon a rating is needed: the video being watched, or a prefetch."""
+    INTERACTIVE = "interactive"
+    PREFETCH = "prefetch"
+
 class RatingRequest(BaseModel):
     url: HttpUrl
+    priority: Priority = Priority.INTERACTIVE
@@ -5,3 +5,6 @@ from datetime import datetime
 class RatingResponse(BaseModel):
     score: float = Field(default=0.0, ge=0.0, le=5.0)
     last_updated: datetime
+    stale: bool = False
+    # the AI failed: neutral score, not cached
+    fallback: bool = False
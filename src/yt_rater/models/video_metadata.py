@@ -0,0 +1,17 @@
+# yt_rater/models/video_metadata.py
+from pydantic import BaseModel
+
+class VideoMetadata(BaseModel):
+    """What videos.list tells us about a video before fetching its comments."""
+    video_id: str
+    available: bool = True
+    comment_count: int | None = None
+
+    @property
+    def comments_enabled(self) -> bool:
+        # statistics.commentCount is omitted when comments are disabled
+        return self.comment_count is not None
+
+    @property
+    def has_comments(self) -> bool:
+        return self.available and bool(self.comment_count)
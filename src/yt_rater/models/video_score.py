@@ -0,0 +1,7 @@
+# yt_rater/models/video_score.py
+from pydantic import BaseModel
+
+class VideoScore(BaseModel):
+    """One item of a batched AI rating (structured output schema)."""
+    video_id: str
+    score: float
@@ -0,0 +1,114 @@
+# yt_rater/testing/fake_gemini.py
+import json
+import re
+import time
+import zlib
+from typing import Dict, Iterator, List, Tuple
+
+from yt_rater.testing.fake_server import FakeAPIServer
+
+# video sections of a batch prompt (see AIClient._build_batch_prompt)
+_VIDEO_SECTION = re.compile(r"^### Vidéo (\S+)$", re.MULTILINE)
+# what a chatty model adds after the score when the output is not constrained
+_EXPLANATION = (
+    "\n\nLa majorité des commentaires sont positifs : les spectateurs saluent la clarté "
+    "des explications et la qualité du montage, quelques-uns regrettent la longueur."
+)
+# characters per generated token
+_TOKEN_CHARS = 4
+
+
+class FakeGeminiServer(FakeAPIServer):
+    """
+    Fake Gemini API answering models/{model}:generateContent with a
+    deterministic score (derived from the prompt), or a JSON list of scores
+    for batch prompts; :streamGenerateContent streams the same answer token
+    by token. token_latency (seconds) is the generation time of each token,
+    verbose adds an explanation after the score unless the answer must be
+    JSON, and maxOutputTokens truncates the answer. model_latency adds
+    seconds to the answers of some models. Point GeminiClient at url
+    ("[gemini] base_url").
+    """
+
+    def __init__(
+        self, latency: float = 0.0, error_rate: float = 0.0, seed: int | None = None,
+        token_latency: float = 0.0, verbose: bool = False,
+        model_latency: Dict[str, float] | None = None,
+    ):
+        super().__init__(latency, error_rate, seed)
+        self.token_latency = token_latency
+        self.verbose = verbose
+        self.model_latency = model_latency or {}
+        self.prompts: List[str] = []
+        self.generated_tokens = 0
+
+    @staticmethod
+    def score(text: str) -> float:
+        """Stable score in [0, 5] for a prompt or video ID."""
+        return round(zlib.crc32(text.encode()) % 501 / 100, 2)
+
+    def _answer(self, prompt: str, json_only: bool) -> str:
+        video_ids = _VIDEO_SECTION.findall(prompt)
+        if video_ids:
+            return json.dumps([
+                {"video_id": video_id, "score": self.score(video_id)} for video_id in video_ids
+            ])
+        answer = str(self.score(prompt))
+        return answer if json_only or not self.verbose else answer + _EXPLANATION
+
+    @staticmethod
+    def _chunk(text: str, prompt: str, tokens: int, finish: str | None) -> dict:
+        """A response, or a streamed piece of one (with usage on the last)."""
+        chunk: dict = {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}]}
+        if finish is not None:
+            prompt_tokens = len(prompt) // _TOKEN_CHARS
+            chunk["candidates"][0]["finishReason"] = finish
+            chunk["usageMetadata"] = {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": tokens,
+                "totalTokenCount": prompt_tokens + tokens,
+            }
+        return chunk
+
+    def _generate(self, tokens: List[str]) -> Iterator[str]:
+        """Tokens as they are generated, at token_latency each."""
+        for token in tokens:
+            if self.token_latency:
+                time.sleep(self.token_latency)
+            with self._lock:
+                self.generated_tokens += 1
+            yield token
+
+    def _stream(self, prompt: str, tokens: List[str], finish: str) -> Iterator[dict]:
+        for i, token in enumerate(self._generate(tokens)):
+            last = i == len(tokens) - 1
+            yield self._chunk(token, prompt, len(tokens), finish if last else None)
+
+    def handle(
+        self, method: str, path: str, params: Dict[str, str], body: dict | None
+    ) -> Tuple[int, dict | Iterator[dict]]:
+        stream = path.endswith(":streamGenerateContent")
+        if method != "POST" or not (stream or path.endswith(":generateContent")):
+            return 404, {"error": {"code": 404, "message": "not found", "status": "NOT_FOUND"}}
+        body = body or {}
+        prompt = "".join(
+            part.get("text", "")
+            for content in body.get("contents", [])
+            for part in content.get("parts", [])
+        )
+        with self._lock:
+            self.prompts.append(prompt)
+        model = path.rsplit("/", 1)[-1].split(":")[0]
+        if self.model_latency.get(model):
+            time.sleep(self.model_latency[model])
+
+        config = body.get("generationConfig", {})
+        text = self._answer(prompt, config.get("responseMimeType") == "application/json")
+        tokens = [text[i:i + _TOKEN_CHARS] for i in range(0, len(text), _TOKEN_CHARS)]
+        finish = "STOP"
+        if config.get("maxOutputTokens") and len(tokens) > config["maxOutputTokens"]:
+            tokens, finish = tokens[:config["maxOutputTokens"]], "MAX_TOKENS"
+
+        if stream:
+            return 200, self._stream(prompt, tokens, finish)
+        return 200, self._chunk("".join(self._generate(tokens)), prompt, len(tokens), finish)
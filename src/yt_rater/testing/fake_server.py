@@ -0,0 +1,136 @@
+# yt_rater/testing/fake_server.py
+import json
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeAPIServer(ABC):
+    """
+    Local HTTP/1.1 JSON server running in a background thread, base of the
+    fake YouTube and Gemini APIs. latency (seconds) delays each answer and
+    error_rate (0-1) answers that share of requests with a 500. Answers are
+    JSON objects, or server-sent events when handle returns an iterable of
+    them. Use it as a context manager.
+    """
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, seed: int | None = None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests: List[str] = []
+        self.connections = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @abstractmethod
+    def handle(
+        self, method: str, path: str, params: Dict[str, str], body: dict | None
+    ) -> Tuple[int, dict | Iterable[dict]]:
+        """Answer a request with (status, JSON body or events streamed as they come)."""
+
+    @property
+    def url(self) -> str:
+        assert self._server is not None, "server not started"
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeAPIServer":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _respond(
+        self, method: str, raw_path: str, payload: bytes
+    ) -> Tuple[int, dict | Iterable[dict]]:
+        url = urlparse(raw_path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        with self._lock:
+            self.requests.append(url.path)
+            failed = self.error_rate and self._random.random() < self.error_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if failed:
+            return 500, {"error": {"code": 500, "message": "injected error", "status": "INTERNAL"}}
+        body = json.loads(payload) if payload else None
+        return self.handle(method, url.path, params, body)
+
+    def _handler(self) -> type:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # keep-alive, as the real APIs
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                super().setup()
+                with fake._lock:
+                    fake.connections += 1
+
+            def handle(self) -> None:
+                try:
+                    super().handle()
+                except ConnectionResetError:
+                    # the client dropped the connection (e.g. closed a stream early)
+                    pass
+
+            def _serve(self, method: str) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                status, body = fake._respond(method, self.path, self.rfile.read(length))
+                if not isinstance(body, dict):
+                    self._stream(status, body)
+                    return
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _stream(self, status: int, events: Iterable[dict]) -> None:
+                """Send events as server-sent events, in HTTP chunks."""
+                self.send_response(status)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for event in events:
+                        data = f"data: {json.dumps(event)}\r\n\r\n".encode()
+                        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                        self.wfile.flush()
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # the client stopped reading
+                    self.close_connection = True
+
+            def do_GET(self) -> None:
+                self._serve("GET")
+
+            def do_POST(self) -> None:
+                self._serve("POST")
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        return Handler
@@ -0,0 +1,147 @@
+# yt_rater/testing/fake_youtube.py
+from datetime import datetime, timezone
+from typing import Dict, List, Set, Tuple
+
+from yt_rater.core.constants import Constants
+from yt_rater.models.comment import Comment
+from yt_rater.testing.fake_server import FakeAPIServer
+
+
+class FakeYouTubeServer(FakeAPIServer):
+    """
+    Fake YouTube Data API v3 answering commentThreads and videos from
+    in-memory data, for tests and benchmarks. Point HttpYoutubeClient at
+    base_url. page_size caps the comments per page (the API allows 100).
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        page_size: int = Constants.YOUTUBE_COMMENT_THREADS_MAX_RESULTS,
+        quota_exceeded: bool = False,
+        seed: int | None = None,
+    ):
+        super().__init__(latency, error_rate, seed)
+        self.page_size = page_size
+        self.quota_exceeded = quota_exceeded
+        self.videos: Dict[str, List[Comment]] = {}
+        # videos not added explicitly get this many generated comments
+        self.default_comments: int | None = None
+        self.playlists: Dict[str, List[str]] = {}
+        # channel ID or @handle -> uploads playlist ID
+        self.channels: Dict[str, str] = {}
+        # videos whose comments are turned off (commentThreads answers 403)
+        self.comments_disabled: Set[str] = set()
+        # "order" parameter of each commentThreads request (None: relevance)
+        self.comment_orders: List[str | None] = []
+
+    def add_video(self, video_id: str, comments: List[Comment | str]) -> None:
+        """Serve comments (newest first) for video_id."""
+        self.videos[video_id] = [
+            c if isinstance(c, Comment) else Comment(id=f"{video_id}-{i}", text=c)
+            for i, c in enumerate(comments)
+        ]
+
+    def add_playlist(self, playlist_id: str, video_ids: List[str]) -> None:
+        self.playlists[playlist_id] = list(video_ids)
+
+    def add_channel(self, channel_id: str, video_ids: List[str], handle: str | None = None) -> None:
+        """Add a channel whose uploads playlist lists video_ids."""
+        uploads = "UU" + channel_id[2:]
+        self.add_playlist(uploads, video_ids)
+        self.channels[channel_id] = uploads
+        if handle:
+            self.channels[handle] = uploads
+
+    def _comments(self, video_id: str) -> List[Comment] | None:
+        if video_id not in self.videos and self.default_comments is not None:
+            self.add_video(video_id, [
+                Comment(
+                    id=f"{video_id}-{i}",
+                    text=f"Comment {i} about video {video_id}, quite informative",
+                    published_at=1_700_000_000 - i * 60,
+                    like_count=i % 7,
+                )
+                for i in range(self.default_comments)
+            ])
+        return self.videos.get(video_id)
+
+    @property
+    def base_url(self) -> str:
+        return f"{self.url}/youtube/v3"
+
+    @staticmethod
+    def _thread_resource(comment: Comment) -> dict:
+        published = datetime.fromtimestamp(comment.published_at, tz=timezone.utc)
+        return {
+            "id": comment.id,
+            "snippet": {
+                "totalReplyCount": comment.reply_count,
+                "topLevelComment": {"snippet": {
+                    "textDisplay": comment.text,
+                    "publishedAt": published.isoformat().replace("+00:00", "Z"),
+                    "likeCount": comment.like_count,
+                }},
+            },
+        }
+
+    def _comment_threads(self, params: Dict[str, str]) -> Tuple[int, dict]:
+        self.comment_orders.append(params.get("order"))
+        if params.get("videoId") in self.comments_disabled:
+            return 403, {"error": {"code": 403, "errors": [{"reason": "commentsDisabled"}]}}
+        comments = self._comments(params.get("videoId", ""))
+        if comments is None:
+            return 404, {"error": {"code": 404, "errors": [{"reason": "videoNotFound"}]}}
+        max_results = min(int(params.get("maxResults", 20)), self.page_size)
+        start = int(params.get("pageToken") or 0)
+        page = comments[start:start + max_results]
+        body: dict = {"items": [self._thread_resource(c) for c in page]}
+        if start + max_results < len(comments):
+            body["nextPageToken"] = str(start + max_results)
+        return 200, body
+
+    def _video_list(self, params: Dict[str, str]) -> Tuple[int, dict]:
+        items = []
+        for video_id in params.get("id", "").split(","):
+            comments = self._comments(video_id)
+            if video_id in self.comments_disabled:
+                items.append({"id": video_id, "statistics": {}})
+            elif comments is not None:
+                items.append({"id": video_id, "statistics": {"commentCount": str(len(comments))}})
+        return 200, {"items": items}
+
+    def _playlist_items(self, params: Dict[str, str]) -> Tuple[int, dict]:
+        video_ids = self.playlists.get(params.get("playlistId", ""))
+        if video_ids is None:
+            return 404, {"error": {"code": 404, "errors": [{"reason": "playlistNotFound"}]}}
+        max_results = min(int(params.get("maxResults", 5)), self.page_size)
+        start = int(params.get("pageToken") or 0)
+        body: dict = {"items": [
+            {"contentDetails": {"videoId": video_id}}
+            for video_id in video_ids[start:start + max_results]
+        ]}
+        if start + max_results < len(video_ids):
+            body["nextPageToken"] = str(start + max_results)
+        return 200, body
+
+    def _channel_list(self, params: Dict[str, str]) -> Tuple[int, dict]:
+        uploads = self.channels.get(params.get("forHandle") or params.get("id", ""))
+        if uploads is None:
+            return 200, {"items": []}
+        return 200, {"items": [{"contentDetails": {"relatedPlaylists": {"uploads": uploads}}}]}
+
+    def handle(
+        self, method: str, path: str, params: Dict[str, str], body: dict | None
+    ) -> Tuple[int, dict]:
+        if self.quota_exceeded:
+            return 403, {"error": {"code": 403, "errors": [{"reason": "quotaExceeded"}]}}
+        if path.endswith("/commentThreads"):
+            return self._comment_threads(params)
+        if path.endswith("/videos"):
+            return self._video_list(params)
+        if path.endswith("/playlistItems"):
+            return self._playlist_items(params)
+        if path.endswith("/channels"):
+            return self._channel_list(params)
+        return 404, {"error": {"code": 404}}
@@ -0,0 +1,233 @@
+# yt_rater/testing/load.py
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+import httpx
+
+from yt_rater.core.cache import Cache
+from yt_rater.core.config import Config
+from yt_rater.core.constants import Constants
+from yt_rater.core.metrics import REGISTRY
+from yt_rater.core.ratelimit import reset_limiters
+from yt_rater.testing.fake_gemini import FakeGeminiServer
+from yt_rater.testing.fake_youtube import FakeYouTubeServer
+
+# report fields compared against a baseline, and whether higher is better
+COMPARED_METRICS = {
+    "requests_per_second": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+}
+
+
+def percentile(values: List[float], p: float) -> float:
+    """p-th percentile (0-100) of values, by linear interpolation."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+@contextmanager
+def isolated_home(config: Dict[str, Any]) -> Iterator[Path]:
+    """Point Config and Cache at a temporary folder holding config."""
+    saved = (Config.CONFIG_DIR, Config.CONFIG_FILE, Cache.CACHE_FILE, Cache.DB_FILE)
+    with tempfile.TemporaryDirectory(prefix="yt_rater_load_") as tmp:
+        home = Path(tmp)
+        Config.CONFIG_DIR = home
+        Config.CONFIG_FILE = home / Constants.DEFAULT_CONFIG_FILE_NAME
+        Cache.CACHE_FILE = home / Constants.DEFAULT_CACHE_FILE_NAME
+        Cache.DB_FILE = home / Constants.DEFAULT_CACHE_DB_FILE_NAME
+        reset_limiters()
+        try:
+            Config().save(config)
+            yield home
+        finally:
+            Config._instances.pop(Config.CONFIG_FILE, None)
+            Config.CONFIG_DIR, Config.CONFIG_FILE, Cache.CACHE_FILE, Cache.DB_FILE = saved
+            reset_limiters()
+
+
+def _video_id(prefix: str, index: int) -> str:
+    return f"{prefix}{index:010d}"[-11:]
+
+
+def run_scenario(
+    requests: int = 500,
+    concurrency: int = 32,
+    hit_ratio: float = 0.8,
+    hot_videos: int = 20,
+    comments_per_video: int = 100,
+    page_size: int = Constants.YOUTUBE_COMMENT_THREADS_MAX_RESULTS,
+    youtube_latency: float = 0.02,
+    gemini_latency: float = 0.1,
+    error_rate: float = 0.0,
+    seed: int = 0,
+    gemini_token_latency: float = 0.0,
+    gemini_verbose: bool = False,
+    gemini_stream: bool = False,
+    structured_output: bool = True,
+    max_output_tokens: int = Constants.DEFAULT_GEMINI_MAX_OUTPUT_TOKENS,
+    batch_max_size: int = Constants.DEFAULT_GEMINI_BATCH_MAX_SIZE,
+) -> Dict[str, Any]:
+    """
+    Drive Server.app (in process, through httpx) against local fake YouTube
+    and Gemini servers. hit_ratio of the requests target hot_videos rated
+    beforehand (cache hits), the rest target never-seen videos (misses).
+    Return the report: throughput, latency percentiles, statuses, and the
+    mean time to score of single AI ratings.
+    """
+    rng = random.Random(seed)
+    youtube = FakeYouTubeServer(youtube_latency, error_rate, page_size, seed=seed)
+    youtube.default_comments = comments_per_video
+    gemini = FakeGeminiServer(
+        gemini_latency, error_rate, seed=seed,
+        token_latency=gemini_token_latency, verbose=gemini_verbose,
+    )
+    mode = "stream" if gemini_stream else "full"
+    scores_before = _time_to_score(mode)
+
+    with youtube, gemini:
+        config = {
+            "youtube": {
+                "api_key": "load-test",
+                "base_url": youtube.base_url,
+                "max_comments_per_video": comments_per_video,
+                "units_per_day": 10 ** 9,
+                "max_connections": concurrency,
+            },
+            "gemini": {
+                "api_key": "load-test",
+                "base_url": gemini.url,
+                "requests_per_minute": 10 ** 9,
+                "tokens_per_minute": 10 ** 12,
+                "max_quota_wait_seconds": 0,
+                "stream": gemini_stream,
+                "structured_output": structured_output,
+                "max_output_tokens": max_output_tokens,
+                "batch_max_size": batch_max_size,
+            },
+            "server": {"max_workers": concurrency},
+        }
+        with isolated_home(config):
+            # imported here: the server pulls in FastAPI and the AI SDK
+            from yt_rater.core.server import Server
+
+            server = Server()
+            hot = [_video_id("h", i) for i in range(hot_videos)]
+            targets = [
+                rng.choice(hot) if rng.random() < hit_ratio else _video_id("m", i)
+                for i in range(requests)
+            ]
+            report = asyncio.run(_drive(server, hot, targets, concurrency))
+
+    count, total = (now - before for now, before in zip(_time_to_score(mode), scores_before))
+    report["ai_time_to_score_ms"] = round(total / count * 1000, 2) if count else None
+
+    report["scenario"] = {
+        "requests": requests,
+        "concurrency": concurrency,
+        "hit_ratio": hit_ratio,
+        "hot_videos": hot_videos,
+        "comments_per_video": comments_per_video,
+        "page_size": page_size,
+        "youtube_latency": youtube_latency,
+        "gemini_latency": gemini_latency,
+        "error_rate": error_rate,
+        "seed": seed,
+        "gemini_token_latency": gemini_token_latency,
+        "gemini_verbose": gemini_verbose,
+        "gemini_stream": gemini_stream,
+        "structured_output": structured_output,
+        "max_output_tokens": max_output_tokens,
+        "batch_max_size": batch_max_size,
+    }
+    report["upstream"] = {
+        "youtube_requests": len(youtube.requests),
+        "gemini_requests": len(gemini.requests),
+        "gemini_generated_tokens": gemini.generated_tokens,
+    }
+    return report
+
+
+def _time_to_score(mode: str) -> tuple[float, float]:
+    """(count, sum) of the process-wide AI time-to-score histogram of mode."""
+    labels = {"mode": mode}
+    return (
+        REGISTRY.get_sample_value("yt_rater_ai_time_to_score_seconds_count", labels) or 0.0,
+        REGISTRY.get_sample_value("yt_rater_ai_time_to_score_seconds_sum", labels) or 0.0,
+    )
+
+
+async def _drive(
+    server: Any, hot: List[str], targets: List[str], concurrency: int
+) -> Dict[str, Any]:
+    transport = httpx.ASGITransport(app=server.app)
+    limits = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://load", timeout=None
+    ) as client:
+        async def rate(video_id: str, record: bool = True) -> None:
+            url = f"https://www.youtube.com/watch?v={video_id}"
+            async with limits:
+                start = time.perf_counter()
+                response = await client.post("/rate", json={"url": url})
+                elapsed = time.perf_counter() - start
+            if record:
+                latencies.append(elapsed)
+                status = str(response.status_code)
+                statuses[status] = statuses.get(status, 0) + 1
+
+        # warm-up: rate the hot videos once so that they are cache hits
+        await asyncio.gather(*(rate(video_id, record=False) for video_id in hot))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(rate(video_id) for video_id in targets))
+        duration = time.perf_counter() - start
+
+    await server.rater.aclose()
+    ms = [latency * 1000 for latency in latencies]
+    return {
+        "requests": len(latencies),
+        "duration_seconds": round(duration, 3),
+        "requests_per_second": round(len(latencies) / duration, 2) if duration else 0.0,
+        "p50_ms": round(percentile(ms, 50), 2),
+        "p95_ms": round(percentile(ms, 95), 2),
+        "p99_ms": round(percentile(ms, 99), 2),
+        "mean_ms": round(statistics.fmean(ms), 2) if ms else 0.0,
+        "statuses": statuses,
+        "error_ratio": round(
+            sum(n for status, n in statuses.items() if status != "200") / len(latencies), 4
+        ) if latencies else 0.0,
+    }
+
+
+def compare(
+    report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.1
+) -> List[str]:
+    """
+    Regressions of report against baseline: throughput lower, or latency
+    percentiles higher, by more than tolerance (a ratio). Empty if none.
+    """
+    regressions = []
+    for metric, higher_is_better in COMPARED_METRICS.items():
+        old, new = baseline.get(metric), report.get(metric)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        if (-change if higher_is_better else change) > tolerance:
+            regressions.append(f"{metric}: {old} -> {new} ({change:+.1%})")
+    return regressions
@@ -0,0 +1,18 @@
+# tests/conftest.py
+import pytest
+from yt_rater.core.cache import Cache
+from yt_rater.core.config import Config
+from yt_rater.core.constants import Constants
+from yt_rater.core.ratelimit import reset_limiters
+
+
+@pytest.fixture(autouse=True)
+def temp_home(tmp_path, monkeypatch):
+    """Keep every test away from ~/.yt_rater: config and cache files, shared quotas."""
+    monkeypatch.setattr(Config, "CONFIG_DIR", tmp_path)
+    monkeypatch.setattr(Config, "CONFIG_FILE", tmp_path / Constants.DEFAULT_CONFIG_FILE_NAME)
+    monkeypatch.setattr(Cache, "CACHE_FILE", tmp_path / Constants.DEFAULT_CACHE_FILE_NAME)
+    monkeypatch.setattr(Cache, "DB_FILE", tmp_path / Constants.DEFAULT_CACHE_DB_FILE_NAME)
+    reset_limiters()
+    yield tmp_path
+    reset_limiters()
@@ -1,25 +1,23 @@
 # tests/test_cache.py
 import json
+import sqlite3
 import pytest
 from pathlib import Path
 from datetime import datetime, timedelta
 from yt_rater.core.cache import Cache
+from yt_rater.core.cache_backends import CacheEntry, JSONCacheBackend, SQLiteCacheBackend
 from yt_rater.core.config import Config
+from yt_rater.core.fingerprint import CommentFingerprint
 from yt_rater.core.constants import Constants
 
-@pytest.fixture
-def temp_cache_dir(tmp_path, monkeypatch):
-    monkeypatch.setattr(Cache, "CACHE_FILE", tmp_path / Constants.DEFAULT_CACHE_FILE_NAME)
-    yield tmp_path
 
-
-def test_cache_creation(temp_cache_dir):
+def test_cache_creation(temp_home):
     cache = Cache()
-    assert cache.CACHE_FILE.exists()
+    assert cache.DB_FILE.exists()
     assert cache.data == {}
 
 
-def test_cache_get_set(temp_cache_dir):
+def test_cache_get_set(temp_home):
     """Test get and set methods."""
     cache = Cache(expiration_days=7)
 
@@ -34,7 +32,7 @@ def test_cache_get_set(temp_cache_dir):
     assert new_cache.get(url) == score
 
 
-def test_cache_expiration(temp_cache_dir, monkeypatch):
+def test_cache_expiration(temp_home, monkeypatch):
     """Test the entry expiration by simulate a date from two days ago."""
     cache = Cache(expiration_days=1)
 
@@ -43,9 +41,156 @@ def test_cache_expiration(temp_cache_dir, monkeypatch):
     cache.set(url, score)
     assert cache.get(url) == score
 
-    old_date = (datetime.now() - timedelta(days=2)).isoformat()
-    cache._data[url]["last_updated"] = old_date
-    cache.save()
+    old_date = (datetime.now() - timedelta(days=2)).timestamp()
+    cache.backend.set(url, CacheEntry(score, old_date))
 
     new_cache = Cache(expiration_days=1)
     assert new_cache.get(url) is None
+    # expired entries are swept when the cache opens, unless they are still
+    # useful for incremental refresh
+    assert url in new_cache.data
+    assert Cache(expiration_days=1, incremental_refresh=False).data == {}
+
+
+def test_sqlite_backend_uses_wal(temp_home):
+    Cache()
+    conn = sqlite3.connect(Cache.DB_FILE)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    indexes = [row[1] for row in conn.execute("PRAGMA index_list(ratings)")]
+    assert "idx_ratings_updated_at" in indexes
+
+
+def test_sqlite_backend_purge(tmp_path):
+    backend = SQLiteCacheBackend(tmp_path / "cache.sqlite3")
+    backend.set("old", CacheEntry(1.0, 100.0))
+    backend.set("new", CacheEntry(2.0, 300.0))
+    assert backend.purge(older_than=200.0) == 1
+    assert backend.get("old") is None
+    assert backend.get("new") == CacheEntry(2.0, 300.0)
+
+
+def test_sqlite_backend_get_many(tmp_path, monkeypatch):
+    backend = SQLiteCacheBackend(tmp_path / "cache.sqlite3")
+    monkeypatch.setattr(SQLiteCacheBackend, "MAX_QUERY_PARAMETERS", 2)
+    for i in range(5):
+        backend.set(f"vid{i}", CacheEntry(float(i), 100.0 + i))
+
+    entries = backend.get_many(["vid0", "unknown", "vid3", "vid4"])
+    assert entries == {
+        "vid0": CacheEntry(0.0, 100.0),
+        "vid3": CacheEntry(3.0, 103.0),
+        "vid4": CacheEntry(4.0, 104.0),
+    }
+
+
+def test_migration_from_json(temp_home):
+    """The legacy cache.json is imported once, keyed by canonical video ID."""
+    recent = datetime.now() - timedelta(hours=1)
+    older = datetime.now() - timedelta(hours=2)
+    Cache.CACHE_FILE.write_text(json.dumps({
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=30": {
+            "score": 4.0, "last_updated": older.isoformat()
+        },
+        "https://youtu.be/dQw4w9WgXcQ": {
+            "score": 3.5, "last_updated": recent.isoformat()
+        },
+        "https://www.youtube.com/watch?v=abcd": {
+            "score": 2.0, "last_updated": recent.isoformat()
+        },
+    }))
+
+    cache = Cache(expiration_days=7)
+    assert cache.get("dQw4w9WgXcQ") == 3.5
+    assert cache.get("abcd") == 2.0
+    assert not Cache.CACHE_FILE.exists()
+    assert Cache.CACHE_FILE.with_name(Cache.CACHE_FILE.name + ".migrated").exists()
+
+
+def test_json_backend(temp_home, monkeypatch):
+    monkeypatch.setattr(Config, "get", lambda self, section, key, default=None: (
+        "json" if (section, key) == ("cache", "backend") else default
+    ))
+    cache = Cache(expiration_days=7)
+    assert isinstance(cache.backend, JSONCacheBackend)
+    cache.set("video123", 4.5)
+
+    data = json.loads(Cache.CACHE_FILE.read_text())
+    assert data["video123"]["score"] == 4.5
+    assert Cache(expiration_days=7).get("video123") == 4.5
+
+
+def test_memory_tier_lru_eviction(temp_home):
+    cache = Cache(expiration_days=7, max_entries=2)
+    cache.set("a", 1.0)
+    cache.set("b", 2.0)
+    assert cache.get("a") == 1.0  # "a" becomes most recently used
+    cache.set("c", 3.0)           # evicts "b"
+
+    assert cache.stats["memory_entries"] == 2
+    assert cache.evictions == 1
+
+    # evicted entries are read through from disk, then kept in memory again
+    assert cache.get("b") == 2.0
+    assert cache.disk_hits == 1
+    assert cache.get("b") == 2.0
+    assert cache.get("unknown") is None
+    assert cache.stats["hits"] == 2
+    assert cache.stats["misses"] == 1
+
+
+def test_memory_tier_byte_limit(temp_home):
+    cache = Cache(expiration_days=7, max_entries=0, max_bytes=1000)
+    for i in range(100):
+        cache.set(f"video{i:03d}", 4.0)
+    assert 0 < cache.stats["memory_entries"] < 100
+    assert cache.stats["memory_bytes"] <= 1000
+    assert cache.get("video000") == 4.0
+
+
+def test_cache_entry_is_compact():
+    entry = CacheEntry(4.5, 1700000000.0)
+    assert not hasattr(entry, "__dict__")
+
+
+def test_stale_entries(temp_home):
+    cache = Cache(expiration_days=1, stale_while_revalidate=True)
+    two_days_ago = (datetime.now() - timedelta(days=2)).timestamp()
+    cache.backend.set("video123", CacheEntry(3.0, two_days_ago))
+
+    assert cache.get("video123") is None
+    entry = cache.get_entry("video123", allow_stale=True)
+    assert entry is not None and entry.score == 3.0
+    assert cache.is_stale(entry)
+    assert cache.stale_hits == 1
+
+    # stale entries survive the expiry sweep while inside the stale window
+    assert cache.purge_expired() == 0
+    cache.backend.set("video123", CacheEntry(3.0, two_days_ago - 40 * 86400))
+    assert Cache(expiration_days=1, stale_while_revalidate=True).get_entry(
+        "video123", allow_stale=True
+    ) is None
+
+
+def test_fingerprint_persistence(temp_home):
+    fingerprint = CommentFingerprint(("c1", "c2"), "abc", 1000.0)
+    cache = Cache(expiration_days=7)
+    cache.set("video123", 4.0, fingerprint)
+
+    stored = Cache(expiration_days=7).peek("video123")
+    assert stored.fingerprint == fingerprint
+    assert stored.fingerprint.last_published == 1000.0
+    # the memory tier stays compact: fingerprints are only kept on disk
+    assert cache._hot["video123"].fingerprint is None
+
+    cache.touch("video123")
+    assert cache.peek("video123").fingerprint == fingerprint
+
+
+def test_ttl_follows_config(temp_home, monkeypatch):
+    cache = Cache()
+    assert cache.ttl == Constants.DEFAULT_CACHE_EXPIRATION_DAYS * 86400
+
+    Config().set("cache", "expiration_days", 1)
+    assert cache.ttl == 86400
+    # an explicit value is not overridden by the config
+    assert Cache(expiration_days=3).ttl == 3 * 86400
@@ -0,0 +1,165 @@
+# tests/test_cache_redis.py
+import asyncio
+import sys
+import time
+import pytest
+from yt_rater.core.cache import Cache
+from yt_rater.core.cache_backends import CacheEntry, RedisCacheBackend
+from yt_rater.core.config import Config
+from yt_rater.core.exceptions import MissingDependencyException
+from yt_rater.core.fingerprint import CommentFingerprint
+from yt_rater.core.rater import Rater
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture(autouse=True)
+def fake_config(temp_home):
+    return Config()
+
+
+@pytest.fixture
+def redis_server():
+    return fakeredis.FakeServer()
+
+
+def make_backend(redis_server):
+    return RedisCacheBackend(client=fakeredis.FakeRedis(server=redis_server))
+
+
+def test_backend_round_trip(redis_server):
+    backend = make_backend(redis_server)
+    fingerprint = CommentFingerprint(("c1", "c2"), "abc", 1_700_000_000.0)
+    now = time.time()
+    backend.set("vid1", CacheEntry(4.2, now, fingerprint))
+    backend.set("vid2", CacheEntry(3.0, now))
+
+    entry = backend.get("vid1")
+    assert entry.score == 4.2
+    assert entry.fingerprint == fingerprint
+    assert backend.get("unknown") is None
+    assert set(backend.get_many(["vid1", "unknown", "vid2"])) == {"vid1", "vid2"}
+    assert dict(backend.items()).keys() == {"vid1", "vid2"}
+
+    backend.delete("vid1")
+    assert backend.get("vid1") is None
+
+
+def test_backend_uses_native_ttl(redis_server):
+    backend = make_backend(redis_server)
+    client = fakeredis.FakeRedis(server=redis_server)
+    backend.set("vid1", CacheEntry(4.2, time.time()), ttl=3600)
+    backend.set("vid2", CacheEntry(4.2, time.time()))
+
+    assert 3_590_000 < client.pttl("yt_rater:rating:vid1") <= 3_600_000
+    # without a TTL the entry is kept
+    assert client.pttl("yt_rater:rating:vid2") == -1
+    assert backend.purge(time.time()) == 0
+
+
+def test_cache_is_shared_between_instances(redis_server):
+    node_a = Cache(expiration_days=7, backend=make_backend(redis_server))
+    node_b = Cache(expiration_days=7, backend=make_backend(redis_server))
+
+    node_a.set("vid1", 4.0)
+    assert node_b.get("vid1") == 4.0
+    assert node_b.stats["disk_hits"] == 1
+
+
+def test_get_entries_batches_memory_misses(redis_server):
+    backend = make_backend(redis_server)
+    cache = Cache(expiration_days=7, backend=backend)
+    cache.set("hot", 4.0)
+    backend.set("cold", CacheEntry(3.0, time.time()))
+    backend.set("expired", CacheEntry(1.0, time.time() - 8 * 86400))
+
+    entries = cache.get_entries(["hot", "cold", "expired", "unknown", "hot"])
+    assert {k: e.score for k, e in entries.items()} == {"hot": 4.0, "cold": 3.0}
+    assert cache.stats["hits"] == 1
+    assert cache.stats["disk_hits"] == 1
+    assert cache.stats["misses"] == 2
+
+
+def test_lock(redis_server):
+    backend = make_backend(redis_server)
+    token = backend.acquire_lock("vid1", timeout=10)
+    assert token is not None
+    assert backend.is_locked("vid1")
+    assert backend.acquire_lock("vid1", timeout=10) is None
+
+    # only the holder can release it
+    backend.release_lock("vid1", "someone-else")
+    assert backend.is_locked("vid1")
+    backend.release_lock("vid1", token)
+    assert not backend.is_locked("vid1")
+    assert backend.acquire_lock("vid1", timeout=10) is not None
+
+
+class FakeYoutube:
+    def fetch_comments(self, video_id, max_comments=100):
+        return [f"comment on {video_id}"]
+
+
+class SlowAI:
+    def __init__(self):
+        self.calls = 0
+
+    def rate_comments(self, comments):
+        self.calls += 1
+        time.sleep(0.3)
+        return 4.0
+
+
+def test_one_instance_rates_while_the_other_waits(redis_server, fake_config, monkeypatch):
+    fake_config.set("youtube", "prefetch_metadata", False)
+    fake_config.set("cache", "incremental_refresh", False)
+    monkeypatch.setattr(Rater, "LOCK_POLL_INTERVAL", 0.02)
+    ai = SlowAI()
+    node_a = Rater(Cache(expiration_days=7, backend=make_backend(redis_server)), FakeYoutube(), ai)
+    node_b = Rater(Cache(expiration_days=7, backend=make_backend(redis_server)), FakeYoutube(), ai)
+
+    async def scenario():
+        return await asyncio.gather(node_a.rate("vid1"), node_b.rate("vid1"))
+
+    first, second = asyncio.run(scenario())
+    assert first.score == second.score == 4.0
+    assert ai.calls == 1
+    assert node_a.peer_ratings + node_b.peer_ratings == 1
+    assert not node_a.cache.backend.is_locked("vid1")
+
+
+def test_waiting_instance_rates_when_the_holder_gives_up(redis_server, fake_config, monkeypatch):
+    fake_config.set("youtube", "prefetch_metadata", False)
+    fake_config.set("cache", "incremental_refresh", False)
+    monkeypatch.setattr(Rater, "LOCK_POLL_INTERVAL", 0.02)
+    backend = make_backend(redis_server)
+    token = backend.acquire_lock("vid1", timeout=10)
+    ai = SlowAI()
+    rater = Rater(Cache(expiration_days=7, backend=make_backend(redis_server)), FakeYoutube(), ai)
+
+    async def scenario():
+        task = asyncio.ensure_future(rater.rate("vid1"))
+        await asyncio.sleep(0.1)
+        # the other instance failed to rate: lock released, nothing cached
+        backend.release_lock("vid1", token)
+        return await task
+
+    assert asyncio.run(scenario()).score == 4.0
+    assert ai.calls == 1
+    assert rater.peer_ratings == 0
+
+
+def test_missing_redis_package(monkeypatch):
+    monkeypatch.setitem(sys.modules, "redis", None)
+    with pytest.raises(MissingDependencyException):
+        RedisCacheBackend()
+
+
+def test_cache_selects_redis_backend(fake_config, monkeypatch):
+    fake_config.set("cache", "backend", "redis")
+    fake_config.set("cache", "redis_prefix", "test:")
+    monkeypatch.setattr("redis.Redis.from_url", lambda url: fakeredis.FakeRedis())
+
+    cache = Cache(expiration_days=7)
+    assert isinstance(cache.backend, RedisCacheBackend)
+    assert cache.backend.prefix == "test:"
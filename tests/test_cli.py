@@ -5,20 +5,11 @@ import pytest
 from typer.testing import CliRunner
 from yt_rater.cli import app
 from yt_rater.core.config import Config
-from yt_rater.core.constants import Constants
 from yt_rater.core.server import Server
 
 runner = CliRunner()
 
-@pytest.fixture
-def temp_config_dir(tmp_path, monkeypatch):
-    """Redirects the Config to a temporary folder so as not to touch ~/.yt_rater."""
-    monkeypatch.setattr(Config, "CONFIG_DIR", tmp_path)
-    monkeypatch.setattr(Config, "CONFIG_FILE", tmp_path / Constants.DEFAULT_CONFIG_FILE_NAME)
-    monkeypatch.setattr(Config, "CONFIG_FILE", tmp_path / Constants.DEFAULT_CACHE_FILE_NAME)
-    yield tmp_path
-
-def test_config_command_creation(temp_config_dir):
+def test_config_command_creation(temp_home):
     """Test that the 'config' command creates a config file."""
     result = runner.invoke(app, ["config"])
     assert result.exit_code == 0
@@ -30,7 +21,7 @@ def test_config_command_creation(temp_config_dir):
     assert "cache" in data
     assert "server" in data
 
-def test_config_command_show(temp_config_dir):
+def test_config_command_show(temp_home):
     """Test that the 'config --show' command show the content of config file."""
     Config()
     result = runner.invoke(app, ["config", "--show"])
@@ -41,7 +32,7 @@ def test_config_command_show(temp_config_dir):
     assert "cache" in output
     assert "server" in output
 
-def test_run_command(temp_config_dir, monkeypatch):
+def test_run_command(temp_home, monkeypatch):
     """Test that the 'run' command call Server.run() (mocked)."""
     called = {}
 
@@ -0,0 +1,68 @@
+# tests/test_comment_selector.py
+from yt_rater.core.comment_selector import CommentSelector
+from yt_rater.core.config import Config
+from yt_rater.models.comment import Comment
+
+
+def test_drops_short_and_emoji_only_comments():
+    selector = CommentSelector(token_budget=0, min_chars=3)
+    selection = selector.select(["🔥🔥🔥", "ok", "!!!", "Really helpful tutorial"], 10)
+    assert selection.texts == ["Really helpful tutorial"]
+    assert selection.dropped["short"] == 3
+
+
+def test_drops_exact_and_near_duplicates():
+    selector = CommentSelector(token_budget=0, duplicate_similarity=0.8)
+    selection = selector.select([
+        "Great explanation of the topic, thanks!",
+        "great explanation of the topic thanks",        # same once normalized
+        "Great explanation of the topic, thanks!!! :)",  # copy-paste with noise
+        "The audio is too quiet in the second half",
+    ], 10)
+    assert selection.texts == [
+        "Great explanation of the topic, thanks!",
+        "The audio is too quiet in the second half",
+    ]
+    assert selection.dropped["duplicate"] == 2
+
+
+def test_ranks_by_likes_and_replies():
+    selector = CommentSelector(token_budget=0)
+    comments = [
+        Comment(id="a", text="First comment here"),
+        Comment(id="b", text="Most liked comment", like_count=50),
+        Comment(id="c", text="Much discussed comment", like_count=5, reply_count=10),
+    ]
+    selection = selector.select(comments, 2)
+    assert selection.texts == ["Most liked comment", "Much discussed comment"]
+
+
+def test_fits_token_budget_and_reports_savings():
+    selector = CommentSelector(token_budget=30, duplicate_similarity=1.0)
+    comments = [f"Comment number {i} with some words in it" for i in range(20)]
+    selection = selector.select(comments, 20)
+    assert 0 < len(selection.texts) < 20
+    assert selection.dropped["budget"] == 20 - len(selection.texts)
+    assert selection.tokens_after <= 30
+    assert selection.tokens_saved == selection.tokens_before - selection.tokens_after > 0
+    assert selector.stats["tokens_saved"] == selection.tokens_saved
+    assert selector.stats["comments_kept"] == len(selection.texts)
+
+
+def test_reads_config_changes_live():
+    config = Config()
+    selector = CommentSelector.from_config("gemini", config)
+    comments = ["Really helpful tutorial", "ok"]
+    assert selector.select(comments, 10).texts == ["Really helpful tutorial"]
+
+    config.set("gemini", "min_comment_chars", 1)
+    assert selector.select(comments, 10).texts == comments
+
+
+def test_candidates_are_capped():
+    selector = CommentSelector(token_budget=0, duplicate_similarity=1.0, max_candidates=5)
+    comments = [f"Comment number {i} with some words in it" for i in range(20)]
+    selection = selector.select(comments, 20)
+    # only the first, most relevant comments are compared and kept
+    assert selection.texts == comments[:5]
+    assert selection.dropped["capped"] == 15
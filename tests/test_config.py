@@ -1,29 +1,21 @@
 # tests/test_config.py
+import os
 import tomllib
+import tomli_w
 import pytest
 from pathlib import Path
 from yt_rater.core.config import Config
 from yt_rater.core.constants import Constants
 
-@pytest.fixture
-def temp_config_dir(tmp_path):
-    original_dir = Config.CONFIG_DIR
-    Config.CONFIG_DIR = tmp_path
-    Config.CONFIG_FILE = tmp_path / Constants.DEFAULT_CONFIG_FILE_NAME
-    yield tmp_path
 
-    Config.CONFIG_DIR = original_dir
-    Config.CONFIG_FILE = original_dir / Constants.DEFAULT_CONFIG_FILE_NAME
-
-
-def test_config_creation(temp_config_dir):
+def test_config_creation(temp_home):
     cfg = Config()
     assert cfg.CONFIG_FILE.exists()
     data = tomllib.loads(cfg.CONFIG_FILE.read_text())
     assert data == cfg.data
 
 
-def test_config_get(temp_config_dir):
+def test_config_get(temp_home):
     cfg = Config()
     assert cfg.data.keys() == Constants.DEFAULT_CONFIG.keys()
 
@@ -33,9 +25,48 @@ def test_config_get(temp_config_dir):
             assert cfg.get(section, key) == val
 
 
-def test_config_set(temp_config_dir):
+def test_config_set(temp_home):
     cfg = Config()
     cfg.set("cache", "expiration_days", 10)
     assert cfg.get("cache", "expiration_days") == 10
     new_cfg = Config()
     assert new_cfg.data == cfg.data
+
+
+def test_config_is_shared(temp_home):
+    assert Config() is Config()
+
+
+def test_config_hot_reload(temp_home, monkeypatch):
+    monkeypatch.setattr(Config, "RELOAD_CHECK_INTERVAL", 0)
+    cfg = Config()
+    reloaded = []
+    cfg.on_reload(reloaded.append)
+
+    data = tomllib.loads(cfg.CONFIG_FILE.read_text())
+    data["gemini"]["model"] = "gemini-2.5-pro"
+    cfg.CONFIG_FILE.write_text(tomli_w.dumps(data))
+    # make sure the change is visible even on coarse mtime filesystems
+    stat = cfg.CONFIG_FILE.stat()
+    os.utime(cfg.CONFIG_FILE, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert cfg.get("gemini", "model") == "gemini-2.5-pro"
+    assert reloaded == [cfg]
+
+
+def test_config_keeps_values_on_invalid_file(temp_home, monkeypatch):
+    monkeypatch.setattr(Config, "RELOAD_CHECK_INTERVAL", 0)
+    cfg = Config()
+    cfg.CONFIG_FILE.write_text("[gemini\nmodel = ")
+    assert cfg.get("gemini", "model") == Constants.DEFAULT_GEMINI_MODEL
+
+
+def test_config_typed_accessors(temp_home):
+    cfg = Config()
+    cfg.set("server", "port", "9000")
+    cfg.set("cache", "stale_while_revalidate", "yes")
+    cfg.set("cache", "expiration_days", "soon")
+    assert cfg.get_int("server", "port", 8888) == 9000
+    assert cfg.get_bool("cache", "stale_while_revalidate") is True
+    assert cfg.get_float("cache", "expiration_days", 7.0) == 7.0
+    assert cfg.get_str("gemini", "model") == Constants.DEFAULT_GEMINI_MODEL
@@ -0,0 +1,206 @@
+# tests/test_gemini.py
+import json
+import pytest
+from google.genai import errors, types
+from yt_rater.core.constants import Constants
+from yt_rater.core.gemini import GeminiClient
+from yt_rater.core.metrics import REGISTRY
+from yt_rater.core.ratelimit import RateLimiter, TokenBucket
+from yt_rater.core.exceptions import QuotaExceededException
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModels:
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.calls = []
+
+    def generate_content(self, model, contents, config=None):
+        self.calls.append({"contents": contents, "config": config})
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return FakeResponse(answer)
+
+    def generate_content_stream(self, model, contents, config=None):
+        """Stream the chunks of the next answer (a list of texts)."""
+        call = {"contents": contents, "config": config, "read": 0, "closed": False}
+        self.calls.append(call)
+        chunks = self.answers.pop(0)
+        try:
+            for chunk in chunks:
+                call["read"] += 1
+                yield FakeResponse(chunk)
+        finally:
+            call["closed"] = True
+
+
+class FakeGenAI:
+    def __init__(self, answers):
+        self.models = FakeModels(answers)
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    monkeypatch.setattr(Constants, "DEFAULT_AI_RETRY_BASE_DELAY", 0)
+    return GeminiClient(api_key="FAKE_KEY", limiter=RateLimiter("gemini", {}))
+
+
+def test_rate_comments(gemini):
+    gemini.client = FakeGenAI(["4.25"])
+    prompt_tokens = REGISTRY.get_sample_value("yt_rater_ai_tokens_total", {"kind": "prompt"}) or 0
+    rating = gemini.rate_comments(["Great video!"])
+    assert rating.score == 4.25
+    assert not rating.fallback
+    assert REGISTRY.get_sample_value("yt_rater_ai_tokens_total", {"kind": "prompt"}) > prompt_tokens
+
+
+def test_zero_is_a_valid_score(gemini):
+    gemini.client = FakeGenAI(["0"])
+    rating = gemini.rate_comments(["Awful"])
+    assert rating.score == 0.0
+    assert not rating.fallback
+
+
+def test_unparsable_output_is_a_fallback(gemini):
+    gemini.client = FakeGenAI(["I can't rate this"])
+    rating = gemini.rate_comments(["Great video!"])
+    assert rating.fallback
+    assert rating.score == Constants.DEFAULT_FALLBACK_SCORE
+
+
+def test_server_errors_are_retried(gemini):
+    gemini.client = FakeGenAI([errors.ServerError(503, {}), errors.ServerError(500, {}), "4.0"])
+    rating = gemini.rate_comments(["Great video!"])
+    assert rating.score == 4.0
+    assert not rating.fallback
+    assert len(gemini.client.models.calls) == 3
+
+
+def test_client_errors_are_not_retried(gemini):
+    gemini.client = FakeGenAI([errors.ClientError(400, {}), "4.0"])
+    rating = gemini.rate_comments(["Great video!"])
+    assert rating.fallback
+    assert len(gemini.client.models.calls) == 1
+
+
+def test_circuit_opens_after_repeated_failures(gemini):
+    gemini.max_retries = 0
+    gemini.breaker.failure_threshold = 2
+    gemini.client = FakeGenAI([errors.ServerError(503, {})] * 2 + ["4.0"])
+    assert gemini.rate_comments(["a"]).fallback
+    assert gemini.rate_comments(["b"]).fallback
+    assert gemini.breaker.state == "open"
+
+    # fails fast without calling Gemini
+    rating = gemini.rate_comments(["c"])
+    assert rating.fallback
+    assert "circuit" in rating.reason
+    assert len(gemini.client.models.calls) == 2
+
+
+def test_rate_limit_does_not_open_circuit(gemini):
+    gemini.breaker.failure_threshold = 1
+    gemini.client = FakeGenAI([errors.ClientError(429, {"error": {"message": "quota"}})])
+    with pytest.raises(QuotaExceededException):
+        gemini.rate_comments(["Great video!"])
+    assert gemini.breaker.state == "closed"
+
+
+def test_parse_batch_scores(gemini):
+    text = json.dumps([
+        {"video_id": "a", "score": 4.0},
+        {"video_id": "b", "score": 7.0},        # out of range
+        {"video_id": "unknown", "score": 1.0},  # not requested
+        {"video_id": "c"},                      # no score
+    ])
+    assert gemini._parse_batch_scores(text, ["a", "b", "c"]) == {"a": 4.0}
+    assert gemini._parse_batch_scores('{"a": 3.5}', ["a"]) == {"a": 3.5}
+    assert gemini._parse_batch_scores("not json", ["a"]) == {}
+
+
+def test_rate_comments_batch_one_call(gemini):
+    gemini.client = FakeGenAI([json.dumps([
+        {"video_id": "a", "score": 4.0}, {"video_id": "b", "score": 2.0}
+    ])])
+    scores = gemini.rate_comments_batch({"a": ["Great"], "b": ["Boring"]})
+    assert {k: v.score for k, v in scores.items()} == {"a": 4.0, "b": 2.0}
+
+    calls = gemini.client.models.calls
+    assert len(calls) == 1
+    assert "### Vidéo a" in calls[0]["contents"]
+    assert calls[0]["config"].response_mime_type == "application/json"
+
+
+def test_rate_comments_batch_retries_missing(gemini):
+    gemini.client = FakeGenAI([json.dumps([{"video_id": "a", "score": 4.0}]), "1.5"])
+    scores = gemini.rate_comments_batch({"a": ["Great"], "b": ["Boring"]})
+    assert {k: v.score for k, v in scores.items()} == {"a": 4.0, "b": 1.5}
+    assert len(gemini.client.models.calls) == 2
+
+
+def test_rate_comments_batch_falls_back_on_error(gemini):
+    gemini.client = FakeGenAI([RuntimeError("boom"), "3.0", "3.5"])
+    scores = gemini.rate_comments_batch({"a": ["Great"], "b": ["Boring"]})
+    assert {k: v.score for k, v in scores.items()} == {"a": 3.0, "b": 3.5}
+
+
+def test_rate_limit_error_is_not_a_score(gemini):
+    gemini.client = FakeGenAI([errors.ClientError(429, {"error": {"message": "quota"}})])
+    with pytest.raises(QuotaExceededException) as info:
+        gemini.rate_comments(["Great video!"])
+    assert info.value.retry_after >= 1
+    assert gemini.limiter.status()["blocked_for"] > 0
+
+
+def test_requests_per_minute_limit():
+    limiter = RateLimiter("gemini", {"requests": TokenBucket(2, 2 / 60)}, max_wait=0)
+    gemini = GeminiClient(api_key="FAKE_KEY", limiter=limiter)
+    gemini.client = FakeGenAI(["4.0", "4.0", "4.0"])
+    gemini.rate_comments(["a"])
+    gemini.rate_comments(["b"])
+    with pytest.raises(QuotaExceededException):
+        gemini.rate_comments(["c"])
+    assert len(gemini.client.models.calls) == 2
+
+
+def test_rating_is_capped_and_structured(gemini):
+    gemini.client = FakeGenAI(["3.5"])
+    gemini.rate_comments(["Great video!"])
+    config = gemini.client.models.calls[0]["config"]
+    assert config.max_output_tokens == Constants.DEFAULT_GEMINI_MAX_OUTPUT_TOKENS
+    assert config.response_mime_type == "application/json"
+    assert config.response_schema.type == types.Type.NUMBER
+    assert config.response_schema.maximum == 5.0
+    # thinking models would spend the cap on reasoning
+    assert config.thinking_config.thinking_budget == 0
+
+
+def test_stream_stops_at_first_whole_score(gemini, monkeypatch):
+    monkeypatch.setattr(GeminiClient, "stream", True)
+    labels = {"mode": "stream"}
+    before = REGISTRY.get_sample_value("yt_rater_ai_time_to_score_seconds_count", labels) or 0
+    gemini.client = FakeGenAI([["4", ".2", "5", " : très bonne vidéo", ", claire"], ["3"]])
+
+    rating = gemini.rate_comments(["Great video!"])
+    assert rating.score == 4.25
+    call = gemini.client.models.calls[0]
+    assert call["read"] == 3
+    assert call["closed"]
+
+    # a bare number is whole once the stream ends
+    assert gemini.rate_comments(["Fine"]).score == 3.0
+    assert REGISTRY.get_sample_value(
+        "yt_rater_ai_time_to_score_seconds_count", labels
+    ) == before + 2
+
+
+def test_has_score():
+    for partial in ("", "4", "4.", "4.2", "Score : 3"):
+        assert not GeminiClient._has_score(partial)
+    for whole in ("4.25", "4\n", "4.2 ", "3.5 sur 5"):
+        assert GeminiClient._has_score(whole)
@@ -0,0 +1,138 @@
+# tests/test_jobs.py
+import asyncio
+import pytest
+from yt_rater.core.exceptions import JobQueueFullException
+from yt_rater.core.jobs import JobQueue
+from yt_rater.core.scheduler import PriorityScheduler
+from yt_rater.models.job import JobStatus
+from yt_rater.models.rating_request import Priority
+
+
+def test_jobs_attach_and_keep_their_priority():
+    calls = []
+
+    async def worker(video_id, priority, on_admit):
+        on_admit()
+        calls.append((video_id, priority))
+        await asyncio.sleep(0.05)
+        return f"rated {video_id}"
+
+    async def scenario():
+        queue = JobQueue(worker, max_pending=10, retention=60)
+        jobs = [queue.submit(f"vid{i}", Priority.PREFETCH) for i in range(4)]
+        jobs.append(queue.submit("vid4"))
+        again = queue.submit("vid0", Priority.PREFETCH)
+        await queue.join()
+        await queue.aclose()
+        return queue, jobs, again
+
+    queue, jobs, again = asyncio.run(scenario())
+    assert again is jobs[0]
+    assert sorted(calls) == [(f"vid{i}", Priority.PREFETCH) for i in range(4)] + [
+        ("vid4", Priority.INTERACTIVE)
+    ]
+    assert [job.status for job in jobs] == [JobStatus.DONE] * 5
+    assert jobs[3].result == "rated vid3"
+    assert queue.stats["submitted"] == 5 and queue.stats["attached"] == 1
+
+
+def test_failed_job_is_not_reused():
+    async def worker(video_id, priority, on_admit):
+        raise RuntimeError("boom")
+
+    async def scenario():
+        queue = JobQueue(worker, max_pending=10, retention=60)
+        first = queue.submit("vid")
+        await queue.join()
+        second = queue.submit("vid")
+        await queue.join()
+        await queue.aclose()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first.status == JobStatus.FAILED
+    assert isinstance(first.error, RuntimeError)
+    assert second is not first
+
+
+def test_queue_is_bounded():
+    async def worker(video_id, priority, on_admit):
+        await asyncio.sleep(1)
+
+    async def scenario():
+        queue = JobQueue(worker, max_pending=2, retention=60)
+        queue.submit("a")
+        queue.submit("b")
+        try:
+            with pytest.raises(JobQueueFullException):
+                queue.submit("c")
+        finally:
+            await queue.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_finished_jobs_expire():
+    async def worker(video_id, priority, on_admit):
+        return 1.0
+
+    async def scenario():
+        queue = JobQueue(worker, max_pending=10, retention=0)
+        job = queue.submit("vid")
+        await queue.join()
+        await asyncio.sleep(0.01)
+        found = queue.get(job.id)
+        await queue.aclose()
+        return found
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_updates_follow_status_changes():
+    async def worker(video_id, priority, on_admit):
+        await asyncio.sleep(0.01)
+        on_admit()
+        await asyncio.sleep(0.01)
+        return 4.0
+
+    async def scenario():
+        queue = JobQueue(worker, max_pending=10, retention=60)
+        job = queue.submit("vid")
+        statuses = [update.status async for update in job.updates()]
+        await queue.aclose()
+        return statuses
+
+    assert asyncio.run(scenario()) == [JobStatus.PENDING, JobStatus.RUNNING, JobStatus.DONE]
+
+
+def test_jobs_run_once_admitted_and_can_be_hurried():
+    scheduler = PriorityScheduler(slots=1, reserved=0)
+    calls = []
+
+    async def worker(video_id, priority, on_admit):
+        async with scheduler.slot(priority):
+            on_admit()
+            calls.append((video_id, priority))
+            await asyncio.sleep(0.01)
+
+    async def scenario():
+        queue = JobQueue(worker, max_pending=10, retention=60)
+        jobs = [queue.submit(f"vid{i}", Priority.PREFETCH) for i in range(3)]
+        await asyncio.sleep(0)
+        # queued behind the scheduler: still pending
+        statuses = [job.status for job in jobs]
+        pending = queue.stats["pending"]
+        # the watched video attaches to the last prefetch job
+        assert queue.submit("vid2") is jobs[2]
+        await queue.join()
+        await queue.aclose()
+        return jobs, statuses, pending
+
+    jobs, statuses, pending = asyncio.run(scenario())
+    assert statuses == [JobStatus.RUNNING, JobStatus.PENDING, JobStatus.PENDING]
+    assert pending == 2
+    assert calls == [
+        ("vid0", Priority.PREFETCH), ("vid2", Priority.INTERACTIVE), ("vid1", Priority.PREFETCH),
+    ]
+    assert [job.status for job in jobs] == [JobStatus.DONE] * 3
+    assert scheduler.stats["running"] == 0
@@ -0,0 +1,111 @@
+# tests/test_load.py
+import asyncio
+import pytest
+from yt_rater.core.config import Config
+from yt_rater.core.constants import Constants
+from yt_rater.core.gemini import GeminiClient
+from yt_rater.core.ratelimit import RateLimiter
+from yt_rater.core.youtube_http import HttpYoutubeClient
+from yt_rater.testing.fake_gemini import FakeGeminiServer
+from yt_rater.testing.fake_youtube import FakeYouTubeServer
+from yt_rater.testing.load import compare, percentile, run_scenario
+
+
+@pytest.fixture
+def fake_config(monkeypatch):
+    monkeypatch.setattr(Constants, "DEFAULT_AI_RETRY_BASE_DELAY", 0)
+    return Config()
+
+
+def test_gemini_client_uses_configured_base_url(fake_config):
+    with FakeGeminiServer() as server:
+        fake_config.set("gemini", "base_url", server.url)
+        gemini = GeminiClient(api_key="FAKE_KEY", limiter=RateLimiter("gemini", {}))
+
+        rating = gemini.rate_comments(["Great video!", "Very clear"])
+        assert not rating.fallback
+        assert rating.score == FakeGeminiServer.score(server.prompts[0])
+
+        ratings = gemini.rate_comments_batch({"vid1": ["Nice"], "vid2": ["Bad"]})
+        assert {k: r.score for k, r in ratings.items()} == {
+            "vid1": FakeGeminiServer.score("vid1"),
+            "vid2": FakeGeminiServer.score("vid2"),
+        }
+        assert len(server.requests) == 2
+
+
+def test_gemini_stream_closes_early(fake_config):
+    with FakeGeminiServer(token_latency=0.01, verbose=True) as server:
+        fake_config.set("gemini", "base_url", server.url)
+        fake_config.set("gemini", "stream", True)
+        fake_config.set("gemini", "structured_output", False)
+        fake_config.set("gemini", "max_output_tokens", 0)
+        gemini = GeminiClient(api_key="FAKE_KEY", limiter=RateLimiter("gemini", {}))
+
+        rating = gemini.rate_comments(["Great video!"])
+        assert not rating.fallback
+        assert rating.score == FakeGeminiServer.score(server.prompts[0])
+        assert server.requests[0].endswith(":streamGenerateContent")
+        # the explanation after the score was not generated in full
+        assert server.generated_tokens < 10
+
+
+def test_fake_gemini_errors_are_retried(fake_config):
+    with FakeGeminiServer(error_rate=1.0) as server:
+        fake_config.set("gemini", "base_url", server.url)
+        gemini = GeminiClient(api_key="FAKE_KEY", limiter=RateLimiter("gemini", {}))
+
+        rating = gemini.rate_comments(["Great video!"])
+        assert rating.fallback
+        assert len(server.requests) == Constants.DEFAULT_AI_MAX_RETRIES + 1
+
+
+def test_youtube_base_url_and_page_size_from_config(fake_config):
+    with FakeYouTubeServer(page_size=10) as server:
+        server.default_comments = 25
+        fake_config.set("youtube", "base_url", server.base_url)
+        client = HttpYoutubeClient(api_key="FAKE_KEY", limiter=RateLimiter("youtube", {}))
+
+        async def scenario():
+            try:
+                return await client.fetch_comments("anyVideo123", max_comments=25)
+            finally:
+                await client.aclose()
+
+        assert len(asyncio.run(scenario())) == 25
+        assert server.requests == ["/youtube/v3/commentThreads"] * 3
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == pytest.approx(50.5)
+    assert percentile(values, 99) == pytest.approx(99.01)
+    assert percentile([], 95) == 0.0
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = {"requests_per_second": 100, "p50_ms": 10, "p95_ms": 50, "p99_ms": 80}
+    report = {"requests_per_second": 95, "p50_ms": 10.5, "p95_ms": 70, "p99_ms": 60}
+
+    regressions = compare(report, baseline, tolerance=0.1)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("p95_ms: 50 -> 70")
+    assert compare(report, baseline, tolerance=0.5) == []
+
+
+def test_run_scenario_reports_latencies():
+    config_file = Config.CONFIG_FILE
+    report = run_scenario(
+        requests=40, concurrency=8, hit_ratio=0.5, hot_videos=4,
+        comments_per_video=20, page_size=10, youtube_latency=0, gemini_latency=0,
+    )
+
+    assert report["requests"] == 40
+    assert report["statuses"] == {"200": 40}
+    assert report["requests_per_second"] > 0
+    assert 0 < report["p50_ms"] <= report["p95_ms"] <= report["p99_ms"]
+    # hits never reach the upstream APIs
+    assert report["upstream"]["gemini_requests"] < 40
+    assert report["scenario"]["hit_ratio"] == 0.5
+    # the real config is left untouched
+    assert Config.CONFIG_FILE == config_file
@@ -0,0 +1,59 @@
+# tests/test_metrics.py
+import pytest
+from fastapi.testclient import TestClient
+from yt_rater.core.metrics import REGISTRY, track
+from yt_rater.core.server import Server
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_track_records_duration_and_errors():
+    count = sample("yt_rater_stage_seconds_count", stage="test")
+    errors = sample("yt_rater_errors_total", stage="test", type="ValueError")
+
+    with track("test"):
+        assert sample("yt_rater_in_flight", stage="test") == 1
+    with pytest.raises(ValueError):
+        with track("test"):
+            raise ValueError("boom")
+
+    assert sample("yt_rater_stage_seconds_count", stage="test") == count + 2
+    assert sample("yt_rater_errors_total", stage="test", type="ValueError") == errors + 1
+    assert sample("yt_rater_in_flight", stage="test") == 0
+
+
+@pytest.fixture
+def client(monkeypatch):
+
+    class FakeYoutube:
+        def get_video_id(self, url: str) -> str:
+            return url.rsplit("=", 1)[-1]
+
+        def fetch_comments(self, video_id: str, max_comments: int = 100):
+            return ["Great video!"]
+
+    class FakeGemini:
+        def rate_comments(self, comments):
+            return 4.5
+
+    monkeypatch.setattr("yt_rater.core.server.HttpYoutubeClient", lambda *a, **k: FakeYoutube())
+    monkeypatch.setattr("yt_rater.core.server.GeminiClient", lambda *a, **k: FakeGemini())
+    return TestClient(Server(port=8002).app)
+
+
+def test_metrics_endpoint(client):
+    requests = sample("yt_rater_stage_seconds_count", stage="request")
+    for _ in range(3):
+        client.post("/rate", json={"url": "https://www.youtube.com/watch?v=abcd"})
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'yt_rater_cache_lookups_total{result="miss"} 1.0' in body
+    assert 'yt_rater_cache_lookups_total{result="memory_hit"} 2.0' in body
+    assert "yt_rater_cache_hit_ratio 0.666" in body
+    assert 'yt_rater_stage_seconds_bucket{le="0.001",stage="cache_lookup"}' in body
+    assert sample("yt_rater_stage_seconds_count", stage="request") == requests + 3
@@ -0,0 +1,91 @@
+# tests/test_ratelimit.py
+import pytest
+from yt_rater.core.config import Config
+from yt_rater.core.constants import Constants
+from yt_rater.core.exceptions import QuotaExceededException
+from yt_rater.core.ratelimit import RateLimiter, TokenBucket, get_limiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_refill():
+    clock = FakeClock()
+    bucket = TokenBucket(10, 1.0, clock=clock)
+    bucket.take(10)
+    assert bucket.available == 0
+    assert bucket.wait_time(3) == 3.0
+    clock.now = 5.0
+    assert bucket.available == 5.0
+    clock.now = 100.0
+    assert bucket.available == 10
+    assert bucket.wait_time(11) == float("inf")
+
+
+def test_acquire_waits_within_max_wait():
+    clock = FakeClock()
+    limiter = RateLimiter(
+        "gemini", {"requests": TokenBucket(1, 1.0, clock=clock)},
+        max_wait=2, clock=clock, sleep=clock.sleep,
+    )
+    limiter.acquire(requests=1)
+    limiter.acquire(requests=1)  # waits one second
+    assert clock.now == 1.0
+    assert limiter.throttled == 1
+
+
+def test_acquire_rejects_beyond_max_wait():
+    clock = FakeClock()
+    limiter = RateLimiter(
+        "youtube", {"units": TokenBucket(2, 2 / 86400, clock=clock)},
+        clock=clock, sleep=clock.sleep,
+    )
+    limiter.acquire(units=2)
+    with pytest.raises(QuotaExceededException) as info:
+        limiter.acquire(units=1)
+    assert info.value.retry_after > 0
+    assert limiter.rejected == 1
+
+
+def test_backoff_doubles_and_resets():
+    clock = FakeClock()
+    limiter = RateLimiter("gemini", {}, clock=clock, sleep=clock.sleep)
+    assert limiter.backoff() == Constants.DEFAULT_MIN_BACKOFF_SECONDS
+    assert limiter.backoff() == 2 * Constants.DEFAULT_MIN_BACKOFF_SECONDS
+    with pytest.raises(QuotaExceededException):
+        limiter.acquire(requests=1)
+    limiter.succeeded()
+    assert limiter.backoff() == Constants.DEFAULT_MIN_BACKOFF_SECONDS
+
+
+def test_from_config():
+    cfg = Config()
+    cfg.set("gemini", "tokens_per_minute", 0)
+
+    limiter = RateLimiter.from_config("gemini", cfg)
+    assert set(limiter.buckets) == {"requests"}
+    assert limiter.buckets["requests"].capacity == Constants.DEFAULT_GEMINI_REQUESTS_PER_MINUTE
+    # no sleeping in the server's worker threads: 429 with Retry-After
+    assert limiter.max_wait == 0
+    assert set(RateLimiter.from_config("youtube", cfg).buckets) == {"units"}
+
+
+def test_limits_follow_config_reload():
+    limiter = get_limiter("gemini")
+    limiter.acquire(requests=1)
+    cfg = Config()
+    cfg.set("gemini", "requests_per_minute", 100)
+    cfg.set("gemini", "tokens_per_minute", 0)
+
+    assert limiter is get_limiter("gemini")
+    assert limiter.buckets["requests"].capacity == 100
+    assert limiter.buckets["requests"].available == pytest.approx(99, abs=0.1)
+    assert "tokens" not in limiter.buckets
@@ -0,0 +1,299 @@
+# tests/test_rater.py
+import asyncio
+import threading
+import time
+import pytest
+from yt_rater.core.cache import Cache
+from yt_rater.core.cache_backends import CacheEntry
+from yt_rater.core.exceptions import NoCommentFound
+from yt_rater.core.rater import Rater
+from yt_rater.models.ai_rating import AIRating
+from yt_rater.models.comment import Comment
+from yt_rater.models.video_metadata import VideoMetadata
+
+
+@pytest.fixture
+def cache():
+    return Cache(expiration_days=7)
+
+
+class FakeYoutube:
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+
+    def fetch_comments(self, video_id: str, max_comments: int = 100):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        time.sleep(0.05)
+        self.running -= 1
+        return [f"comment on {video_id}"]
+
+
+class FakeAI:
+    def rate_comments(self, comments):
+        return 4.0
+
+
+def test_rate_many_bounded_parallelism(cache):
+    youtube = FakeYoutube()
+    rater = Rater(cache, youtube, FakeAI())
+    cache.set("hit", 2.0)
+    video_ids = ["hit"] + [f"miss{i}" for i in range(6)]
+
+    async def scenario():
+        return [item async for item in rater.rate_many(video_ids, concurrency=2)]
+
+    results = asyncio.run(scenario())
+    assert results[0][0] == 0 and results[0][1].score == 2.0
+    assert sorted(index for index, _ in results) == list(range(7))
+    assert youtube.max_running == 2
+    assert cache.get("miss5") == 4.0
+
+
+def test_rate_many_reports_errors(cache):
+    class BrokenAI:
+        def rate_comments(self, comments):
+            raise RuntimeError("boom")
+
+    rater = Rater(cache, FakeYoutube(), BrokenAI())
+
+    async def scenario():
+        return [item async for item in rater.rate_many(["a", "b"], concurrency=2)]
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for _, result in results)
+
+
+def test_fallback_score_is_not_cached(cache):
+    class FailingAI:
+        def __init__(self):
+            self.calls = 0
+
+        def rate_comments(self, comments):
+            self.calls += 1
+            if self.calls == 1:
+                return AIRating(score=2.5, fallback=True, reason="error")
+            return AIRating(score=4.5)
+
+    ai = FailingAI()
+    rater = Rater(cache, FakeYoutube(), ai)
+
+    first = asyncio.run(rater.rate("vid"))
+    assert first.fallback and first.score == 2.5
+    assert cache.get("vid") is None
+    assert rater.fallback_ratings == 1
+
+    # the next request rates again instead of serving the fallback
+    second = asyncio.run(rater.rate("vid"))
+    assert not second.fallback and second.score == 4.5
+    assert cache.get("vid") == 4.5
+
+
+def test_misses_are_micro_batched(cache):
+    class BatchAI(FakeAI):
+        def __init__(self):
+            self.batches = []
+
+        def rate_comments_batch(self, comments_by_video):
+            self.batches.append(sorted(comments_by_video))
+            return {video_id: 3.0 for video_id in comments_by_video}
+
+    ai = BatchAI()
+    rater = Rater(cache, FakeYoutube(), ai)
+    assert rater.batcher is not None
+
+    async def scenario():
+        return await asyncio.gather(*(rater.rate(f"video{i}") for i in range(3)))
+
+    responses = asyncio.run(scenario())
+    assert [r.score for r in responses] == [3.0] * 3
+    assert ai.batches == [["video0", "video1", "video2"]]
+
+
+def test_micro_batch_missing_score_fails_only_that_video(cache):
+    class PartialAI(FakeAI):
+        def rate_comments_batch(self, comments_by_video):
+            return {video_id: 3.0 for video_id in comments_by_video if video_id != "bad"}
+
+    rater = Rater(cache, FakeYoutube(), PartialAI())
+
+    async def scenario():
+        return await asyncio.gather(rater.rate("good"), rater.rate("bad"), return_exceptions=True)
+
+    good, bad = asyncio.run(scenario())
+    assert good.score == 3.0
+    assert isinstance(bad, KeyError)
+
+
+class MetadataYoutube(FakeYoutube):
+    def __init__(self, comment_counts):
+        super().__init__()
+        self.comment_counts = comment_counts
+        self.metadata_calls = []
+        self.fetched = []
+
+    def fetch_video_metadata(self, video_ids):
+        self.metadata_calls.append(list(video_ids))
+        return {
+            video_id: VideoMetadata(video_id=video_id, comment_count=self.comment_counts[video_id])
+            for video_id in video_ids
+        }
+
+    def fetch_comments(self, video_id: str, max_comments: int = 100):
+        self.fetched.append(video_id)
+        return super().fetch_comments(video_id, max_comments)
+
+
+def test_videos_without_comments_are_skipped(cache):
+    youtube = MetadataYoutube({"empty": 0, "disabled": None, "good": 12})
+    rater = Rater(cache, youtube, FakeAI())
+
+    async def scenario():
+        return [item async for item in rater.rate_many(["empty", "disabled", "good"], 3)]
+
+    results = dict(asyncio.run(scenario()))
+    assert isinstance(results[0], NoCommentFound)
+    assert isinstance(results[1], NoCommentFound)
+    assert results[2].score == 4.0
+    # one bulk videos.list call, comments fetched only where they exist
+    assert youtube.metadata_calls == [["empty", "disabled", "good"]]
+    assert youtube.fetched == ["good"]
+    assert rater._metadata == {}
+
+
+def test_single_miss_skips_metadata(cache):
+    youtube = MetadataYoutube({"good": 12})
+    rater = Rater(cache, youtube, FakeAI())
+    assert asyncio.run(rater.rate("good")).score == 4.0
+    # no videos.list round trip before the comments of a single video
+    assert youtube.metadata_calls == []
+    assert youtube.fetched == ["good"]
+
+
+class ThreadsYoutube:
+    """YouTube fake returning comment threads, newest first."""
+
+    def __init__(self, comments):
+        self.comments = comments
+        self.calls = []
+
+    def fetch_comment_threads(self, video_id, max_comments=100, since=None):
+        self.calls.append(since)
+        comments = sorted(self.comments, key=lambda c: c.published_at, reverse=True)
+        if since is not None:
+            comments = [c for c in comments if c.published_at > since]
+        return comments[:max_comments]
+
+
+class CountingAI(FakeAI):
+    def __init__(self):
+        self.calls = 0
+
+    def rate_comments(self, comments):
+        self.calls += 1
+        return 4.0
+
+
+def make_comments(count, start=0):
+    return [
+        Comment(id=f"c{i}", text=f"comment {i}", published_at=1000.0 + i)
+        for i in range(start, start + count)
+    ]
+
+
+def expire(cache, video_id):
+    stored = cache.peek(video_id)
+    old = time.time() - cache.ttl - 60
+    cache.backend.set(video_id, CacheEntry(stored.score, old, stored.fingerprint))
+    cache._forget(video_id)
+
+
+def test_fingerprint_is_stored(cache):
+    youtube = ThreadsYoutube(make_comments(20))
+    rater = Rater(cache, youtube, CountingAI())
+    asyncio.run(rater.rate("video"))
+
+    stored = cache.peek("video")
+    assert stored.fingerprint is not None
+    assert len(stored.fingerprint.ids) == 20
+    assert stored.fingerprint.last_published == 1019.0
+
+
+def test_unchanged_comments_keep_score(cache):
+    youtube = ThreadsYoutube(make_comments(20))
+    ai = CountingAI()
+    rater = Rater(cache, youtube, ai)
+    asyncio.run(rater.rate("video"))
+    expire(cache, "video")
+
+    # one new comment out of 21: similar enough, the score is kept
+    youtube.comments += make_comments(1, start=20)
+    response = asyncio.run(rater.rate("video"))
+    assert response.score == 4.0
+    assert ai.calls == 1
+    assert rater.kept_ratings == 1
+    assert youtube.calls[-1] == 1019.0
+    assert cache.get("video") == 4.0
+
+
+def test_changed_comments_are_rerated(cache):
+    youtube = ThreadsYoutube(make_comments(20))
+    ai = CountingAI()
+    rater = Rater(cache, youtube, ai)
+    asyncio.run(rater.rate("video"))
+    expire(cache, "video")
+
+    youtube.comments += make_comments(10, start=20)
+    asyncio.run(rater.rate("video"))
+    assert ai.calls == 2
+    assert rater.kept_ratings == 0
+    assert cache.peek("video").fingerprint.last_published == 1029.0
+
+
+def test_reordered_comments_keep_score(cache):
+    class ReorderingYoutube(ThreadsYoutube):
+        def fetch_comment_threads(self, video_id, max_comments=100, since=None):
+            if since is not None:
+                raise RuntimeError("incremental fetch unavailable")
+            # relevance order: whatever order self.comments is in
+            return self.comments[:max_comments]
+
+    youtube = ReorderingYoutube(make_comments(20))
+    ai = CountingAI()
+    rater = Rater(cache, youtube, ai)
+    asyncio.run(rater.rate("video"))
+    expire(cache, "video")
+    youtube.comments.reverse()
+
+    asyncio.run(rater.rate("video"))
+    assert ai.calls == 1
+    assert rater.kept_ratings == 1
+
+
+def test_backend_reads_leave_the_event_loop(cache):
+    cache.set("video", 4.0)
+    cache._forget("video")
+    backend = cache.backend
+    reads = []
+
+    def recording(read):
+        def wrapper(*args):
+            reads.append(threading.current_thread() is threading.main_thread())
+            return read(*args)
+        return wrapper
+
+    backend.get = recording(backend.get)
+    backend.get_many = recording(backend.get_many)
+    rater = Rater(cache, FakeYoutube(), FakeAI())
+
+    async def scenario():
+        first = await rater.rate("video")
+        second = await rater.rate("video")
+        await rater.aclose()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first.score == second.score == 4.0
+    # the disk read ran in the executor, the memory hit read nothing
+    assert reads == [False]
@@ -0,0 +1,100 @@
+# tests/test_resilience.py
+import random
+import pytest
+from yt_rater.core.exceptions import CircuitOpenException, QuotaExceededException
+from yt_rater.core.resilience import CircuitBreaker, retry
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def flaky(failures, error=ConnectionError):
+    calls = []
+
+    def func():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise error("down")
+        return "ok"
+
+    return func, calls
+
+
+def test_retry_until_success():
+    func, calls = flaky(2)
+    delays = []
+    assert retry(func, 3, 1.0, 10.0, (ConnectionError,), sleep=delays.append) == "ok"
+    assert len(calls) == 3
+    # full jitter: delay n is drawn in [0, base * 2^n]
+    assert 0 <= delays[0] <= 1.0 and 0 <= delays[1] <= 2.0
+
+
+def test_retry_gives_up():
+    func, calls = flaky(5)
+    with pytest.raises(ConnectionError):
+        retry(func, 3, 0, 0, (ConnectionError,), sleep=lambda _: None)
+    assert len(calls) == 3
+
+
+def test_retry_only_retryable_errors():
+    func, calls = flaky(1, error=ValueError)
+    with pytest.raises(ValueError):
+        retry(func, 3, 0, 0, (ConnectionError,), sleep=lambda _: None)
+    assert len(calls) == 1
+
+
+def test_retry_sleeps_within_budget(monkeypatch):
+    monkeypatch.setattr(random, "uniform", lambda low, high: high)
+    func, calls = flaky(10)
+    delays = []
+    with pytest.raises(ConnectionError):
+        retry(func, 10, 1.5, 5.0, (ConnectionError,), sleep=delays.append, max_total_delay=2.0)
+    # 1.5, then only what is left of the budget, then give up
+    assert delays == [1.5, 0.5]
+    assert len(calls) == 3
+
+
+def test_circuit_breaker_opens_and_recovers():
+    clock = Clock()
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=30, clock=clock)
+    func, calls = flaky(2)
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(func)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenException):
+        breaker.call(func)
+    assert len(calls) == 2
+    assert breaker.status()["rejected"] == 1
+
+    # after reset_timeout one trial call goes through and closes the circuit
+    clock.now = 30
+    assert breaker.call(func) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_circuit_breaker_failed_trial_reopens():
+    clock = Clock()
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=10, clock=clock)
+    func, _ = flaky(2)
+    with pytest.raises(ConnectionError):
+        breaker.call(func)
+    clock.now = 10
+    with pytest.raises(ConnectionError):
+        breaker.call(func)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_circuit_breaker_ignored_errors():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=10)
+    func, _ = flaky(1, error=QuotaExceededException)
+    with pytest.raises(QuotaExceededException):
+        breaker.call(func, ignore=(QuotaExceededException,))
+    assert breaker.state == CircuitBreaker.CLOSED
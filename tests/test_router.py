@@ -0,0 +1,179 @@
+# tests/test_router.py
+import asyncio
+import time
+import pytest
+from yt_rater.core.cache import Cache
+from yt_rater.core.config import Config
+from yt_rater.core.constants import Constants
+from yt_rater.core.gemini import GeminiClient
+from yt_rater.core.rater import Rater
+from yt_rater.core.ratelimit import RateLimiter
+from yt_rater.core.router import AIRouter, LatencyStats, Route
+from yt_rater.models.ai_rating import AIRating
+from yt_rater.testing.fake_gemini import FakeGeminiServer
+
+
+class FakeProvider:
+    """Local AI client answering score after delay seconds."""
+
+    def __init__(self, delay: float, score: float = 4.0, fallback: bool = False):
+        self.delay = delay
+        self.score = score
+        self.fallback = fallback
+        self.calls = 0
+        self.finished = 0
+
+    def rate_comments(self, comments):
+        self.calls += 1
+        time.sleep(self.delay)
+        self.finished += 1
+        return AIRating(score=self.score, fallback=self.fallback)
+
+    def rate_comments_batch(self, comments_by_video):
+        return {video_id: self.rate_comments(c) for video_id, c in comments_by_video.items()}
+
+
+def make_router(*providers: FakeProvider, **options) -> AIRouter:
+    options = {"hedge_delay": 0.05, "max_hedge_ratio": 1.0, **options}
+    return AIRouter([Route(f"model-{i}", p) for i, p in enumerate(providers)], **options)
+
+
+def test_latency_stats_percentile():
+    stats = LatencyStats(window=100)
+    assert stats.percentile(95) is None
+    for ms in range(1, 101):
+        stats.record(ms / 1000)
+    stats.record(5.0, failed=True)
+    assert stats.percentile(50) == 0.05
+    assert stats.percentile(95) == 0.095
+    assert stats.status()["errors"] == 1
+    assert len(stats) == 100
+
+
+def test_fast_primary_is_not_hedged():
+    primary, other = FakeProvider(0.0, 4.0), FakeProvider(0.0, 1.0)
+    router = make_router(primary, other)
+    assert asyncio.run(router.rate_comments(["Great"])).score == 4.0
+    assert other.calls == 0
+    assert router.hedges == 0
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    primary, other = FakeProvider(0.5, 4.0), FakeProvider(0.01, 3.0)
+    router = make_router(primary, other)
+
+    start = time.perf_counter()
+    rating = asyncio.run(router.rate_comments(["Great"]))
+    assert rating.score == 3.0
+    assert time.perf_counter() - start < 0.3
+    assert router.hedges == router.hedges_won == 1
+    # the primary's answer was dropped, its latency is still recorded
+    router.executor.shutdown(wait=True)
+    assert primary.finished == 1
+    assert len(router.routes[0].stats["single"]) == 1
+
+
+def test_hedge_after_primary_percentile():
+    primary, other = FakeProvider(0.0, 4.0), FakeProvider(0.0, 3.0)
+    router = make_router(primary, other, hedge_delay=10.0, min_samples=5)
+    for _ in range(10):
+        router.routes[0].stats["single"].record(0.01)
+    assert router._delay(router.routes[0], "single") == 0.01
+
+    primary.delay = 0.3
+    assert asyncio.run(router.rate_comments(["Great"])).score == 3.0
+
+
+def test_fallback_waits_for_the_other_answer():
+    primary, other = FakeProvider(0.1, 2.5, fallback=True), FakeProvider(0.2, 3.0)
+    router = make_router(primary, other)
+    rating = asyncio.run(router.rate_comments(["Great"]))
+    assert rating.score == 3.0 and not rating.fallback
+
+    # neither gave a real score: the primary's answer is used
+    other.fallback = True
+    assert asyncio.run(router.rate_comments(["Great"])).score == 2.5
+
+
+def test_fast_failure_fails_over():
+    primary, other = FakeProvider(0.0, 2.5, fallback=True), FakeProvider(0.0, 3.0)
+    router = make_router(primary, other, hedge_delay=10.0)
+    assert asyncio.run(router.rate_comments(["Great"])).score == 3.0
+    assert router.failovers == 1 and router.hedges == 0
+
+    def broken(comments):
+        raise RuntimeError("unreachable")
+
+    primary.rate_comments = broken
+    assert asyncio.run(router.rate_comments(["Great"])).score == 3.0
+    # no other route: the fallback is the answer
+    lone = make_router(FakeProvider(0.0, 2.5, fallback=True))
+    assert asyncio.run(lone.rate_comments(["Great"])).fallback
+    assert lone.failovers == 0
+
+
+def test_hedges_are_capped():
+    primary, other = FakeProvider(0.1, 4.0), FakeProvider(0.0, 3.0)
+    router = make_router(primary, other, max_hedge_ratio=0.0)
+    assert asyncio.run(router.rate_comments(["Great"])).score == 4.0
+    assert other.calls == 0
+
+
+def test_downgrade_when_queue_is_deep():
+    primary, cheap = FakeProvider(0.1, 4.0), FakeProvider(0.1, 3.0)
+    router = make_router(primary, cheap, downgrade_queue_depth=2, max_hedge_ratio=0.0)
+
+    async def scenario():
+        return await asyncio.gather(*(router.rate_comments([str(i)]) for i in range(4)))
+
+    scores = [rating.score for rating in asyncio.run(scenario())]
+    assert scores == [4.0, 4.0, 3.0, 3.0]
+    assert router.downgrades == 2
+    assert router.in_flight == 0
+
+
+def test_rater_rates_through_router(temp_home):
+    class FakeYoutube:
+        def fetch_comments(self, video_id: str, max_comments: int = 100):
+            return [f"comment on {video_id}"]
+
+    primary, other = FakeProvider(0.3, 4.0), FakeProvider(0.0, 3.0)
+    router = make_router(primary, other)
+    rater = Rater(Cache(expiration_days=7), FakeYoutube(), router)
+    assert rater.batcher is not None
+
+    async def scenario():
+        try:
+            return await asyncio.gather(rater.rate("video1"), rater.rate("video2"))
+        finally:
+            await rater.aclose()
+
+    assert [r.score for r in asyncio.run(scenario())] == [3.0, 3.0]
+    assert router.routes[1].stats["batch"].calls == 1
+
+
+def test_router_with_fake_gemini_models(temp_home, monkeypatch):
+    monkeypatch.setattr(Constants, "DEFAULT_AI_RETRY_BASE_DELAY", 0)
+    with FakeGeminiServer(model_latency={"slow-model": 1.0}) as server:
+        config = Config()
+        config.set("gemini", "base_url", server.url)
+        config.set("router", "models", ["slow-model", "fast-model"])
+        config.set("router", "hedge_delay_ms", 50)
+        config.set("router", "max_hedge_ratio", 1.0)
+        router = AIRouter.from_config(
+            config,
+            lambda model: GeminiClient(
+                api_key="FAKE_KEY", model=model, limiter=RateLimiter("gemini", {})
+            ),
+        )
+        assert [route.name for route in router.routes] == ["slow-model", "fast-model"]
+
+        start = time.perf_counter()
+        rating = asyncio.run(router.rate_comments(["Great video!"]))
+        assert time.perf_counter() - start < 0.8
+        assert rating.score == FakeGeminiServer.score(server.prompts[0])
+        assert sorted(server.requests) == [
+            "/v1beta/models/fast-model:generateContent",
+            "/v1beta/models/slow-model:generateContent",
+        ]
+        router.close()
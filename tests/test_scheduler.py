@@ -0,0 +1,161 @@
+# tests/test_scheduler.py
+import asyncio
+import time
+import pytest
+from yt_rater.core.cache import Cache
+from yt_rater.core.config import Config
+from yt_rater.core.exceptions import ClientDisconnectedException
+from yt_rater.core.rater import Rater
+from yt_rater.core.scheduler import PriorityScheduler
+from yt_rater.models.rating_request import Priority
+
+INTERACTIVE, PREFETCH = Priority.INTERACTIVE, Priority.PREFETCH
+
+
+async def run_in_order(scheduler, requests, hold=0.01):
+    """Queue requests (name, priority) behind a busy scheduler; return the service order."""
+    order = []
+
+    async def one(name, priority):
+        async with scheduler.slot(priority):
+            order.append(name)
+            await asyncio.sleep(hold)
+
+    blocker = await scheduler.acquire()
+    tasks = []
+    for name, priority in requests:
+        tasks.append(asyncio.create_task(one(name, priority)))
+        await asyncio.sleep(0)
+    scheduler.release()
+    await asyncio.gather(*tasks)
+    assert blocker is False
+    return order
+
+
+def test_interactive_served_before_prefetches():
+    scheduler = PriorityScheduler(slots=1, reserved=0, aging=60)
+    requests = [(f"thumb{i}", PREFETCH) for i in range(5)] + [("watched", INTERACTIVE)]
+    order = asyncio.run(run_in_order(scheduler, requests))
+    assert order[0] == "watched"
+    assert order[1:] == [f"thumb{i}" for i in range(5)]
+    assert scheduler.stats["running"] == 0
+
+
+def test_aged_prefetch_goes_first():
+    now = [0.0]
+    scheduler = PriorityScheduler(slots=1, reserved=0, aging=10, clock=lambda: now[0])
+
+    async def scenario():
+        order = []
+
+        async def one(name, priority):
+            async with scheduler.slot(priority):
+                order.append(name)
+
+        await scheduler.acquire()
+        tasks = [asyncio.create_task(one("old thumb", PREFETCH))]
+        await asyncio.sleep(0)
+        now[0] = 11.0  # waited longer than the aging delay
+        tasks.append(asyncio.create_task(one("watched", INTERACTIVE)))
+        await asyncio.sleep(0)
+        scheduler.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(scenario()) == ["old thumb", "watched"]
+
+
+def test_reserved_slot_is_kept_for_interactive():
+    scheduler = PriorityScheduler(slots=2, reserved=1)
+
+    async def scenario():
+        assert await scheduler.acquire(PREFETCH) is False
+        # the second slot is reserved: another prefetch must wait...
+        prefetch = asyncio.create_task(scheduler.acquire(PREFETCH))
+        await asyncio.sleep(0.01)
+        assert not prefetch.done()
+        # ...but the watched video starts right away
+        assert await scheduler.acquire(INTERACTIVE) is False
+        scheduler.release()
+        scheduler.release()
+        assert await prefetch is True
+        scheduler.release()
+
+    asyncio.run(scenario())
+    assert scheduler.stats["running"] == 0
+
+
+def test_disconnected_client_is_dropped(monkeypatch):
+    monkeypatch.setattr(PriorityScheduler, "POLL_INTERVAL", 0.01)
+    scheduler = PriorityScheduler(slots=1)
+    gone = False
+
+    async def disconnected():
+        return gone
+
+    async def scenario():
+        nonlocal gone
+        await scheduler.acquire()
+        waiting = asyncio.create_task(scheduler.acquire(PREFETCH, disconnected))
+        await asyncio.sleep(0.03)
+        assert scheduler.stats["queued_prefetch"] == 1
+        gone = True
+        with pytest.raises(ClientDisconnectedException):
+            await waiting
+        scheduler.release()
+
+    asyncio.run(scenario())
+    assert scheduler.stats == {
+        "running": 0, "admitted": 1, "dropped": 1, "queued_interactive": 0, "queued_prefetch": 0,
+    }
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    scheduler = PriorityScheduler(slots=1)
+
+    async def scenario():
+        await scheduler.acquire()
+        waiting = asyncio.create_task(scheduler.acquire(INTERACTIVE))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        scheduler.release()
+
+    asyncio.run(scenario())
+    assert scheduler.stats["queued_interactive"] == 0
+    assert scheduler.stats["running"] == 0
+
+
+def test_rater_serves_watched_video_before_prefetches():
+    class SlowYoutube:
+        def __init__(self):
+            self.order = []
+
+        def fetch_comments(self, video_id: str, max_comments: int = 100):
+            self.order.append(video_id)
+            time.sleep(0.05)
+            return ["Great video!"]
+
+    class FakeAI:
+        def rate_comments(self, comments):
+            return 4.0
+
+    Config().set("server", "rating_slots", 1)
+    Config().set("youtube", "prefetch_metadata", False)
+    youtube = SlowYoutube()
+    rater = Rater(Cache(expiration_days=7), youtube, FakeAI())
+
+    async def scenario():
+        tasks = [
+            asyncio.create_task(rater.rate(f"thumbnail{i:02d}", PREFETCH)) for i in range(6)
+        ]
+        await asyncio.sleep(0.01)
+        tasks.append(asyncio.create_task(rater.rate("watchedvid1")))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            await rater.aclose()
+
+    asyncio.run(scenario())
+    # only the prefetch already running went first
+    assert youtube.order.index("watchedvid1") == 1
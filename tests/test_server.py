@@ -1,7 +1,22 @@
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 from yt_rater.core.server import Server
-from yt_rater.core.exceptions import InvalidURLException
+from yt_rater.core.cache import Cache
+from yt_rater.core.cache_backends import CacheEntry
+from yt_rater.core.config import Config
+from yt_rater.core.constants import Constants
+from yt_rater.core.exceptions import InvalidURLException, QuotaExceededException
+from yt_rater.core.router import AIRouter
+from yt_rater.core.scheduler import PriorityScheduler
+from yt_rater.core.video import extract_video_id
+from yt_rater.models.ai_rating import AIRating
 
 @pytest.fixture
 def client(monkeypatch):
@@ -21,7 +36,7 @@ def client(monkeypatch):
             return 4.5
 
     # Monkeypatch to replace true clients
-    monkeypatch.setattr("yt_rater.core.server.YoutubeClient", lambda *a, **k: FakeYoutube())
+    monkeypatch.setattr("yt_rater.core.server.HttpYoutubeClient", lambda *a, **k: FakeYoutube())
     monkeypatch.setattr("yt_rater.core.server.GeminiClient", lambda *a, **k: FakeGemini())
 
     server = Server(port=8001)
@@ -46,7 +61,7 @@ def test_rate_invalid_url(client, monkeypatch):
         def fetch_comments(self, video_id: str, max_comments: int = 100):
             return []
 
-    monkeypatch.setattr("yt_rater.core.server.YoutubeClient", lambda *a, **k: BadYoutube())
+    monkeypatch.setattr("yt_rater.core.server.HttpYoutubeClient", lambda *a, **k: BadYoutube())
 
     server = Server(port=8002)
     client_bad = TestClient(server.app)
@@ -64,10 +79,484 @@ def test_rate_no_comments(client, monkeypatch):
         def fetch_comments(self, video_id: str, max_comments: int = 100):
             return []
 
-    monkeypatch.setattr("yt_rater.core.server.YoutubeClient", lambda *a, **k: EmptyYoutube())
+    monkeypatch.setattr("yt_rater.core.server.HttpYoutubeClient", lambda *a, **k: EmptyYoutube())
 
     server = Server(port=8003)
     client_empty = TestClient(server.app)
 
     response = client_empty.post("/rate", json={"url": "https://www.youtube.com/watch?v=abcd"})
     assert response.status_code == 404
+
+
+def test_cache_hits_not_blocked_by_miss(monkeypatch):
+    """Cache hits must be answered while a slow miss is being fetched."""
+    miss_duration = 0.5
+
+    class SlowYoutube:
+        def get_video_id(self, url: str):
+            return extract_video_id(url)
+
+        def fetch_comments(self, video_id: str, max_comments: int = 100):
+            time.sleep(miss_duration)  # blocking, like googleapiclient .execute()
+            return ["Great video!"]
+
+    class FakeGemini:
+        def rate_comments(self, comments):
+            return 4.5
+
+    monkeypatch.setattr("yt_rater.core.server.HttpYoutubeClient", lambda *a, **k: SlowYoutube())
+    monkeypatch.setattr("yt_rater.core.server.GeminiClient", lambda *a, **k: FakeGemini())
+
+    server = Server(port=8004)
+    hit_url = "https://www.youtube.com/watch?v=cached"
+    server.cache.set("cached", 3.0)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            miss = asyncio.create_task(
+                ac.post("/rate", json={"url": "https://www.youtube.com/watch?v=slow"})
+            )
+            await asyncio.sleep(0.05)
+
+            latencies, hits = [], []
+            for _ in range(50):
+                start = time.perf_counter()
+                response = await ac.post("/rate", json={"url": hit_url})
+                latencies.append(time.perf_counter() - start)
+                assert response.json()["score"] == 3.0
+                # the handler's own work for a hit, without the HTTP client
+                start = time.perf_counter()
+                await server.rater.rate("cached")
+                hits.append(time.perf_counter() - start)
+            assert not miss.done()
+
+            response = await miss
+            assert response.json()["score"] == 4.5
+            return latencies, hits
+
+    latencies, hits = asyncio.run(scenario())
+    # hits stay sub-millisecond while the miss holds a worker thread
+    assert statistics.quantiles(hits, n=20)[-1] < 0.001
+    # whole requests through the ASGI stack, never waiting for the miss
+    assert statistics.median(latencies) < 0.005
+    assert max(latencies) < miss_duration / 2
+
+
+def test_concurrent_misses_are_coalesced(monkeypatch):
+    """Concurrent requests for the same video trigger one fetch and one rating."""
+    calls = {"fetch": 0, "rate": 0}
+
+    class SlowYoutube:
+        def get_video_id(self, url: str):
+            return "video123"
+
+        def fetch_comments(self, video_id: str, max_comments: int = 100):
+            calls["fetch"] += 1
+            time.sleep(0.2)
+            return ["Great video!"]
+
+    class FakeGemini:
+        def rate_comments(self, comments):
+            calls["rate"] += 1
+            return 4.5
+
+    monkeypatch.setattr("yt_rater.core.server.HttpYoutubeClient", lambda *a, **k: SlowYoutube())
+    monkeypatch.setattr("yt_rater.core.server.GeminiClient", lambda *a, **k: FakeGemini())
+
+    server = Server(port=8005)
+    urls = [
+        "https://www.youtube.com/watch?v=video123",
+        "https://youtu.be/video123",
+        "https://www.youtube.com/watch?v=video123&t=30",
+    ]
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            return await asyncio.gather(*(ac.post("/rate", json={"url": u}) for u in urls))
+
+    responses = asyncio.run(scenario())
+    assert [r.json()["score"] for r in responses] == [4.5] * 3
+    assert calls == {"fetch": 1, "rate": 1}
+    assert server.rater.singleflight.coalesced == 2
+
+
+def test_stale_while_revalidate(monkeypatch):
+    """A stale score is returned at once and refreshed once in background."""
+    calls = {"fetch": 0}
+
+    class SlowYoutube:
+        def get_video_id(self, url: str):
+            return extract_video_id(url)
+
+        def fetch_comments(self, video_id: str, max_comments: int = 100):
+            calls["fetch"] += 1
+            time.sleep(0.2)
+            return ["Great video!"]
+
+    class FakeGemini:
+        def rate_comments(self, comments):
+            return 4.5
+
+    monkeypatch.setattr("yt_rater.core.server.HttpYoutubeClient", lambda *a, **k: SlowYoutube())
+    monkeypatch.setattr("yt_rater.core.server.GeminiClient", lambda *a, **k: FakeGemini())
+    monkeypatch.setattr(
+        "yt_rater.core.server.Cache", lambda *a, **k: Cache(stale_while_revalidate=True)
+    )
+
+    server = Server(port=8006)
+    last_month = datetime.now() - timedelta(days=30)
+    server.cache.backend.set("dQw4w9WgXcQ", CacheEntry(2.0, last_month.timestamp()))
+    url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            first, second = await asyncio.gather(
+                ac.post("/rate", json={"url": url}), ac.post("/rate", json={"url": url})
+            )
+            await server.rater.wait_background()
+            third = await ac.post("/rate", json={"url": url})
+            return first.json(), second.json(), third.json()
+
+    first, second, third = asyncio.run(scenario())
+    assert first["score"] == second["score"] == 2.0
+    assert first["stale"] is True
+    assert datetime.fromisoformat(first["last_updated"]) == last_month
+    assert calls["fetch"] == 1
+    assert third["score"] == 4.5
+    assert third["stale"] is False
+
+
+@pytest.fixture
+def batch_server(monkeypatch):
+    """Server whose YouTube fake knows one video without comments."""
+    class FakeYoutube:
+        def get_video_id(self, url: str):
+            return extract_video_id(url)
+
+        def fetch_comments(self, video_id: str, max_comments: int = 100):
+            time.sleep(0.05)
+            return [] if video_id == "nocomments1" else ["Great video!"]
+
+    class FakeGemini:
+        def rate_comments(self, comments):
+            return 4.5
+
+    monkeypatch.setattr("yt_rater.core.server.HttpYoutubeClient", lambda *a, **k: FakeYoutube())
+    monkeypatch.setattr("yt_rater.core.server.GeminiClient", lambda *a, **k: FakeGemini())
+    server = Server(port=8007)
+    server.cache.set("cachedvideo", 3.0)
+    return server
+
+
+BATCH_ITEMS = [
+    "https://www.youtube.com/watch?v=video000001",
+    "cachedvideo",
+    "https://example.com/not-youtube",
+    "nocomments1",
+]
+
+
+def test_rate_batch(batch_server):
+    client = TestClient(batch_server.app)
+    response = client.post("/rate/batch", json={"items": BATCH_ITEMS})
+    assert response.status_code == 200
+    results = response.json()["results"]
+
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert results[0]["video_id"] == "video000001"
+    assert results[0]["score"] == 4.5
+    assert results[1]["score"] == 3.0
+    assert results[2]["status"] == 403
+    assert results[2]["score"] is None
+    assert results[3]["status"] == 404
+
+
+def test_rate_batch_stream(batch_server):
+    client = TestClient(batch_server.app)
+    response = client.post("/rate/batch/stream", json={"items": BATCH_ITEMS})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["index"] for line in lines) == [0, 1, 2, 3]
+    # invalid input and cache hit are answered before the misses
+    assert {lines[0]["index"], lines[1]["index"]} == {1, 2}
+
+
+def test_rate_batch_validation(batch_server):
+    client = TestClient(batch_server.app)
+    assert client.post("/rate/batch", json={"items": []}).status_code == 422
+    too_many = ["cachedvideo"] * (Constants.DEFAULT_BATCH_MAX_ITEMS + 1)
+    assert client.post("/rate/batch", json={"items": too_many}).status_code == 422
+
+
+def test_quota(client):
+    response = client.get("/quota")
+    assert response.status_code == 200
+    data = response.json()
+    assert "units" in data["youtube"]["buckets"]
+    assert "requests" in data["gemini"]["buckets"]
+
+
+def test_rate_quota_exceeded(monkeypatch):
+    class ExhaustedYoutube:
+        def get_video_id(self, url: str):
+            return "video123"
+
+        def fetch_comments(self, video_id: str, max_comments: int = 100):
+            raise QuotaExceededException("YouTube quota exceeded", retry_after=30)
+
+    monkeypatch.setattr("yt_rater.core.server.HttpYoutubeClient", lambda *a, **k: ExhaustedYoutube())
+    monkeypatch.setattr("yt_rater.core.server.GeminiClient", lambda *a, **k: object())
+
+    server = Server(port=8008)
+    response = TestClient(server.app).post(
+        "/rate", json={"url": "https://www.youtube.com/watch?v=abcd"}
+    )
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "30"
+    assert server.cache.get("video123") is None
+
+
+@pytest.fixture
+def jobs_server(monkeypatch):
+    """Server whose misses take 0.2 s, with video IDs taken from the URL."""
+    calls = {"fetch": 0, "videos": []}
+
+    class SlowYoutube:
+        def get_video_id(self, url: str):
+            return extract_video_id(url)
+
+        def fetch_comments(self, video_id: str, max_comments: int = 100):
+            calls["fetch"] += 1
+            calls["videos"].append(video_id)
+            time.sleep(0.2)
+            if video_id == "nocomments1":
+                return []
+            return ["Great video!"]
+
+    class FakeGemini:
+        def rate_comments(self, comments):
+            return 4.5
+
+    monkeypatch.setattr("yt_rater.core.server.HttpYoutubeClient", lambda *a, **k: SlowYoutube())
+    monkeypatch.setattr("yt_rater.core.server.GeminiClient", lambda *a, **k: FakeGemini())
+    Config().set("youtube", "prefetch_metadata", False)
+    server = Server(port=8009)
+    server.calls = calls
+    return server
+
+
+def test_async_mode_returns_job_on_miss(jobs_server):
+    prefer = {"Prefer": "respond-async"}
+    url = "https://www.youtube.com/watch?v=video123456"
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=jobs_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            first, second = await asyncio.gather(
+                ac.post("/rate", json={"url": url}, headers=prefer),
+                ac.post("/rate", json={"url": url}, headers=prefer),
+            )
+            pending = await ac.get(first.headers["Location"])
+            await jobs_server.jobs.join()
+            done = await ac.get(first.headers["Location"])
+            hit = await ac.post("/rate", json={"url": url}, headers=prefer)
+            await jobs_server.jobs.aclose()
+            return first, second, pending, done, hit
+
+    first, second, pending, done, hit = asyncio.run(scenario())
+    assert first.status_code == 202
+    assert first.headers["Preference-Applied"] == "respond-async"
+    job = first.json()
+    assert job["status"] in ("pending", "running")
+    assert first.headers["Location"] == f"/jobs/{job['id']}"
+    # the second submission attached to the same job
+    assert second.json()["id"] == job["id"]
+    assert pending.json()["status"] in ("pending", "running")
+    assert done.json()["status"] == "done"
+    assert done.json()["result"]["score"] == 4.5
+    # once rated, the video is a plain cache hit
+    assert hit.status_code == 200 and hit.json()["score"] == 4.5
+    assert jobs_server.calls["fetch"] == 1
+
+
+def test_async_jobs_follow_priority(jobs_server):
+    jobs_server.rater.scheduler = PriorityScheduler(slots=1)
+    prefer = {"Prefer": "respond-async"}
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=jobs_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            for i in range(4):
+                await ac.post(
+                    "/rate", headers=prefer,
+                    json={"url": f"https://youtu.be/thumbnail{i:02d}", "priority": "prefetch"},
+                )
+            watched = await ac.post(
+                "/rate", json={"url": "https://youtu.be/watchedvid1"}, headers=prefer
+            )
+            await jobs_server.jobs.join()
+            await jobs_server.jobs.aclose()
+            return watched
+
+    assert asyncio.run(scenario()).status_code == 202
+    # only the prefetch already being rated went first
+    assert jobs_server.calls["videos"].index("watchedvid1") == 1
+
+
+def test_async_mode_reports_failures(jobs_server):
+    async def scenario():
+        transport = httpx.ASGITransport(app=jobs_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            response = await ac.post(
+                "/rate", json={"url": "https://youtu.be/nocomments1"},
+                headers={"Prefer": "respond-async"},
+            )
+            await jobs_server.jobs.join()
+            job = await ac.get(response.headers["Location"])
+            await jobs_server.jobs.aclose()
+            return job
+
+    job = asyncio.run(scenario()).json()
+    assert job["status"] == "failed"
+    assert job["error_status"] == 404
+
+
+def test_async_mode_is_opt_in(jobs_server):
+    response = TestClient(jobs_server.app).post(
+        "/rate", json={"url": "https://www.youtube.com/watch?v=video123456"}
+    )
+    assert response.status_code == 200
+    assert response.json()["score"] == 4.5
+
+
+def test_job_events_stream(jobs_server):
+    Config().set("server", "async_jobs", True)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=jobs_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            response = await ac.post("/rate", json={"url": "https://youtu.be/video123456"})
+            events = await ac.get(response.headers["Location"] + "/events")
+            await jobs_server.jobs.aclose()
+            return response, events
+
+    response, events = asyncio.run(scenario())
+    assert response.status_code == 202
+    assert events.headers["content-type"].startswith("text/event-stream")
+    blocks = [block for block in events.text.split("\n\n") if block]
+    names = [block.splitlines()[0] for block in blocks]
+    assert names[-1] == "event: done"
+    assert set(names) <= {"event: pending", "event: running", "event: done"}
+    last = json.loads(blocks[-1].splitlines()[1].removeprefix("data: "))
+    assert last["result"]["score"] == 4.5
+
+
+def test_unknown_job(client):
+    assert client.get("/jobs/unknown").status_code == 404
+    assert client.get("/jobs/unknown/events").status_code == 404
+
+
+def test_get_rating_is_cacheable(client):
+    response = client.get("/rate/video123456")
+    assert response.status_code == 200
+    assert response.json()["score"] == 4.5
+    etag = response.headers["ETag"]
+    assert etag.startswith('"') and etag.endswith('"')
+    assert response.headers["Last-Modified"].endswith("GMT")
+    max_age = int(response.headers["Cache-Control"].split("max-age=")[1])
+    ttl = Constants.DEFAULT_CACHE_EXPIRATION_DAYS * 86400
+    assert ttl - 5 <= max_age <= ttl
+
+    # a second request with the validator: same entry, nothing re-sent
+    again = client.get("/rate/video123456", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["ETag"] == etag
+    weak = client.get("/rate/video123456", headers={"If-None-Match": f'"other", W/{etag}'})
+    assert weak.status_code == 304
+    since = client.get(
+        "/rate/video123456", headers={"If-Modified-Since": response.headers["Last-Modified"]}
+    )
+    assert since.status_code == 304
+    assert client.get("/rate/video123456", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+@pytest.fixture
+def rating_server(monkeypatch):
+    """Server whose AI answers with the rating set in server.ai_rating."""
+    class FakeYoutube:
+        def get_video_id(self, url: str):
+            return extract_video_id(url)
+
+        def fetch_comments(self, video_id: str, max_comments: int = 100):
+            return ["Great video!"]
+
+    class FakeGemini:
+        def rate_comments(self, comments):
+            return server.ai_rating
+
+    monkeypatch.setattr("yt_rater.core.server.HttpYoutubeClient", lambda *a, **k: FakeYoutube())
+    monkeypatch.setattr("yt_rater.core.server.GeminiClient", lambda *a, **k: FakeGemini())
+    server = Server(port=8010)
+    server.ai_rating = 4.5
+    return server
+
+
+def test_get_rating_etag_follows_entry(rating_server, monkeypatch):
+    client = TestClient(rating_server.app)
+    cache = rating_server.cache
+    cache.set("video123456", 3.0)
+    etag = client.get("/rate/video123456").headers["ETag"]
+
+    cache.set("video123456", 2.0)
+    response = client.get("/rate/video123456", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["score"] == 2.0
+    assert response.headers["ETag"] != etag
+
+    # an expired entry served stale must be revalidated
+    cache._remember("stale123456", CacheEntry(1.0, time.time() - cache.ttl - 60))
+    cache._stale_while_revalidate = True
+    monkeypatch.setattr(rating_server.rater, "schedule_refresh", lambda video_id: None)
+    stale = client.get("/rate/stale123456")
+    assert stale.json()["stale"] is True
+    assert stale.headers["Cache-Control"] == "no-cache"
+
+
+def test_get_rating_invalid_id(client):
+    assert client.get("/rate/not-an-id").status_code == 403
+
+
+def test_get_rating_fallback_not_stored(rating_server):
+    rating_server.ai_rating = AIRating(score=2.5, fallback=True, reason="error")
+    response = TestClient(rating_server.app).get("/rate/video123456")
+    assert response.json()["fallback"] is True
+    assert response.headers["Cache-Control"] == "no-store"
+    assert "ETag" not in response.headers
+
+
+def test_rating_priority(rating_server):
+    client = TestClient(rating_server.app)
+    response = client.post(
+        "/rate", json={"url": "https://youtu.be/video123456", "priority": "prefetch"}
+    )
+    assert response.status_code == 200
+    assert client.get("/rate/video654321?priority=prefetch").status_code == 200
+    assert rating_server.rater.scheduler.stats["admitted"] == 2
+    assert client.get("/rate/video654321?priority=urgent").status_code == 422
+
+
+def test_router_enabled_in_config(monkeypatch):
+    monkeypatch.setattr("yt_rater.core.server.HttpYoutubeClient", lambda *a, **k: object())
+    monkeypatch.setattr("yt_rater.core.server.GeminiClient", lambda *a, **k: object())
+    Config().set("router", "enabled", True)
+    Config().set("router", "models", ["model-a", "model-b"])
+    server = Server(port=8012)
+    assert isinstance(server.rater.ai, AIRouter)
+    assert [route.name for route in server.rater.ai.routes] == ["model-a", "model-b"]
+    server.rater.close()
@@ -0,0 +1,77 @@
+# tests/test_singleflight.py
+import asyncio
+import pytest
+from yt_rater.core.singleflight import SingleFlight
+
+
+def test_concurrent_calls_are_coalesced():
+    sf = SingleFlight()
+    executions = []
+
+    async def work():
+        executions.append(1)
+        await asyncio.sleep(0.05)
+        return 4.2
+
+    async def scenario():
+        return await asyncio.gather(*(sf.do("video123", work) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert results == [4.2] * 5
+    assert len(executions) == 1
+    assert sf.stats == {
+        "calls": 5, "executions": 1, "coalesced": 4, "failures": 0, "in_flight": 0
+    }
+
+
+def test_different_keys_run_separately():
+    sf = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        return 1.0
+
+    async def scenario():
+        await asyncio.gather(sf.do("a", work), sf.do("b", work))
+
+    asyncio.run(scenario())
+    assert sf.executions == 2
+    assert sf.coalesced == 0
+
+
+def test_failure_propagates_to_every_caller():
+    sf = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        return await asyncio.gather(
+            *(sf.do("video123", work) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert sf.failures == 1
+    assert not sf.in_flight("video123")
+
+
+def test_cancelled_caller_does_not_cancel_shared_call():
+    sf = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return 3.0
+
+    async def scenario():
+        first = asyncio.create_task(sf.do("video123", work))
+        second = asyncio.create_task(sf.do("video123", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == 3.0
+    assert sf.failures == 0
@@ -0,0 +1,58 @@
+# tests/test_startup.py
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SRC = str(Path(__file__).resolve().parents[1] / "src")
+
+# modules only the server needs: importing them costs most of the startup time
+HEAVY_MODULES = ("fastapi", "uvicorn", "googleapiclient", "google.genai")
+# import time budget of the CLI module, generous enough for slow CI machines
+CLI_IMPORT_BUDGET_US = 300_000
+CONFIG_SHOW_BUDGET_S = 2.0
+
+
+def run_python(args, home):
+    env = dict(os.environ, HOME=str(home), PYTHONPATH=SRC)
+    return subprocess.run(
+        [sys.executable, *args], env=env, capture_output=True, text=True, check=True
+    )
+
+
+def import_times(module, home):
+    """Cumulative import time (µs) of each module imported by `import module`."""
+    result = run_python(["-X", "importtime", "-c", f"import {module}"], home)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_import_is_light(tmp_path):
+    times = import_times("yt_rater.cli", tmp_path)
+    heavy = [m for m in times if any(m == h or m.startswith(h + ".") for h in HEAVY_MODULES)]
+    assert heavy == []
+    assert times["yt_rater.cli"] < CLI_IMPORT_BUDGET_US
+
+
+def test_gemini_client_import_is_light(tmp_path):
+    # the server imports it at startup: google-genai only loads once rating
+    times = import_times("yt_rater.core.gemini", tmp_path)
+    assert not [m for m in times if m == "google.genai" or m.startswith("google.genai.")]
+
+
+def test_import_has_no_side_effects(tmp_path):
+    run_python(["-c", "import yt_rater.cli, yt_rater.core.server"], tmp_path)
+    assert not (tmp_path / ".yt_rater").exists()
+
+
+def test_config_show_startup_budget(tmp_path):
+    start = time.perf_counter()
+    result = run_python(["-m", "yt_rater.cli", "config", "--show"], tmp_path)
+    assert time.perf_counter() - start < CONFIG_SHOW_BUDGET_S
+    assert "[server]" in result.stdout
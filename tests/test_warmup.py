@@ -0,0 +1,181 @@
+# tests/test_warmup.py
+import asyncio
+import json
+import time
+import pytest
+from typer.testing import CliRunner
+from yt_rater.cli import app
+from yt_rater.core.cache import Cache
+from yt_rater.core.cache_backends import CacheEntry
+from yt_rater.core.config import Config
+from yt_rater.core.exceptions import NoCommentFound, QuotaExceededException
+from yt_rater.core.ratelimit import RateLimiter
+from yt_rater.core.rater import Rater
+from yt_rater.core.warmup import Checkpoint, Warmer, iter_sources, read_inputs
+from yt_rater.core.youtube_http import HttpYoutubeClient
+from yt_rater.testing.fake_youtube import FakeYouTubeServer
+
+
+@pytest.fixture(autouse=True)
+def fake_config():
+    cfg = Config()
+    cfg.set("youtube", "prefetch_metadata", False)
+    cfg.set("cache", "incremental_refresh", False)
+    return cfg
+
+
+class FakeYoutube:
+    def __init__(self):
+        self.fetched = []
+
+    def get_video_id(self, url):
+        from yt_rater.core.video import extract_video_id
+        return extract_video_id(url)
+
+    def fetch_comments(self, video_id, max_comments=100):
+        self.fetched.append(video_id)
+        if video_id == "nocomments1":
+            raise NoCommentFound
+        if video_id == "overquota01":
+            raise QuotaExceededException("quota", retry_after=3600)
+        return [f"comment on {video_id}"]
+
+
+class FakeAI:
+    def rate_comments(self, comments):
+        return 4.0
+
+
+async def aiter(items):
+    for item in items:
+        yield item
+
+
+def warm(warmer, inputs):
+    async def scenario():
+        return [record async for record in warmer.run(aiter(inputs))]
+
+    return asyncio.run(scenario())
+
+
+def test_read_inputs():
+    assert read_inputs(["# trending", "", " video123456 ", "https://youtu.be/abcdefghijk"]) == [
+        "video123456", "https://youtu.be/abcdefghijk",
+    ]
+
+
+def test_warm_streams_records_and_summary():
+    youtube = FakeYoutube()
+    rater = Rater(Cache(expiration_days=7), youtube, FakeAI())
+    rater.cache.set("cachedvid01", 3.0)
+    inputs = [
+        "https://www.youtube.com/watch?v=video000001", "video000002", "video000001",
+        "cachedvid01", "nocomments1", "not a video",
+    ]
+
+    records = warm(Warmer(rater, concurrency=2), inputs)
+    summary = records.pop()["summary"]
+    by_status = {}
+    for record in records:
+        by_status.setdefault(record["status"], []).append(record["video_id"])
+    assert sorted(by_status["rated"]) == ["video000001", "video000002"]
+    assert by_status["cached"] == ["cachedvid01"]
+    assert by_status["no_comments"] == ["nocomments1"]
+    assert by_status["invalid"] == ["not a video"]
+    assert all("seconds" in record for record in records if record["status"] != "invalid")
+    assert summary["rated"] == 2 and summary["skipped"] == 1 and summary["videos"] == 5
+    assert rater.cache.get("video000002") == 4.0
+    assert sorted(youtube.fetched) == ["nocomments1", "video000001", "video000002"]
+
+
+def test_checkpoint_resumes(tmp_path):
+    path = tmp_path / "warm.checkpoint"
+    youtube = FakeYoutube()
+    rater = Rater(Cache(expiration_days=7), youtube, FakeAI())
+
+    checkpoint = Checkpoint(path)
+    warm(Warmer(rater, checkpoint=checkpoint), ["video000001", "nocomments1"])
+    checkpoint.close()
+    assert sorted(path.read_text().split()) == ["nocomments1", "video000001"]
+
+    checkpoint = Checkpoint(path)
+    records = warm(
+        Warmer(rater, checkpoint=checkpoint), ["video000001", "nocomments1", "video000002"]
+    )
+    checkpoint.close()
+    assert [r["video_id"] for r in records[:-1]] == ["video000002"]
+    assert records[-1]["summary"]["skipped"] == 2
+
+
+def test_stale_entries_are_rated_again(tmp_path):
+    Config().set("cache", "stale_while_revalidate", True)
+    youtube = FakeYoutube()
+    rater = Rater(Cache(expiration_days=7), youtube, FakeAI())
+    rater.cache.backend.set("stalevid001", CacheEntry(3.0, time.time() - 8 * 86400))
+
+    checkpoint = Checkpoint(tmp_path / "warm.checkpoint")
+    records = warm(Warmer(rater, checkpoint=checkpoint), ["stalevid001"])
+    checkpoint.close()
+    assert records[0]["status"] == "rated"
+    assert records[0]["score"] == 4.0
+    # the fresh score is stored before the video is checkpointed
+    assert rater.cache.get("stalevid001") == 4.0
+    assert youtube.fetched == ["stalevid001"]
+    assert checkpoint.done == {"stalevid001"}
+
+
+def test_long_quota_pause_stops_the_run():
+    youtube = FakeYoutube()
+    rater = Rater(Cache(expiration_days=7), youtube, FakeAI())
+    inputs = ["overquota01"] + [f"video{i:06d}" for i in range(20)]
+
+    records = warm(Warmer(rater, concurrency=1), inputs)
+    assert records[0]["status"] == "quota_exceeded"
+    assert records[0]["retry_after"] == 3600
+    assert records[-1]["summary"]["quota_exceeded"] == 1
+    # the producer is a few videos ahead at most
+    assert len(youtube.fetched) <= 4
+
+
+def test_iter_sources_lists_playlists_and_channels():
+    with FakeYouTubeServer(page_size=2) as server:
+        server.add_playlist("PL1234567890ab", ["a0000000001", "a0000000002", "a0000000003"])
+        server.add_channel("UC" + "x" * 22, ["b0000000001", "b0000000002"], handle="@someone")
+        client = HttpYoutubeClient(
+            api_key="FAKE_KEY", limiter=RateLimiter("youtube", {}), base_url=server.base_url
+        )
+
+        async def scenario():
+            try:
+                return [video async for video in iter_sources(
+                    client,
+                    videos=["c0000000001"],
+                    playlists=["https://www.youtube.com/playlist?list=PL1234567890ab"],
+                    channels=["https://www.youtube.com/@someone"],
+                    limit=2,
+                )]
+            finally:
+                await client.aclose()
+
+        videos = asyncio.run(scenario())
+    assert videos == ["c0000000001", "a0000000001", "a0000000002", "b0000000001", "b0000000002"]
+
+
+def test_warm_command(fake_config, tmp_path, monkeypatch):
+    monkeypatch.setattr("yt_rater.core.server.HttpYoutubeClient", lambda *a, **k: FakeYoutube())
+    monkeypatch.setattr("yt_rater.core.server.GeminiClient", lambda *a, **k: FakeAI())
+    fake_config.set("youtube", "api_key", "FAKE_YOUTUBE_API_KEY")
+    fake_config.set("gemini", "api_key", "FAKE_GEMINI_API_KEY")
+    videos = tmp_path / "videos.txt"
+    videos.write_text("# nightly\nvideo000001\nhttps://youtu.be/video000002\n")
+
+    result = CliRunner().invoke(app, ["warm", "video000003", "--file", str(videos)])
+    assert result.exit_code == 0, result.output
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert sorted(r["video_id"] for r in records[:-1]) == [
+        "video000001", "video000002", "video000003",
+    ]
+    assert records[-1]["summary"]["rated"] == 3
+
+    result = CliRunner().invoke(app, ["warm"])
+    assert result.exit_code == 2
@@ -1,13 +1,11 @@
 import pytest
+from datetime import datetime
 from yt_rater.core.youtube import YoutubeClient
 from yt_rater.core.config import Config
-from yt_rater.core.constants import Constants
 from yt_rater.core.exceptions import InvalidURLException
 
 @pytest.fixture
-def fake_config(tmp_path, monkeypatch):
-    monkeypatch.setattr(Config, "CONFIG_DIR", tmp_path)
-    monkeypatch.setattr(Config, "CONFIG_FILE", tmp_path / Constants.DEFAULT_CONFIG_FILE_NAME)
+def fake_config():
     cfg = Config()
     cfg.set("youtube", "api_key", "FAKE_KEY")
     return cfg
@@ -81,3 +79,121 @@ def test_fetch_comments(monkeypatch, fake_config):
     yt = YoutubeClient(api_key="FAKE_KEY")
     comments = yt.fetch_comments("abcd1234", max_comments=5)
     assert comments == ["Comment 1", "Comment 2"]
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=30",
+    "https://m.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://youtu.be/dQw4w9WgXcQ?si=abc",
+    "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+    "https://www.youtube.com/embed/dQw4w9WgXcQ",
+    "dQw4w9WgXcQ",
+])
+def test_get_video_id_canonical(fake_config, url):
+    yt = YoutubeClient(api_key="FAKE_KEY")
+    assert yt.get_video_id(url) == "dQw4w9WgXcQ"
+
+
+def test_fetch_video_metadata(monkeypatch, fake_config):
+    calls = []
+
+    class FakeVideosRequest:
+        def __init__(self, ids):
+            self._ids = ids
+
+        def execute(self):
+            items = []
+            for video_id in self._ids:
+                if video_id == "deleted":
+                    continue
+                statistics = {} if video_id == "disabled" else {"commentCount": "3"}
+                items.append({"id": video_id, "statistics": statistics})
+            return {"items": items}
+
+    class FakeVideos:
+        def list(self, **kwargs):
+            calls.append(kwargs)
+            return FakeVideosRequest(kwargs["id"].split(","))
+
+    class FakeYouTube:
+        def videos(self):
+            return FakeVideos()
+
+    monkeypatch.setattr("yt_rater.core.youtube.build", lambda *a, **k: FakeYouTube())
+
+    yt = YoutubeClient(api_key="FAKE_KEY")
+    video_ids = ["disabled", "deleted"] + [f"video{i:03d}" for i in range(60)]
+    metadata = yt.fetch_video_metadata(video_ids)
+
+    assert len(calls) == 2
+    assert all(len(call["id"].split(",")) <= 50 for call in calls)
+    assert calls[0]["fields"] == "items(id,statistics/commentCount)"
+    assert metadata["video000"].comment_count == 3
+    assert metadata["video000"].has_comments
+    assert not metadata["disabled"].comments_enabled
+    assert not metadata["disabled"].has_comments
+    assert not metadata["deleted"].available
+
+
+def test_fetch_comments_request_limits(monkeypatch, fake_config):
+    fake_config.set("youtube", "max_comments_per_video", 250)
+    calls = []
+
+    class FakeRequest:
+        def execute(self):
+            return {"items": [
+                {"snippet": {"topLevelComment": {"snippet": {"textDisplay": "c"}}}}
+            ] * 100, "nextPageToken": "NEXT"}
+
+    class FakeCommentThreads:
+        def list(self, **kwargs):
+            calls.append(kwargs)
+            return FakeRequest()
+
+    class FakeYouTube:
+        def commentThreads(self):
+            return FakeCommentThreads()
+
+    monkeypatch.setattr("yt_rater.core.youtube.build", lambda *a, **k: FakeYouTube())
+
+    yt = YoutubeClient(api_key="FAKE_KEY")
+    comments = yt.fetch_comments("abcd1234", max_comments=250)
+    assert len(comments) == 250
+    assert [call["maxResults"] for call in calls] == [100, 100, 50]
+    # top comments: the API's default relevance order
+    assert all("order" not in call for call in calls)
+    assert "textDisplay" in calls[0]["fields"]
+
+
+def test_fetch_comment_threads_since(monkeypatch, fake_config):
+    def thread(i, published):
+        return {"id": f"c{i}", "snippet": {"totalReplyCount": i, "topLevelComment": {"snippet": {
+            "textDisplay": f"Comment {i}", "publishedAt": published, "likeCount": 10 * i,
+        }}}}
+
+    class FakeRequest:
+        def execute(self):
+            return {"items": [
+                thread(3, "2024-01-03T00:00:00Z"),
+                thread(2, "2024-01-02T00:00:00Z"),
+                thread(1, "2024-01-01T00:00:00Z"),
+            ], "nextPageToken": "NEXT"}
+
+    class FakeCommentThreads:
+        def list(self, **kwargs):
+            assert kwargs["order"] == "time"
+            return FakeRequest()
+
+    class FakeYouTube:
+        def commentThreads(self):
+            return FakeCommentThreads()
+
+    monkeypatch.setattr("yt_rater.core.youtube.build", lambda *a, **k: FakeYouTube())
+
+    yt = YoutubeClient(api_key="FAKE_KEY")
+    since = datetime.fromisoformat("2024-01-02T00:00:00+00:00").timestamp()
+    comments = yt.fetch_comment_threads("abcd1234", max_comments=10, since=since)
+    assert [c.id for c in comments] == ["c3"]
+    assert comments[0].like_count == 30
+    assert comments[0].reply_count == 3
+    assert comments[0].published_at > since
@@ -0,0 +1,122 @@
+# tests/test_youtube_http.py
+import asyncio
+import pytest
+from yt_rater.core.config import Config
+from yt_rater.core.exceptions import NoCommentFound, QuotaExceededException
+from yt_rater.core.metrics import REGISTRY
+from yt_rater.core.ratelimit import RateLimiter
+from yt_rater.core.youtube_http import HttpYoutubeClient
+from yt_rater.models.comment import Comment
+from yt_rater.testing.fake_youtube import FakeYouTubeServer
+
+
+@pytest.fixture(autouse=True)
+def fake_config():
+    cfg = Config()
+    cfg.set("youtube", "max_comments_per_video", 150)
+    return cfg
+
+
+@pytest.fixture
+def server():
+    with FakeYouTubeServer() as server:
+        yield server
+
+
+def make_client(server):
+    return HttpYoutubeClient(
+        api_key="FAKE_KEY", limiter=RateLimiter("youtube", {}), base_url=server.base_url
+    )
+
+
+def run(client, coroutine):
+    async def scenario():
+        try:
+            return await coroutine
+        finally:
+            await client.aclose()
+
+    return asyncio.run(scenario())
+
+
+def test_fetch_comment_threads_pages_over_one_connection(server):
+    server.add_video("video123", [
+        Comment(id=f"c{i}", text=f"Comment {i}", published_at=1_700_000_000 - i, like_count=i)
+        for i in range(150)
+    ])
+    client = make_client(server)
+    pages = REGISTRY.get_sample_value("yt_rater_youtube_pages_per_video_sum")
+
+    comments = run(client, client.fetch_comment_threads("video123", max_comments=150))
+    assert [c.id for c in comments] == [f"c{i}" for i in range(150)]
+    assert comments[3].like_count == 3
+    assert comments[0].published_at == 1_700_000_000
+    # two pages, one pooled keep-alive connection
+    assert server.requests == ["/youtube/v3/commentThreads"] * 2
+    assert server.connections == 1
+    assert server.comment_orders == [None, None]
+    assert REGISTRY.get_sample_value("yt_rater_youtube_pages_per_video_sum") == pages + 2
+
+
+def test_fetch_comment_threads_since(server):
+    server.add_video("video123", [
+        Comment(id=f"c{i}", text=f"Comment {i}", published_at=1000 - i) for i in range(10)
+    ])
+    client = make_client(server)
+    comments = run(client, client.fetch_comment_threads("video123", 10, since=997))
+    assert [c.id for c in comments] == ["c0", "c1", "c2"]
+    assert server.comment_orders == ["time"]
+
+
+def test_comments_disabled(server):
+    server.comments_disabled.add("video123")
+    client = make_client(server)
+    with pytest.raises(NoCommentFound):
+        run(client, client.fetch_comments("video123"))
+
+
+def test_fetch_comments(server):
+    server.add_video("video123", ["Great video!", "Not bad"])
+    client = make_client(server)
+    assert run(client, client.fetch_comments("video123", 5)) == ["Great video!", "Not bad"]
+
+
+def test_fetch_video_metadata(server):
+    server.add_video("with", ["Great video!"])
+    server.add_video("without", [])
+    client = make_client(server)
+    metadata = run(client, client.fetch_video_metadata(["with", "without", "deleted"]))
+    assert metadata["with"].has_comments
+    assert not metadata["without"].has_comments
+    assert not metadata["deleted"].available
+
+
+def test_quota_exceeded(server):
+    server.quota_exceeded = True
+    client = make_client(server)
+    with pytest.raises(QuotaExceededException):
+        run(client, client.fetch_comments("video123"))
+    assert client.limiter.status()["blocked_for"] > 0
+
+
+def test_rater_awaits_async_client(server):
+    from yt_rater.core.cache import Cache
+    from yt_rater.core.rater import Rater
+
+    server.add_video("video123", ["Great video!", "Very clear explanation"])
+
+    class FakeAI:
+        def rate_comments(self, comments):
+            return 4.0
+
+    rater = Rater(Cache(expiration_days=7), make_client(server), FakeAI())
+
+    async def scenario():
+        try:
+            return await rater.rate("video123")
+        finally:
+            await rater.aclose()
+
+    assert asyncio.run(scenario()).score == 4.0
+    # one round trip: no videos.list before the comments of a single miss
+    assert server.requests == ["/youtube/v3/commentThreads"]